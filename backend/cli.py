@@ -8,6 +8,7 @@ from pathlib import Path
 
 from watchdog.observers import Observer
 
+from backend.config.settings import SEARCH_INDEX_DIR
 from backend.file_manager.duplicate_detector import DuplicateDetector
 from backend.file_manager.file_tree import FileTreeGenerator
 from backend.file_manager.file_watcher import FileEventHandler
@@ -21,7 +22,7 @@ from backend.project_reader.code_summary import summarize_project
 from backend.project_reader.notebooks import NotebookConverter
 from backend.project_reader.token_counter import TokenAnalyzer
 from backend.rollback.rollback_manager import RollbackManager
-from backend.search.search_engine import SearchEngine
+from backend.search.search_engine import SEARCH_DB, SearchEngine
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +36,33 @@ def validate_directory(directory) -> Path:
     return resolved_dir
 
 
+async def run_search(
+    search_engine: SearchEngine, query: str, method: str, limit: int = 10
+) -> list:
+    """Run a search method and return the matching paths."""
+    try:
+        if method == "hybrid":
+            await search_engine.warm_up()
+            return await search_engine.hybrid_search_async(query, k=limit)
+        if method == "filename":
+            return await search_engine.search_filename_async(query)
+        if method == "fuzzy":
+            return await search_engine.fuzzy_search_async(query)
+        if method == "semantic":
+            return await search_engine.semantic_search_async(query)
+        return await asyncio.to_thread(search_engine.full_text_search, query)
+    finally:
+        await search_engine.close()
+
+
+async def run_reindex(search_engine: SearchEngine, directory: Path) -> dict:
+    """Incrementally reindex ``directory`` and return the change counts."""
+    try:
+        return await search_engine.reindex_incremental(directory)
+    finally:
+        await search_engine.close()
+
+
 def main():
     """Entry point for the command-line interface."""
     parser = argparse.ArgumentParser(
@@ -146,13 +174,38 @@ def main():
     search_parser.add_argument("query", type=str, help="Search query.")
     search_parser.add_argument(
         "--method",
-        choices=["filename", "fulltext", "fuzzy"],
+        choices=["filename", "fulltext", "fuzzy", "semantic", "hybrid"],
         default="fulltext",
-        help="Search method to use.",
+        help="Search method to use; 'hybrid' runs all backends and fuses them.",
+    )
+    search_parser.add_argument(
+        "--limit",
+        type=int,
+        default=10,
+        help="Number of results for hybrid search.",
     )
     search_parser.add_argument(
         "--output", type=Path, help="Output file for search results."
     )
+    search_parser.add_argument(
+        "--index-dir",
+        type=Path,
+        default=SEARCH_INDEX_DIR,
+        help="Directory holding the search index.",
+    )
+
+    reindex_parser = subparsers.add_parser(
+        "reindex", help="Update the search index for changed files only."
+    )
+    reindex_parser.add_argument(
+        "directory", type=validate_directory, help="Directory to index."
+    )
+    reindex_parser.add_argument(
+        "--index-dir",
+        type=Path,
+        default=SEARCH_INDEX_DIR,
+        help="Directory holding the search index.",
+    )
 
     ingest_parser = subparsers.add_parser("ingest", help="Scan and ingest files.")
     ingest_parser.add_argument(
@@ -292,17 +345,22 @@ def main():
     elif args.command == "search":
         output_file = args.output
         logger.info(f"Searching for '{args.query}' in {args.directory}")
-        search_engine = SearchEngine(args.directory)
-        results = search_engine.search(args.query, method=args.method)
+        search_engine = SearchEngine(args.index_dir, args.index_dir / SEARCH_DB)
+        results = asyncio.run(
+            run_search(search_engine, args.query, args.method, args.limit)
+        )
         if output_file:
             asyncio.run(save_as_json_async(results, output_file))
             logger.info(f"Search results saved to {output_file}")
         else:
             for result in results:
-                print(f"{result['path']} - Score: {result['score']}")
-                if result.get("snippet"):
-                    print(f"  {result['snippet']}")
-                print()
+                print(result)
+
+    elif args.command == "reindex":
+        logger.info(f"Incrementally reindexing {args.directory}")
+        search_engine = SearchEngine(args.index_dir, args.index_dir / SEARCH_DB)
+        stats = asyncio.run(run_reindex(search_engine, args.directory))
+        logger.info(f"Reindex finished: {stats}")
 
     elif args.command == "ingest":
         include_patterns = set(args.include) if args.include else {"*"}
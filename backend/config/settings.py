@@ -180,8 +180,16 @@ DEFAULT_IGNORE_PATTERNS: list[str] = [
 
 # Cache settings
 CACHE_TTL = 3600  # 1 hour in seconds
-MAX_CACHE_SIZE = 1024 * 1024 * 100  # 100MB
+MAX_CACHE_SIZE = 1024 * 1024 * 100  # 100MB on disk; entries nearest expiry go first
+CACHE_SWEEP_INTERVAL = 60  # Seconds between expired-entry sweeps; 0 disables
+CACHE_SWEEP_BUDGET = 500  # Most entries removed per sweep
 MAX_MEMORY_CACHE_ITEMS = 1000
+MAX_MEMORY_CACHE_BYTES = 1024 * 1024 * 256  # 256MB of estimated value size
+CACHE_SERIALIZER = "pickle"  # "pickle", "msgpack" or "json"
+CACHE_COMPRESSION = "auto"  # "auto" (zstd, lz4, then zlib), a compressor, or "none"
+CACHE_COMPRESS_MIN_BYTES = 4096  # Smaller cache values are stored uncompressed
+CONTENT_CACHE_TTL = 60 * 60 * 24 * 30  # Parse results of unchanged files: 30 days
+CONTENT_CACHE_HASH = False  # Key parse results on a content hash, not mtime
 
 # File processing settings
 MAX_FILE_SIZE = 1024 * 1024 * 50  # 50MB
@@ -193,6 +201,50 @@ MAX_TOKENS = 8000  # Token limit for analysis
 MAX_SEARCH_RESULTS = 1000
 SEARCH_CACHE_TTL = 300  # 5 minutes
 MIN_SEARCH_TERM_LENGTH = 3
+SEARCH_INDEX_DIR = DATA_DIR / "search_index"  # CLI index, kept out of scanned trees
+WHOOSH_COMMIT_EVERY = 1000  # Documents per Whoosh commit during batch indexing
+WHOOSH_COMMIT_INTERVAL = 30.0  # Max seconds between Whoosh commits in a batch
+WHOOSH_WRITER_MEMORY_MB = 256  # RAM budget for the batch Whoosh writer
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"  # Recorded with the semantic index
+EMBEDDING_BATCH_SIZE = 128  # Texts encoded per model call during batch indexing
+EMBEDDING_CACHE_DTYPE = "float16"  # Storage dtype of the on-disk embedding cache
+SEMANTIC_INDEX_MMAP = True  # Memory-map the persisted FAISS index on load
+SEMANTIC_SAVE_INTERVAL = 30.0  # Max seconds single-file adds go unsaved
+SEMANTIC_INDEX_TYPE = "auto"  # "auto", "flat", "ivf_flat", "ivf_pq" or "hnsw"
+SEMANTIC_ANN_MIN_VECTORS = 50_000  # Below this, "auto" keeps exact flat search
+SEMANTIC_ANN_AUTO_TYPE = "hnsw"  # ANN type "auto" switches to above that size
+SEMANTIC_TRAIN_SAMPLE = 100_000  # Vectors sampled to train IVF/PQ indexes
+SEMANTIC_IVF_NLIST = None  # IVF cells; None picks about 4 * sqrt(vectors)
+SEMANTIC_IVF_NPROBE = 16  # IVF cells visited per query
+SEMANTIC_PQ_M = 48  # PQ sub-quantizers (reduced to a divisor of the dimension)
+SEMANTIC_HNSW_M = 32  # HNSW graph neighbours per node
+SEMANTIC_HNSW_EF_CONSTRUCTION = 200  # HNSW candidate list size while building
+SEMANTIC_HNSW_EF_SEARCH = 64  # HNSW candidate list size per query
+SEMANTIC_VECTOR_ENCODING = "float32"  # "float32", "float16", "int8" or "pq"
+SEMANTIC_RERANK_FACTOR = 4  # Quantized candidates per result re-ranked exactly; 0 off
+PASSAGE_MAX_TOKENS = 128  # Words per embedded passage
+PASSAGE_OVERLAP_TOKENS = 32  # Words shared by consecutive passages
+PASSAGE_MAX_PER_FILE = 1024  # Passages embedded per file; the rest is skipped
+PASSAGE_READ_BLOCK = 65536  # Characters read at a time when chunking a file
+HYBRID_RRF_K = 60  # Rank offset used by reciprocal rank fusion
+HYBRID_CANDIDATE_DEPTH = 50  # Results requested from each hybrid backend
+HYBRID_BACKEND_DEADLINES = {  # Seconds each backend may take in a hybrid search
+    "filename": 0.5,
+    "fuzzy": 0.5,
+    "fulltext": 1.0,
+    "semantic": 2.0,
+}
+HYBRID_FILTER_DEADLINE = 2.0  # Seconds allowed for the metadata filter query
+
+# Database settings
+SQLITE_READ_CONNECTIONS = 4  # Pooled read-only connections per database
+SQLITE_MMAP_SIZE = 1024 * 1024 * 256  # 256MB of the database file memory-mapped
+SQLITE_CACHE_SIZE_KB = 1024 * 64  # Page cache per connection (64MB)
+SQLITE_BUSY_TIMEOUT_MS = 5000  # Wait this long for a lock held elsewhere
+SQLITE_WRITE_BATCH_SIZE = 1000  # Queued writes that force a transaction flush
+SQLITE_WRITE_BATCH_MS = 5  # Max wait for more writes before committing a batch
+SQLITE_INSTRUMENT = False  # Record per-statement latency histograms
+SQLITE_SLOW_QUERY_MS = 100  # Log statements slower than this with their plan
 
 # Security settings
 PASSWORD_MIN_LENGTH = 12
@@ -222,6 +274,16 @@ MAX_PAGE_SIZE = 100
 # Performance settings
 THREAD_POOL_SIZE = os.cpu_count() or 4
 TASK_QUEUE_SIZE = 1000
+THREAD_POOL_AGING_SECONDS = 5.0  # Queued tasks gain one priority level per interval
+THREAD_POOL_LOW_PRIORITY_SHARE = 0.5  # Fraction of pool threads LOW tasks may hold
+PROCESS_POOL_SIZE = max(1, (os.cpu_count() or 2) - 1)  # Leave a core for the loop
+PROCESS_POOL_WARMUP_MODULES = [  # Imported by each worker process as it starts
+    "backend.file_reader.parsers",
+    "backend.project_reader.code_summary",
+]
+PROCESS_POOL_CHUNK_SIZE = 16  # Items sent to a worker per call in batch submission
+PROCESS_POOL_TASK_TIMEOUT = 300  # Seconds before a task's workers are killed
+PROCESS_POOL_MAX_MEMORY_MB = 1024  # Worker memory after a task that recycles workers
 RATE_LIMIT = {"default": 60, "search": 30, "batch": 10}  # requests per minute
 
 # Feature flags
@@ -5,7 +5,7 @@ import os
 from pathlib import Path
 from typing import Dict
 
-from backend.utils.cache_manager import cache_manager
+from backend.utils.cache_manager import get_cache_manager
 from backend.utils.safety import SafeFileHandler
 
 logger = logging.getLogger(__name__)
@@ -16,25 +16,25 @@ async def generate_file_tree(
     max_depth: int = 10,
     use_cache: bool = True,
     cache_ttl: int = 300,  # 5 minutes cache TTL
+    stale_ttl: int = 60,  # Serve an expired tree this long while refreshing
 ) -> Dict:
     """
     Generate a hierarchical representation of files and directories.
 
+    Concurrent calls for the same directory share a single walk, and a tree
+    that expired less than ``stale_ttl`` seconds ago is returned immediately
+    while it is rebuilt in the background.
+
     Args:
         directory_path: Root directory to process
         max_depth: Maximum directory depth to traverse
         use_cache: Whether to use caching
         cache_ttl: Cache time-to-live in seconds
+        stale_ttl: Seconds past expiry during which a cached tree is served
 
     Returns:
         Dict representation of the file tree
     """
-    # Check cache first if enabled
-    if use_cache:
-        cache_key = f"file_tree_{str(directory_path)}_{max_depth}"
-        cached_tree = await cache_manager.get(cache_key)
-        if cached_tree:
-            return cached_tree
 
     async def process_directory(path: Path, current_depth: int) -> Dict:
         """Process a directory and its contents recursively."""
@@ -93,14 +93,15 @@ async def generate_file_tree(
 
     # Generate the file tree
     try:
-        tree = await process_directory(directory_path, 0)
-
-        # Cache the result if caching is enabled
         if use_cache:
             cache_key = f"file_tree_{str(directory_path)}_{max_depth}"
-            await cache_manager.put(cache_key, tree)
-
-        return tree
+            return await get_cache_manager().get_or_compute(
+                cache_key,
+                lambda: process_directory(directory_path, 0),
+                ttl=cache_ttl,
+                stale_ttl=stale_ttl,
+            )
+        return await process_directory(directory_path, 0)
     except Exception as e:
         logger.error(f"Error generating file tree for {directory_path}: {e}")
         return {"type": "directory", "error": str(e)}
@@ -114,7 +115,9 @@ async def invalidate_file_tree_cache(directory_path: Path) -> None:
         directory_path: Directory whose cache should be invalidated
     """
     try:
-        await cache_manager.invalidate_pattern(f"file_tree_{str(directory_path)}")
+        await get_cache_manager().invalidate_prefix(
+            f"file_tree_{str(directory_path)}"
+        )
     except Exception as e:
         logger.error(f"Error invalidating file tree cache for {directory_path}: {e}")
 
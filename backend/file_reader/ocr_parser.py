@@ -4,6 +4,8 @@ from typing import Any, Dict
 
 from kreuzberg import extract_file
 
+from backend.utils.cache_manager import memoize_by_content
+
 logger = logging.getLogger(__name__)
 
 
@@ -12,6 +14,7 @@ class OCRParser:
     This parser extracts text from image files.
     """
 
+    @memoize_by_content()
     async def parse(self, file_path: Path) -> Dict[str, Any]:
         """Perform OCR on the image file.
 
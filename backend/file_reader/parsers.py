@@ -19,7 +19,7 @@ import xml.etree.ElementTree as ET
 import zipfile
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 
 import ezdxf
 import pandas as pd
@@ -30,11 +30,106 @@ import yaml
 from docx import Document
 from pypdf import PdfReader
 
+from backend.utils.cache_manager import memoize_by_content
+from backend.utils.concurrency import process_pool
+
 logger = logging.getLogger(__name__)
 
 
+# Blocking parse steps. They live at module level so that CPU-bound parsers
+# can send them to worker processes.
+def parse_pdf_sync(p):
+    reader = PdfReader(str(p))
+    text_content = []
+    for page in reader.pages:
+        text_content.append(page.extract_text())
+    return {
+        "content": "\n".join(text_content),
+        # Plain strings: pypdf's values refer back to the open reader.
+        "metadata": {key: str(value) for key, value in (reader.metadata or {}).items()},
+        "pages": len(reader.pages),
+    }
+
+
+def parse_docx_sync(p):
+    doc = Document(str(p))
+    content = "\n".join(para.text for para in doc.paragraphs)
+    return {
+        "content": content,
+        "metadata": {
+            "sections": len(doc.sections),
+            "paragraphs": len(doc.paragraphs),
+        },
+    }
+
+
+def parse_csv_sync(p):
+    df = pd.read_csv(p)
+    preview = df.head().to_string()
+    return {
+        "content": df.to_dict(),
+        "preview": preview,
+        "metadata": {
+            "rows": len(df),
+            "columns": len(df.columns),
+            "column_names": df.columns.tolist(),
+        },
+    }
+
+
+def parse_xlsx_sync(p):
+    df = pd.read_excel(p)
+    preview = df.head().to_string()
+    return {
+        "content": df.to_dict(),
+        "preview": preview,
+        "metadata": {
+            "rows": len(df),
+            "columns": len(df.columns),
+            "column_names": df.columns.tolist(),
+            "sheet_names": pd.ExcelFile(str(p)).sheet_names,
+        },
+    }
+
+
+def parse_ods_sync(p):
+    df = pd.read_excel(p, engine="odf")
+    preview = df.head().to_string()
+    return {
+        "content": df.to_dict(),
+        "preview": preview,
+        "metadata": {
+            "rows": len(df),
+            "columns": len(df.columns),
+            "column_names": df.columns.tolist(),
+        },
+    }
+
+
 class BaseParser(ABC):
-    """Abstract base class for file parsers."""
+    """Abstract base class for file parsers.
+
+    Parsers doing expensive extraction (PDF, DOCX, spreadsheets) decorate
+    ``parse`` with ``@memoize_by_content()`` so that unchanged files are not
+    parsed again; bump its ``version`` when a parser's output changes. Cheap
+    parsers read the file directly, as a cache lookup costs about as much.
+    Parsers whose blocking work is CPU-bound set ``cpu_bound``
+    so that :meth:`run_blocking` sends it to the process pool.
+    """
+
+    cpu_bound = False
+
+    async def run_blocking(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a blocking parse step without blocking the event loop.
+
+        :param func: Module-level function to run
+        :param args: Picklable arguments for the function
+        :return: The function's result
+        """
+        if self.cpu_bound:
+            return await process_pool.submit(func, *args)
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
 
     @abstractmethod
     async def parse(self, file_path: Path) -> Dict[str, Any]:
@@ -225,6 +320,9 @@ class XmlParser(BaseParser):
 class DocumentParser(BaseParser):
     """Parser for document files (PDF, DOCX, etc.)."""
 
+    cpu_bound = True
+
+    @memoize_by_content(version=2)  # 2: PDF metadata as plain strings
     async def parse(self, file_path: Path) -> Dict[str, Any]:
 
         suffix = file_path.suffix.lower()
@@ -240,38 +338,10 @@ class DocumentParser(BaseParser):
             raise
 
     async def _parse_pdf(self, file_path: Path) -> Dict[str, Any]:
-        loop = asyncio.get_running_loop()
-
-        def parse_pdf_sync(p):
-            reader = PdfReader(str(p))
-            text_content = []
-            for page in reader.pages:
-                text_content.append(page.extract_text())
-            return {
-                "content": "\n".join(text_content),
-                "metadata": reader.metadata,
-                "pages": len(reader.pages),
-            }
-
-        return await loop.run_in_executor(None, parse_pdf_sync, file_path)
+        return await self.run_blocking(parse_pdf_sync, file_path)
 
     async def _parse_docx(self, file_path: Path) -> Dict[str, Any]:
-        import asyncio
-
-        loop = asyncio.get_running_loop()
-
-        def parse_docx_sync(p):
-            doc = Document(str(p))
-            content = "\n".join(para.text for para in doc.paragraphs)
-            return {
-                "content": content,
-                "metadata": {
-                    "sections": len(doc.sections),
-                    "paragraphs": len(doc.paragraphs),
-                },
-            }
-
-        return await loop.run_in_executor(None, parse_docx_sync, file_path)
+        return await self.run_blocking(parse_docx_sync, file_path)
 
     def get_preview(self, parsed_data: Dict[str, Any], max_length: int = 1000) -> str:
         content = parsed_data.get("content", "")
@@ -281,6 +351,9 @@ class DocumentParser(BaseParser):
 class SpreadsheetParser(BaseParser):
     """Parser for spreadsheet files (CSV, XLSX, ODS)."""
 
+    cpu_bound = True
+
+    @memoize_by_content()
     async def parse(self, file_path: Path) -> Dict[str, Any]:
         suffix = file_path.suffix.lower()
         try:
@@ -297,62 +370,13 @@ class SpreadsheetParser(BaseParser):
             raise
 
     async def _parse_csv(self, file_path: Path) -> Dict[str, Any]:
-        import asyncio
-
-        def parse_csv_sync(p):
-            df = pd.read_csv(p)
-            preview = df.head().to_string()
-            return {
-                "content": df.to_dict(),
-                "preview": preview,
-                "metadata": {
-                    "rows": len(df),
-                    "columns": len(df.columns),
-                    "column_names": df.columns.tolist(),
-                },
-            }
-
-        loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, parse_csv_sync, file_path)
+        return await self.run_blocking(parse_csv_sync, file_path)
 
     async def _parse_xlsx(self, file_path: Path) -> Dict[str, Any]:
-        import asyncio
-
-        def parse_xlsx_sync(p):
-            df = pd.read_excel(p)
-            preview = df.head().to_string()
-            return {
-                "content": df.to_dict(),
-                "preview": preview,
-                "metadata": {
-                    "rows": len(df),
-                    "columns": len(df.columns),
-                    "column_names": df.columns.tolist(),
-                    "sheet_names": pd.ExcelFile(str(p)).sheet_names,
-                },
-            }
-
-        loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, parse_xlsx_sync, file_path)
+        return await self.run_blocking(parse_xlsx_sync, file_path)
 
     async def _parse_ods(self, file_path: Path) -> Dict[str, Any]:
-        import asyncio
-
-        def parse_ods_sync(p):
-            df = pd.read_excel(p, engine="odf")
-            preview = df.head().to_string()
-            return {
-                "content": df.to_dict(),
-                "preview": preview,
-                "metadata": {
-                    "rows": len(df),
-                    "columns": len(df.columns),
-                    "column_names": df.columns.tolist(),
-                },
-            }
-
-        loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, parse_ods_sync, file_path)
+        return await self.run_blocking(parse_ods_sync, file_path)
 
     def get_preview(self, parsed_data: Dict[str, Any], max_length: int = 1000) -> str:
         preview = parsed_data.get("preview", "")
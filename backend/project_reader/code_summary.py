@@ -6,14 +6,21 @@ import asyncio
 import json
 import logging
 from pathlib import Path
+from typing import List, Optional, Set, Tuple
 
+from backend.config.settings import PROCESS_POOL_CHUNK_SIZE
 from backend.output_formatter.json_writer import save_as_json
 from backend.output_formatter.markdown_writer import save_as_markdown
 from backend.utils.async_io import AsyncFileReader
+from backend.utils.cache_manager import memoize_by_content
+from backend.utils.concurrency import process_pool
 from backend.utils.safety import SafeFileHandler
 
 logger = logging.getLogger(__name__)
 
+# Seconds a parse waits for others to share its process-pool round trip.
+SUMMARY_BATCH_WINDOW = 0.05
+
 
 def get_function_metadata(node):
     """Extracts function metadata including decorators and return types."""
@@ -29,35 +36,114 @@ def get_function_metadata(node):
     }
 
 
-async def process_file(file_path: Path):
-    """Extracts function and class details from a Python file, including docstrings and line numbers."""
-    try:
-        code = await AsyncFileReader.read(file_path)
-        tree = ast.parse(code, filename=str(file_path))
-
-        file_summary = ast.get_docstring(tree) or "No summary available."
-        summaries = []
-
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                docstring = ast.get_docstring(node) or "No docstring provided."
-                summaries.append(
-                    {
-                        "name": node.name,
-                        "args": [arg.arg for arg in node.args.args],
-                        "lineno": node.lineno,
-                        "docstring": docstring,
-                    }
-                )
-
-        folder_name = file_path.parent.name  # Extracts the folder name
+def summarize_source(code: str, filename: str):
+    """Parses Python source into its module docstring and function summaries.
+
+    CPU-bound, so process_file runs it in the process pool.
+    """
+    tree = ast.parse(code, filename=filename)
+
+    file_summary = ast.get_docstring(tree) or "No summary available."
+    summaries = []
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef):
+            docstring = ast.get_docstring(node) or "No docstring provided."
+            summaries.append(
+                {
+                    "name": node.name,
+                    "args": [arg.arg for arg in node.args.args],
+                    "lineno": node.lineno,
+                    "docstring": docstring,
+                }
+            )
+    return file_summary, summaries
+
+
+def _summarize_item(item: Tuple[str, str]):
+    """Process-pool entry point for one ``(code, filename)`` pair."""
+    return summarize_source(*item)
+
+
+class _SourceBatch:
+    """Collects sources read during one summarize_code run for the process pool.
+
+    Queued sources are sent together through ``process_pool.submit_batch``
+    once there are enough to give every worker a chunk, or a short window
+    after the first was queued, so small files do not pay a round trip each.
+    """
+
+    def __init__(self, window: float = SUMMARY_BATCH_WINDOW):
+        self.size = PROCESS_POOL_CHUNK_SIZE * process_pool.max_workers
+        self.window = window
+        self._pending: List[Tuple[Tuple[str, str], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: Set[asyncio.Task] = set()
+
+    async def summarize(self, code: str, filename: str):
+        """Queue a source and wait for its summarize_source result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(((code, filename), future))
+        if len(self._pending) >= self.size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        if pending:
+            task = asyncio.ensure_future(self._run(pending))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _run(self, pending: List[Tuple[Tuple[str, str], asyncio.Future]]):
+        try:
+            results = await process_pool.submit_batch(
+                _summarize_item, [item for item, _ in pending]
+            )
+        except Exception as e:
+            results = [e] * len(pending)
+        for (_, future), result in zip(pending, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+@memoize_by_content()
+async def _summarize_file(file_path: Path, batch: Optional[_SourceBatch] = None):
+    """Summarizes a Python file; raises on failure so errors are not memoized."""
+    code = await AsyncFileReader.read(file_path)
+    if batch is None:
+        file_summary, summaries = await process_pool.submit(
+            summarize_source, code, str(file_path)
+        )
+    else:
+        file_summary, summaries = await batch.summarize(code, str(file_path))
 
-        return file_path.resolve().as_posix(), {
-            "summary": file_summary,
-            "folder": folder_name,
-            "functions": summaries,
-        }
+    folder_name = file_path.parent.name  # Extracts the folder name
 
+    return file_path.resolve().as_posix(), {
+        "summary": file_summary,
+        "folder": folder_name,
+        "functions": summaries,
+    }
+
+
+async def process_file(file_path: Path, batch: Optional[_SourceBatch] = None):
+    """Extracts function and class details from a Python file, including docstrings and line numbers.
+
+    Files that miss the cache are parsed through ``batch`` when one is given.
+    """
+    try:
+        return await _summarize_file(file_path, batch)
     except SyntaxError as e:
         logging.error(f"Syntax error in {file_path}: {e}")
         return file_path.resolve().as_posix(), {
@@ -90,7 +176,9 @@ async def summarize_code(directory: Path):
             f"No Python files found in {directory} after filtering ignored paths."
         )
 
-    tasks = [process_file(file) for file in python_files]
+    # Cache misses share chunked process-pool calls instead of one call each.
+    batch = _SourceBatch()
+    tasks = [process_file(file, batch) for file in python_files]
     results = await asyncio.gather(*tasks, return_exceptions=True)  # Handle errors
 
     valid_results = {}
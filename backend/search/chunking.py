@@ -0,0 +1,95 @@
+"""Streaming split of documents into overlapping passages for embedding."""
+
+import re
+from collections import deque
+from pathlib import Path
+from typing import Deque, Iterable, Iterator, NamedTuple, Tuple
+
+from backend.config.settings import (
+    PASSAGE_MAX_TOKENS,
+    PASSAGE_OVERLAP_TOKENS,
+    PASSAGE_READ_BLOCK,
+)
+
+TOKEN_RE = re.compile(r"\S+")
+# Longer runs without whitespace (minified code, base64) are cut into pieces
+# so that a single token never has to be buffered whole.
+MAX_TOKEN_CHARS = 1000
+
+
+class Passage(NamedTuple):
+    """A run of tokens and the character offset where it starts."""
+
+    offset: int
+    text: str
+
+
+def stream_text(path: Path, block_size: int = PASSAGE_READ_BLOCK) -> Iterator[str]:
+    """Yield a text file in blocks of ``block_size`` characters."""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        while block := f.read(block_size):
+            yield block
+
+
+def iter_passages(
+    blocks: Iterable[str],
+    max_tokens: int = PASSAGE_MAX_TOKENS,
+    overlap: int = PASSAGE_OVERLAP_TOKENS,
+) -> Iterator[Passage]:
+    """
+    Split streamed text into passages of at most ``max_tokens`` tokens.
+
+    Tokens are whitespace-delimited words, a cheap stand-in for the model's
+    subword tokens. Consecutive passages share ``overlap`` tokens so that text
+    near a boundary is embedded with its context. Only the current window is
+    held in memory, however long the document.
+
+    Args:
+        blocks: Document text in consecutive pieces
+        max_tokens: Maximum number of tokens per passage
+        overlap: Number of tokens repeated from the previous passage
+
+    Returns:
+        Iterator of passages with their character offsets in the document
+    """
+    if not 0 <= overlap < max_tokens:
+        raise ValueError("overlap must be non-negative and less than max_tokens")
+
+    window: Deque[Tuple[int, str]] = deque()
+    fresh = 0  # Tokens added since the last passage was emitted.
+    position = 0  # Offset of the start of the current block.
+    carry = ""  # Trailing token that may continue in the next block.
+
+    def add(offset: int, token: str) -> Iterator[Passage]:
+        nonlocal fresh
+        window.append((offset, token))
+        fresh += 1
+        if len(window) == max_tokens:
+            yield Passage(window[0][0], " ".join(token for _, token in window))
+            for _ in range(max_tokens - overlap):
+                window.popleft()
+            fresh = 0
+
+    for block in blocks:
+        text = carry + block
+        base = position - len(carry)
+        position += len(block)
+        matches = list(TOKEN_RE.finditer(text))
+        carry = ""
+        if (
+            matches
+            and matches[-1].end() == len(text)
+            and len(matches[-1].group()) < MAX_TOKEN_CHARS
+        ):
+            carry = matches.pop().group()
+        for match in matches:
+            token = match.group()
+            for cut in range(0, len(token), MAX_TOKEN_CHARS):
+                yield from add(
+                    base + match.start() + cut, token[cut : cut + MAX_TOKEN_CHARS]
+                )
+
+    if carry:
+        yield from add(position - len(carry), carry)
+    if fresh:
+        yield Passage(window[0][0], " ".join(token for _, token in window))
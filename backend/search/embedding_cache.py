@@ -0,0 +1,216 @@
+"""On-disk cache of text embeddings keyed by content hash and model name."""
+
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CACHE_DB = "embeddings.sqlite"
+SUPPORTED_DTYPES = ("float16", "float32")
+
+
+class EmbeddingCache:
+    """Content-addressed store of embeddings for a single model.
+
+    Vectors are appended to one flat matrix file per model and dtype, and an
+    SQLite table maps ``(model, dtype, content_hash)`` to the row offset in that
+    matrix. Lookups read rows through a memory map, so a mostly unchanged tree
+    can be re-indexed with hashing and lookups instead of model inference.
+    """
+
+    def __init__(self, directory: Path, model_name: str, dtype: str = "float16"):
+        """
+        Args:
+            directory: Directory holding the matrix files and offset index
+            model_name: Embedding model whose vectors are cached
+            dtype: Storage dtype for vectors, "float16" or "float32"
+        """
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported embedding cache dtype: {dtype}")
+        self.directory = directory
+        self.model_name = model_name
+        self.dtype = np.dtype(dtype)
+        slug = re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)
+        self.matrix_path = directory / f"{slug}.{dtype}.bin"
+        self.dimension: Optional[int] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._matrix: Optional[np.memmap] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def content_hash(text: str) -> str:
+        """Stable digest of the text an embedding was computed from."""
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=20).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.directory / CACHE_DB, check_same_thread=False)
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS models (
+                    model TEXT,
+                    dtype TEXT,
+                    dimension INTEGER,
+                    PRIMARY KEY (model, dtype)
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT,
+                    dtype TEXT,
+                    content_hash TEXT,
+                    row INTEGER,
+                    PRIMARY KEY (model, dtype, content_hash)
+                ) WITHOUT ROWID
+                """
+            )
+            conn.commit()
+            row = conn.execute(
+                "SELECT dimension FROM models WHERE model = ? AND dtype = ?",
+                (self.model_name, self.dtype.name),
+            ).fetchone()
+            self.dimension = row[0] if row else None
+            self._conn = conn
+        return self._conn
+
+    def _row_count(self) -> int:
+        if self.dimension is None or not self.matrix_path.exists():
+            return 0
+        row_bytes = self.dimension * self.dtype.itemsize
+        return self.matrix_path.stat().st_size // row_bytes
+
+    def _rows(self, needed: int) -> np.memmap:
+        """Memory map of the matrix covering at least ``needed`` rows."""
+        if self._matrix is None or self._matrix.shape[0] < needed:
+            self._matrix = np.memmap(
+                self.matrix_path,
+                dtype=self.dtype,
+                mode="r",
+                shape=(self._row_count(), self.dimension),
+            )
+        return self._matrix
+
+    def get_many(self, hashes: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Return cached float32 vectors for whichever hashes are present."""
+        if not hashes:
+            return {}
+        with self._lock:
+            conn = self._connect()
+            if self.dimension is None:
+                return {}
+            offsets: Dict[str, int] = {}
+            unique = list(dict.fromkeys(hashes))
+            # Stay well below SQLite's bound-parameter limit.
+            for start in range(0, len(unique), 500):
+                chunk = unique[start : start + 500]
+                placeholders = ",".join("?" for _ in chunk)
+                offsets.update(
+                    conn.execute(
+                        "SELECT content_hash, row FROM embeddings "
+                        "WHERE model = ? AND dtype = ? "
+                        f"AND content_hash IN ({placeholders})",
+                        (self.model_name, self.dtype.name, *chunk),
+                    ).fetchall()
+                )
+            if not offsets:
+                return {}
+            matrix = self._rows(max(offsets.values()) + 1)
+            return {
+                content_hash: np.asarray(matrix[row], dtype="float32")
+                for content_hash, row in offsets.items()
+            }
+
+    def put_many(self, hashes: Sequence[str], vectors: np.ndarray) -> None:
+        """Append vectors for the given content hashes."""
+        vectors = np.asarray(vectors).reshape(len(hashes), -1)
+        if not len(hashes):
+            return
+        with self._lock:
+            conn = self._connect()
+            if self.dimension is None:
+                self.dimension = vectors.shape[1]
+                conn.execute(
+                    "INSERT OR REPLACE INTO models (model, dtype, dimension) "
+                    "VALUES (?, ?, ?)",
+                    (self.model_name, self.dtype.name, self.dimension),
+                )
+            elif vectors.shape[1] != self.dimension:
+                raise ValueError(
+                    f"Embedding dimension {vectors.shape[1]} does not match "
+                    f"cached dimension {self.dimension}"
+                )
+            # Rows are numbered from the current file size, so vectors whose
+            # offsets were never committed are simply left unreferenced.
+            first_row = self._row_count()
+            with open(self.matrix_path, "ab") as f:
+                f.write(np.ascontiguousarray(vectors, dtype=self.dtype).tobytes())
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings "
+                "(model, dtype, content_hash, row) VALUES (?, ?, ?, ?)",
+                [
+                    (self.model_name, self.dtype.name, content_hash, first_row + i)
+                    for i, content_hash in enumerate(hashes)
+                ],
+            )
+            conn.commit()
+
+    def encode(
+        self, texts: List[str], encode_fn: Callable[[List[str]], np.ndarray]
+    ) -> np.ndarray:
+        """Embed ``texts``, only calling ``encode_fn`` for cache misses.
+
+        Args:
+            texts: Texts to embed
+            encode_fn: Computes embeddings for a list of texts
+
+        Returns:
+            Float32 matrix with one row per text
+        """
+        hashes = [self.content_hash(text) for text in texts]
+        try:
+            cached = self.get_many(hashes)
+        except Exception as e:
+            logger.error(f"Error reading embedding cache: {e}")
+            cached = {}
+
+        missing = [
+            i for i, content_hash in enumerate(hashes) if content_hash not in cached
+        ]
+        if missing:
+            computed = np.asarray(
+                encode_fn([texts[i] for i in missing]),
+                dtype="float32",
+            ).reshape(len(missing), -1)
+            new_hashes: Dict[str, np.ndarray] = {}
+            for i, vector in zip(missing, computed):
+                cached[hashes[i]] = vector
+                new_hashes.setdefault(hashes[i], vector)
+            try:
+                self.put_many(list(new_hashes), np.stack(list(new_hashes.values())))
+            except Exception as e:
+                logger.error(f"Error writing embedding cache: {e}")
+
+        logger.debug(
+            f"Embedding cache: {len(texts) - len(missing)} hits, {len(missing)} misses"
+        )
+        return np.stack([cached[content_hash] for content_hash in hashes]).astype(
+            "float32", copy=False
+        )
+
+    def close(self) -> None:
+        """Close the offset index and release the matrix mapping."""
+        with self._lock:
+            self._matrix = None
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
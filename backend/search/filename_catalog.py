@@ -0,0 +1,232 @@
+"""Resident filename catalog for fuzzy filename search."""
+
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from rapidfuzz import fuzz, process
+from rapidfuzz.utils import default_process
+
+logger = logging.getLogger(__name__)
+
+# Slots allocated up front, and blanked slots tolerated before compacting.
+_MIN_CAPACITY = 1024
+
+
+class FilenameCatalog:
+    """In-memory list of distinct filenames mapped back to all of their paths.
+
+    Names are preprocessed once when they enter the catalog, so a query only
+    runs the scorer over the prepared choices in a single
+    ``rapidfuzz.process.cdist`` call with the names as rows, spread across all
+    cores. Queries score a view of the choice arrays outside the lock, so they
+    never hold up index writes. The catalog is loaded once from the search
+    database and then kept current by the index write paths; writes made
+    while a load is reading the database are replayed over its rows.
+
+    New names are appended to arrays with spare capacity and removed names
+    are blanked in place, so a write never copies the catalog. A slot keeps
+    its name until the arrays are replaced by growth or compaction, so a
+    view taken by a query stays consistent while writes continue.
+    """
+
+    def __init__(self):
+        self.loaded = False
+        self._names = np.empty(0, dtype=object)
+        self._choices = np.empty(0, dtype=object)
+        self._lengths = np.empty(0, dtype=np.int32)
+        # Slots in use, including blanked ones.
+        self._size = 0
+        self._blanks = 0
+        self._paths: List[Set[str]] = []
+        self._slot_of_name: Dict[str, int] = {}
+        self._name_of_path: Dict[str, str] = {}
+        # (path, filename or None for a removal) written during a load.
+        self._pending: Optional[List[Tuple[str, Optional[str]]]] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._name_of_path)
+
+    def begin_load(self) -> None:
+        """Record writes from now on, for a load of rows read after this call."""
+        with self._lock:
+            if not self.loaded:
+                self._pending = []
+
+    def load(self, rows: Iterable[Tuple[str, str]]) -> None:
+        """
+        Replace the catalog contents with ``(filename, path)`` rows.
+
+        Writes recorded since :meth:`begin_load` are applied on top, so none
+        made while the rows were being read is lost.
+        """
+        with self._lock:
+            self._size = 0
+            self._blanks = 0
+            self._allocate(_MIN_CAPACITY)
+            self._paths = []
+            self._slot_of_name.clear()
+            self._name_of_path.clear()
+            for filename, path in rows:
+                self._add(filename, path)
+            for path, filename in self._pending or ():
+                if filename is None:
+                    self._remove(path)
+                else:
+                    self._add(filename, path)
+            self._pending = None
+            self.loaded = True
+        logger.info(f"Loaded filename catalog with {len(self)} paths")
+
+    def add(self, filename: str, path: str) -> None:
+        """Register ``path`` under ``filename``, replacing any previous name.
+
+        Ignored before a load has begun, since the load reads it from the
+        database.
+        """
+        with self._lock:
+            if self.loaded:
+                self._add(filename, path)
+            elif self._pending is not None:
+                self._pending.append((path, filename))
+
+    def remove(self, path: str) -> None:
+        """Forget ``path``; its name is dropped once no paths remain."""
+        with self._lock:
+            if self.loaded:
+                self._remove(path)
+            elif self._pending is not None:
+                self._pending.append((path, None))
+
+    def _allocate(self, capacity: int) -> None:
+        """Move the used slots into new arrays of ``capacity`` slots."""
+        names = np.empty(capacity, dtype=object)
+        choices = np.empty(capacity, dtype=object)
+        lengths = np.zeros(capacity, dtype=np.int32)
+        names[: self._size] = self._names[: self._size]
+        choices[: self._size] = self._choices[: self._size]
+        lengths[: self._size] = self._lengths[: self._size]
+        self._names, self._choices, self._lengths = names, choices, lengths
+
+    def _add(self, filename: str, path: str) -> None:
+        previous = self._name_of_path.get(path)
+        if previous == filename:
+            return
+        if previous is not None:
+            self._remove(path)
+
+        slot = self._slot_of_name.get(filename)
+        if slot is None:
+            if self._size == len(self._names):
+                self._allocate(max(_MIN_CAPACITY, 2 * self._size))
+            processed = default_process(filename)
+            slot = self._size
+            self._names[slot] = filename
+            self._choices[slot] = processed
+            self._lengths[slot] = len(processed)
+            self._paths.append(set())
+            self._size += 1
+            self._slot_of_name[filename] = slot
+        self._paths[slot].add(path)
+        self._name_of_path[path] = filename
+
+    def _remove(self, path: str) -> None:
+        filename = self._name_of_path.pop(path, None)
+        if filename is None:
+            return
+        slot = self._slot_of_name[filename]
+        self._paths[slot].discard(path)
+        if not self._paths[slot]:
+            # Blank the choice so the slot can never match again.
+            del self._slot_of_name[filename]
+            self._choices[slot] = ""
+            self._lengths[slot] = 0
+            self._blanks += 1
+            if self._blanks > _MIN_CAPACITY and 2 * self._blanks > self._size:
+                self._compact()
+
+    def _compact(self) -> None:
+        """Drop blanked slots, moving the live ones into new arrays."""
+        live = np.array(sorted(self._slot_of_name.values()), dtype=np.int64)
+        capacity = max(_MIN_CAPACITY, 2 * len(live))
+        self._names = _resized(self._names[live], capacity)
+        self._choices = _resized(self._choices[live], capacity)
+        self._lengths = _resized(self._lengths[live], capacity)
+        self._paths = [self._paths[slot] for slot in live]
+        self._slot_of_name = {
+            name: slot for slot, name in enumerate(self._names[: len(live)])
+        }
+        self._size = len(live)
+        self._blanks = 0
+
+    def search(
+        self,
+        query: str,
+        threshold: float = 80.0,
+        limit: Optional[int] = 5,
+        max_length_ratio: Optional[float] = None,
+    ) -> List[str]:
+        """
+        Return paths whose filename fuzzily matches ``query``.
+
+        Args:
+            query: Filename query
+            threshold: Minimum WRatio score (0-100) for a match
+            limit: Maximum number of distinct filenames to return, or None
+            max_length_ratio: Only score names whose processed length is
+                within this factor of the query length
+
+        Returns:
+            Paths of the best matching filenames, best match first
+        """
+        processed_query = default_process(query)
+        if not processed_query:
+            return []
+
+        with self._lock:
+            size = self._size
+            names = self._names[:size]
+            choices = self._choices[:size]
+            lengths = self._lengths[:size]
+        if not size:
+            return []
+        if max_length_ratio:
+            low = len(processed_query) / max_length_ratio
+            high = len(processed_query) * max_length_ratio
+            candidates = np.flatnonzero((lengths >= low) & (lengths <= high))
+            names = names[candidates]
+            choices = choices[candidates]
+            if not len(choices):
+                return []
+
+        # Names as rows, so cdist spreads a single query across its workers.
+        scores = process.cdist(
+            choices,
+            [processed_query],
+            scorer=fuzz.WRatio,
+            processor=None,
+            score_cutoff=threshold,
+            workers=-1,
+        )[:, 0]
+        matched = np.flatnonzero((scores >= threshold) & (scores > 0))
+        order = matched[np.argsort(-scores[matched], kind="stable")]
+        if limit is not None:
+            order = order[:limit]
+
+        results: List[str] = []
+        with self._lock:
+            # Names removed since the view was taken no longer resolve.
+            for name in names[order]:
+                slot = self._slot_of_name.get(name)
+                if slot is not None:
+                    results.extend(sorted(self._paths[slot]))
+        return results
+
+
+def _resized(array: np.ndarray, capacity: int) -> np.ndarray:
+    """Copy ``array`` into the front of a new array of ``capacity`` slots."""
+    resized = np.zeros(capacity, dtype=array.dtype)
+    resized[: len(array)] = array
+    return resized
@@ -0,0 +1,122 @@
+"""Manifest of indexed files used to detect changes between index runs."""
+
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from backend.ingest.scanner import scan_directory
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_SQL = """
+    CREATE TABLE IF NOT EXISTS index_manifest (
+        path TEXT PRIMARY KEY,
+        inode INTEGER,
+        size INTEGER,
+        mtime_ns INTEGER
+    ) WITHOUT ROWID
+    """
+UPSERT_MANIFEST_SQL = """
+    INSERT INTO index_manifest (path, inode, size, mtime_ns)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(path) DO UPDATE SET
+        inode = excluded.inode,
+        size = excluded.size,
+        mtime_ns = excluded.mtime_ns
+    """
+DELETE_MANIFEST_SQL = "DELETE FROM index_manifest WHERE path = ?"
+
+
+class FileSignature(NamedTuple):
+    """Cheap stat-based fingerprint of a file's content version."""
+
+    inode: int
+    size: int
+    mtime_ns: int
+
+    @classmethod
+    def from_stat(cls, stat: os.stat_result) -> "FileSignature":
+        return cls(stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+class ManifestDiff(NamedTuple):
+    """Paths that changed between the stored manifest and the disk."""
+
+    added: List[str]
+    modified: List[str]
+    removed: List[str]
+    unchanged: int
+
+
+def subtree_bounds(root: Path) -> Tuple[str, str]:
+    """Half-open string range covering every path below ``root``.
+
+    Lets SQLite answer "paths under root" with a primary key range scan
+    instead of a ``LIKE`` pattern, which would need escaping and a full scan.
+    """
+    prefix = str(root).rstrip(os.sep) + os.sep
+    return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+
+
+def scan_tree(
+    root: Path,
+    include_patterns: Optional[Set[str]] = None,
+    ignore_patterns: Optional[Set[str]] = None,
+    exclude: Iterable[Path] = (),
+) -> Dict[str, FileSignature]:
+    """
+    Stat every file below ``root`` that the ingest scanner would include.
+
+    Args:
+        root: Directory to scan
+        include_patterns: Patterns for files to include
+        ignore_patterns: Patterns for files to exclude
+        exclude: Files and directories to skip, such as the search index's
+            own storage when it lives inside ``root``
+
+    Returns:
+        Signature for each file path
+    """
+    excluded = {Path(path).resolve() for path in exclude}
+    resolved_root = root.resolve()
+    signatures: Dict[str, FileSignature] = {}
+    for path in scan_directory(root, include_patterns, ignore_patterns):
+        if excluded:
+            target = resolved_root / path.relative_to(root)
+            if target in excluded or not excluded.isdisjoint(target.parents):
+                continue
+        try:
+            signatures[str(path)] = FileSignature.from_stat(path.stat())
+        except OSError as e:
+            # The file vanished or became unreadable since the listing.
+            logger.warning(f"Cannot stat {path}: {e}")
+    return signatures
+
+
+def diff_manifest(
+    stored: Dict[str, FileSignature], current: Dict[str, FileSignature]
+) -> ManifestDiff:
+    """
+    Compare the stored manifest with the current state of the tree.
+
+    Args:
+        stored: Signatures recorded by the previous index run
+        current: Signatures found on disk now
+
+    Returns:
+        Added, modified and removed paths, plus the number left unchanged
+    """
+    added: List[str] = []
+    modified: List[str] = []
+    unchanged = 0
+    for path, signature in current.items():
+        previous = stored.get(path)
+        if previous is None:
+            added.append(path)
+        elif previous != signature:
+            modified.append(path)
+        else:
+            unchanged += 1
+    removed = [path for path in stored if path not in current]
+    return ManifestDiff(sorted(added), sorted(modified), sorted(removed), unchanged)
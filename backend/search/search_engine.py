@@ -1,35 +1,268 @@
 import asyncio
+import itertools
 import logging
+import threading
+import time
+import weakref
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Awaitable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
-import rapidfuzz
 import whoosh.analysis
 from whoosh.fields import ID, TEXT, Schema
-from whoosh.index import create_in, open_dir
+from whoosh.index import create_in, exists_in, open_dir
 from whoosh.qparser import QueryParser
 
+from backend.config.settings import (
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_CACHE_DTYPE,
+    EMBEDDING_MODEL_NAME,
+    HYBRID_BACKEND_DEADLINES,
+    HYBRID_CANDIDATE_DEPTH,
+    HYBRID_FILTER_DEADLINE,
+    HYBRID_RRF_K,
+    PASSAGE_MAX_PER_FILE,
+    SEMANTIC_INDEX_MMAP,
+    SEMANTIC_SAVE_INTERVAL,
+    WHOOSH_COMMIT_EVERY,
+    WHOOSH_COMMIT_INTERVAL,
+    WHOOSH_WRITER_MEMORY_MB,
+)
 from backend.file_reader.file_metadata import FileMetadata
 from backend.utils import AsyncFileIO
 from backend.utils.batch_processor import BatchProcessor
+from backend.utils.concurrency import run_detached
 from backend.utils.sqlasync_io import AsyncSQL
 
-# Import FAISS and SentenceTransformer for semantic search.
-try:
-    import faiss
-except ImportError:
-    raise ImportError("FAISS is not installed. Run `pip install faiss-cpu`.")
-try:
-    from sentence_transformers import SentenceTransformer
-except ImportError:
-    raise ImportError(
-        "sentence-transformers is not installed. Run `pip install sentence-transformers`."
-    )
+from .chunking import iter_passages, stream_text
+from .filename_catalog import FilenameCatalog
+from .index_manifest import (
+    DELETE_MANIFEST_SQL,
+    MANIFEST_SQL,
+    UPSERT_MANIFEST_SQL,
+    FileSignature,
+    diff_manifest,
+    scan_tree,
+    subtree_bounds,
+)
 
 logger = logging.getLogger(__name__)
 SEARCH_DB = "search_index.sqlite"
 
 
+def load_embedding_model(model_name: str):
+    """Import sentence-transformers and load ``model_name``.
+
+    The import pulls in torch, so it is deferred until semantic indexing or
+    search actually needs an embedding.
+    """
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        raise ImportError(
+            "sentence-transformers is not installed. Run `pip install sentence-transformers`."
+        )
+    logger.info(f"Loading embedding model {model_name}")
+    return SentenceTransformer(model_name)
+
+
+# Upsert rather than INSERT OR REPLACE: REPLACE deletes the old row without
+# firing delete triggers (which keep files_fts in sync) and reassigns its id.
+INSERT_FILE_SQL = """
+    INSERT INTO files (path, filename, extension, size, created_at, updated_at, tags)
+    VALUES (?, ?, ?, ?, datetime('now'), datetime('now'), ?)
+    ON CONFLICT(path) DO UPDATE SET
+        filename = excluded.filename,
+        extension = excluded.extension,
+        size = excluded.size,
+        updated_at = excluded.updated_at,
+        tags = excluded.tags
+    """
+
+# Trigram FTS5 index over filenames, kept in sync with `files` by triggers.
+FILENAME_FTS_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS files_fts USING fts5(
+        filename, content='files', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS files_fts_ai AFTER INSERT ON files BEGIN
+        INSERT INTO files_fts(rowid, filename) VALUES (new.id, new.filename);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS files_fts_ad AFTER DELETE ON files BEGIN
+        INSERT INTO files_fts(files_fts, rowid, filename)
+        VALUES ('delete', old.id, old.filename);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS files_fts_au AFTER UPDATE OF filename ON files BEGIN
+        INSERT INTO files_fts(files_fts, rowid, filename)
+        VALUES ('delete', old.id, old.filename);
+        INSERT INTO files_fts(rowid, filename) VALUES (new.id, new.filename);
+    END
+    """,
+]
+# One row per (tag, file); the primary key answers tag lookups and the
+# second index per-file rewrites. Rows follow their file out by trigger.
+FILE_TAGS_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS file_tags (
+        file_id INTEGER NOT NULL,
+        tag TEXT NOT NULL COLLATE NOCASE,
+        PRIMARY KEY (tag, file_id)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_file_tags_file ON file_tags(file_id, tag)",
+    """
+    CREATE TRIGGER IF NOT EXISTS file_tags_ad AFTER DELETE ON files BEGIN
+        DELETE FROM file_tags WHERE file_id = old.id;
+    END
+    """,
+]
+INSERT_TAG_SQL = "INSERT OR IGNORE INTO file_tags (file_id, tag) VALUES (?, ?)"
+# The trigram tokenizer can only use its index for at least three characters.
+TRIGRAM_MIN_QUERY_LENGTH = 3
+
+# Passage vectors are numbered file_id * PASSAGE_ID_STRIDE + passage number,
+# so a file's passages share a contiguous id range derived from files.id.
+PASSAGE_ID_STRIDE = 1 << 16
+
+
+def normalize_tags(tags: Iterable[str]) -> List[str]:
+    """Strip tags and drop empty and case-insensitive duplicates, keeping order."""
+    seen: Dict[str, str] = {}
+    for tag in tags:
+        tag = tag.strip()
+        if tag and tag.casefold() not in seen:
+            seen[tag.casefold()] = tag
+    return list(seen.values())
+
+
+def passage_id(file_id: int, number: int) -> int:
+    """Vector id of passage ``number`` of the file with ``files.id`` file_id."""
+    return file_id * PASSAGE_ID_STRIDE + number
+
+
+HYBRID_BACKENDS = ("filename", "fuzzy", "fulltext", "semantic")
+
+
+class BatchIndexWriter:
+    """Single long-lived Whoosh writer for bulk ingestion.
+
+    Documents are streamed through one writer which commits every
+    ``commit_every`` documents or ``commit_interval`` seconds, whichever comes
+    first, instead of opening a writer and creating a segment per file.
+    Intermediate commits skip merging; segments are merged on :meth:`close`.
+
+    A Whoosh writer is unusable after a document fails to add, and committing
+    it corrupts the documents added before. The writer is therefore cancelled
+    and the documents since the last commit, which are kept in memory for
+    this, are written again to a fresh one without the failing document.
+    :meth:`take_committed` reports which paths have actually been committed.
+    """
+
+    def __init__(
+        self,
+        index,
+        commit_every: int = WHOOSH_COMMIT_EVERY,
+        commit_interval: float = WHOOSH_COMMIT_INTERVAL,
+        limitmb: int = WHOOSH_WRITER_MEMORY_MB,
+    ):
+        self.index = index
+        self.commit_every = max(1, commit_every)
+        self.commit_interval = commit_interval
+        self.limitmb = limitmb
+        self.commits = 0
+        self.documents_written = 0
+        self._writer = None
+        self._uncommitted: List[Tuple[str, str]] = []
+        self._committed: List[str] = []
+        self._last_commit = time.monotonic()
+
+    def add_documents(self, documents: Iterable[Tuple[str, str]]) -> List[str]:
+        """Add (path, content) pairs, committing whenever a threshold is hit.
+
+        Returns:
+            Paths of the documents Whoosh rejected, which were skipped
+
+        Raises:
+            Exception: If the writer cannot be opened or a commit fails; the
+                documents not yet committed are then discarded
+        """
+        failed: List[str] = []
+        for path, content in documents:
+            if self._writer is None:
+                self._writer = self.index.writer(limitmb=self.limitmb)
+            try:
+                # update_document keeps re-indexed paths unique.
+                self._writer.update_document(path=path, content=content)
+            except Exception as e:
+                logger.error(f"Error adding {path} to the full-text index: {e}")
+                failed.append(path)
+                self._rewrite_uncommitted()
+                continue
+            self._uncommitted.append((path, content))
+            self.documents_written += 1
+            if (
+                len(self._uncommitted) >= self.commit_every
+                or time.monotonic() - self._last_commit >= self.commit_interval
+            ):
+                self._commit(merge=False)
+        return failed
+
+    def _rewrite_uncommitted(self) -> None:
+        """Replace a writer broken by a failed add with a fresh one."""
+        documents = self._uncommitted
+        self.cancel()
+        self._writer = self.index.writer(limitmb=self.limitmb)
+        for path, content in documents:
+            self._writer.update_document(path=path, content=content)
+        self._uncommitted = documents
+
+    def _commit(self, merge: bool, optimize: bool = False) -> None:
+        if self._writer is not None:
+            try:
+                self._writer.commit(merge=merge, optimize=optimize)
+            except Exception:
+                self.cancel()
+                raise
+            self.commits += 1
+        self._committed.extend(path for path, _ in self._uncommitted)
+        self._writer = None
+        self._uncommitted = []
+        self._last_commit = time.monotonic()
+
+    def take_committed(self) -> List[str]:
+        """Paths committed since the previous call, in commit order."""
+        committed, self._committed = self._committed, []
+        return committed
+
+    def cancel(self) -> None:
+        """Discard uncommitted documents and release the index lock."""
+        self._uncommitted = []
+        if self._writer is not None:
+            try:
+                self._writer.cancel()
+            finally:
+                self._writer = None
+
+    def close(self, optimize: bool = False) -> None:
+        """Commit pending documents and merge the segments written so far.
+
+        Args:
+            optimize: Merge the whole index into a single segment instead of
+                only collapsing small segments.
+        """
+        if self._writer is None and self.commits == 0:
+            return
+        if self._writer is None:
+            # Everything is committed; open a writer just to merge segments.
+            self._writer = self.index.writer(limitmb=self.limitmb)
+        self._commit(merge=True, optimize=optimize)
+
+
 class SearchEngine:
     """Handles filename, full-text, metadata, fuzzy, and semantic search using asynchronous SQL operations.
 
@@ -43,14 +276,122 @@ class SearchEngine:
             path=ID(stored=True, unique=True),
             content=TEXT(stored=False, analyzer=whoosh.analysis.StemmingAnalyzer()),
         )
-        self._initialize_index()
-        self._initialize_database_sync()
-        self.async_db = AsyncSQL(db_path)  # Async SQL utility
+        # Every backend is opened on first use so that, for example, a
+        # filename query never opens Whoosh or loads the embedding model.
+        self._index = None
+        self._async_db: Optional[AsyncSQL] = None
+        self._embedding_model = None
+        self._semantic_index = None
+        self._embedding_cache = None
+        self._semantic_saved_at = time.monotonic()
+        self._warm_up_thread: Optional[threading.Thread] = None
+        self._filename_fts = False
+        self.filename_catalog = FilenameCatalog()
+        self._init_lock = threading.Lock()
+        # asyncio locks by event loop, created on first use in each loop.
+        self._loop_locks: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def _loop_lock(self, name: str) -> asyncio.Lock:
+        """Return the lock called ``name`` for the running event loop.
+
+        An asyncio lock is bound to one loop, so an engine used from several
+        ``asyncio.run`` calls gets a fresh lock in each rather than sharing
+        one whose waiters belong to another loop.
+        """
+        locks = self._loop_locks.setdefault(asyncio.get_running_loop(), {})
+        if name not in locks:
+            locks[name] = asyncio.Lock()
+        return locks[name]
+
+    @property
+    def _index_write_lock(self) -> asyncio.Lock:
+        # Whoosh allows one writer at a time and fails at once with LockError
+        # otherwise, so full-text writes queue here instead; a batch holds the
+        # lock until it finishes.
+        return self._loop_lock("index_write")
+
+    @property
+    def _catalog_load_lock(self) -> asyncio.Lock:
+        # Concurrent first fuzzy queries share one catalog load.
+        return self._loop_lock("catalog_load")
+
+    @property
+    def index(self):
+        """Whoosh full-text index, opened or created on first access."""
+        if self._index is None:
+            with self._init_lock:
+                if self._index is None:
+                    self._initialize_index()
+        return self._index
+
+    @index.setter
+    def index(self, value):
+        self._index = value
+
+    @property
+    def async_db(self) -> AsyncSQL:
+        """Async SQL utility; the schema is created on first access."""
+        if self._async_db is None:
+            with self._init_lock:
+                if self._async_db is None:
+                    self._initialize_database_sync()
+                    self._async_db = AsyncSQL(self.db_path)
+        return self._async_db
+
+    async def close(self) -> None:
+        """Save the semantic index and close the pooled database connections.
+
+        Connections reopen on next use.
+        """
+        await self.save_semantic_index()
+        async_db, self._async_db = self._async_db, None
+        if async_db is not None:
+            await async_db.close()
+
+    @property
+    def embedding_model(self):
+        """Sentence embedding model, loaded on first access."""
+        if self._embedding_model is None:
+            with self._init_lock:
+                if self._embedding_model is None:
+                    self._embedding_model = load_embedding_model(EMBEDDING_MODEL_NAME)
+        return self._embedding_model
+
+    @embedding_model.setter
+    def embedding_model(self, value):
+        self._embedding_model = value
+
+    @property
+    def semantic_index(self):
+        """FAISS index persisted under index_dir/semantic, loaded on first access."""
+        if self._semantic_index is None:
+            with self._init_lock:
+                if self._semantic_index is None:
+                    from .semantic_index import SemanticIndex
 
-        # Initialize semantic search components.
-        self.embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
-        self.semantic_index = None  # FAISS index instance.
-        self.semantic_mapping: List[str] = []  # Maps vector IDs to file paths.
+                    semantic_index = SemanticIndex(
+                        self.index_dir / "semantic",
+                        EMBEDDING_MODEL_NAME,
+                        mmap=SEMANTIC_INDEX_MMAP,
+                    )
+                    semantic_index.load()
+                    self._semantic_index = semantic_index
+        return self._semantic_index
+
+    @property
+    def embedding_cache(self):
+        """On-disk embedding cache under index_dir/embedding_cache."""
+        if self._embedding_cache is None:
+            with self._init_lock:
+                if self._embedding_cache is None:
+                    from .embedding_cache import EmbeddingCache
+
+                    self._embedding_cache = EmbeddingCache(
+                        self.index_dir / "embedding_cache",
+                        EMBEDDING_MODEL_NAME,
+                        dtype=EMBEDDING_CACHE_DTYPE,
+                    )
+        return self._embedding_cache
 
     def _initialize_index(self):
         """Ensure Whoosh full-text search index is initialized correctly."""
@@ -58,18 +399,37 @@ class SearchEngine:
             if not self.index_dir.exists():
                 self.index_dir.mkdir(parents=True, exist_ok=True)
                 self.index = create_in(self.index_dir, self.schema)
-            elif not any(self.index_dir.iterdir()):
+            elif not exists_in(self.index_dir):
                 self.index = create_in(self.index_dir, self.schema)
             else:
                 self.index = open_dir(self.index_dir)
         except Exception as e:
             logger.error(f"Whoosh index is missing or corrupted: {e}")
             self.index = create_in(self.index_dir, self.schema)
+            self._reset_manifest_sync()
+
+    def _reset_manifest_sync(self):
+        """Forget recorded file signatures so the next reindex reads every file."""
+        import sqlite3
+
+        if not Path(self.db_path).exists():
+            return
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute(MANIFEST_SQL)
+            conn.execute("DELETE FROM index_manifest")
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error resetting index manifest: {e}")
+        finally:
+            conn.close()
 
     def _initialize_database_sync(self):
         """Initialize SQLite database for metadata and fuzzy search synchronously."""
         import sqlite3
 
+        # SQLite creates the file but not missing parent directories.
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         cursor.execute(
@@ -87,191 +447,981 @@ class SearchEngine:
             """
         )
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_filename ON files(filename);")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tags ON files(tags);")
+        # Tag filters use file_tags; an index on the joined string never helped.
+        cursor.execute("DROP INDEX IF EXISTS idx_tags")
+        cursor.execute(MANIFEST_SQL)
+        self._initialize_file_tags(cursor)
+        self._filename_fts = self._initialize_filename_fts(cursor)
         conn.commit()
         conn.close()
 
+    @staticmethod
+    def _initialize_file_tags(cursor) -> None:
+        """Create the tag table, splitting tags of rows written before it."""
+        existed = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'file_tags'"
+        ).fetchone()
+        for statement in FILE_TAGS_SQL:
+            cursor.execute(statement)
+        if not existed:
+            rows = cursor.execute(
+                "SELECT id, tags FROM files WHERE tags IS NOT NULL AND tags != ''"
+            ).fetchall()
+            cursor.executemany(
+                INSERT_TAG_SQL,
+                [
+                    (file_id, tag)
+                    for file_id, tags in rows
+                    for tag in normalize_tags(tags.split(","))
+                ],
+            )
+
+    @staticmethod
+    def _initialize_filename_fts(cursor) -> bool:
+        """Create the trigram filename index, returning False if unsupported."""
+        import sqlite3
+
+        try:
+            existed = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'files_fts'"
+            ).fetchone()
+            for statement in FILENAME_FTS_SQL:
+                cursor.execute(statement)
+            if not existed:
+                # Index rows written before the FTS table existed.
+                cursor.execute("INSERT INTO files_fts(files_fts) VALUES ('rebuild')")
+            return True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"FTS5 trigram index unavailable, using LIKE scans: {e}")
+            return False
+
+    async def _prepare_document(
+        self, file_metadata: FileMetadata
+    ) -> Optional[Tuple[FileMetadata, str]]:
+        """Resolve the text to index for a file, or None if it should be skipped."""
+        if not file_metadata.path.exists():
+            logger.warning(f"Skipping non-existent file: {file_metadata.path}")
+            return None
+
+        # Use AsyncFileIO to read file content if preview is empty.
+        preview_content = file_metadata.preview
+        if not preview_content and file_metadata.mime_type.startswith("text/"):
+            preview_content = await AsyncFileIO.read(file_metadata.path)
+            if preview_content.startswith("# "):
+                logger.warning(f"Error reading content for indexing: {preview_content}")
+                preview_content = f"[File content error: {file_metadata.path}]"
+        return file_metadata, preview_content or ""
+
+    @staticmethod
+    def _file_row(file_metadata: FileMetadata) -> Tuple:
+        """Build the parameters for ``INSERT_FILE_SQL``."""
+        # Convert custom tags (if provided) into a comma-separated string.
+        tags_str = ""
+        if hasattr(file_metadata, "tags") and file_metadata.tags:
+            tags_str = ",".join(file_metadata.tags)
+        return (
+            str(file_metadata.path),
+            file_metadata.path.name,
+            file_metadata.extension,
+            file_metadata.size,
+            tags_str,
+        )
+
+    async def _write_tags(self, metadata_list: List[FileMetadata]) -> None:
+        """Replace the ``file_tags`` rows of freshly upserted files."""
+        ids = await self._file_ids([str(metadata.path) for metadata in metadata_list])
+        if not ids:
+            return
+        await self.async_db.executemany(
+            "DELETE FROM file_tags WHERE file_id = ?",
+            [(file_id,) for file_id in ids.values()],
+        )
+        rows = [
+            (ids[str(metadata.path)], tag)
+            for metadata in metadata_list
+            if str(metadata.path) in ids
+            for tag in normalize_tags(getattr(metadata, "tags", None) or ())
+        ]
+        if rows:
+            await self.async_db.executemany(INSERT_TAG_SQL, rows)
+
+    @staticmethod
+    def _wants_embedding(file_metadata: FileMetadata, content: str) -> bool:
+        return file_metadata.mime_type.startswith("text") and bool(content)
+
+    async def _add_semantic(self, file_metadata: FileMetadata, content: str) -> None:
+        """Compute an embedding for a text document and add it to FAISS."""
+        await self._add_semantic_batch([(file_metadata, content)])
+
+    async def _add_semantic_batch(
+        self,
+        documents: List[Tuple[FileMetadata, str]],
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+    ) -> None:
+        """Embed the passages of text documents and store them in FAISS.
+
+        Each document is streamed from disk and split into overlapping
+        passages (see :func:`iter_passages`), so memory stays bounded by the
+        batch rather than the document size. Passages from consecutive
+        documents are encoded ``batch_size`` at a time. A document's previous
+        passages are dropped first, so re-indexing replaces them.
+        """
+        documents = [
+            (metadata, content)
+            for metadata, content in documents
+            if self._wants_embedding(metadata, content)
+        ]
+        if not documents:
+            return
+        paths = [str(metadata.path) for metadata, _ in documents]
+        ids = await self._file_ids(paths)
+        missing = len(paths) - len(ids)
+        if missing:
+            logger.warning(f"Skipping embeddings for {missing} files without a row")
+        semantic_index = await asyncio.to_thread(lambda: self.semantic_index)
+        await asyncio.to_thread(semantic_index.remove, [p for p in paths if p in ids])
+
+        max_passages = min(PASSAGE_MAX_PER_FILE, PASSAGE_ID_STRIDE)
+        pending: List[Tuple[int, str, int, str]] = []
+        for metadata, content in documents:
+            path = str(metadata.path)
+            if path not in ids:
+                continue
+            source = await asyncio.to_thread(self._passage_source, metadata, content)
+            passages = enumerate(iter_passages(source))
+            while True:
+                # Read and split the next slice of the document off the loop.
+                chunk = await asyncio.to_thread(
+                    list, itertools.islice(passages, batch_size - len(pending))
+                )
+                for number, passage in chunk:
+                    if number >= max_passages:
+                        logger.warning(
+                            f"Embedding only the first {max_passages} "
+                            f"passages of {path}"
+                        )
+                        chunk = []
+                        break
+                    pending.append(
+                        (
+                            passage_id(ids[path], number),
+                            path,
+                            passage.offset,
+                            passage.text,
+                        )
+                    )
+                if len(pending) >= batch_size:
+                    await self._embed_passages(semantic_index, pending)
+                    pending = []
+                if not chunk:
+                    break
+        if pending:
+            await self._embed_passages(semantic_index, pending)
+
+    @staticmethod
+    def _passage_source(metadata: FileMetadata, content: str) -> Iterable[str]:
+        """Stream a text file from disk, falling back to the prepared content."""
+        try:
+            blocks = stream_text(metadata.path)
+            first = next(blocks, None)
+        except OSError as e:
+            logger.warning(f"Embedding preview of unreadable file {metadata.path}: {e}")
+            return [content]
+        if first is None:
+            return [content]
+        return itertools.chain([first], blocks)
+
+    async def _embed_passages(
+        self, semantic_index, passages: List[Tuple[int, str, int, str]]
+    ) -> None:
+        """Encode ``(id, path, offset, text)`` passages and add them to FAISS."""
+        # Unchanged text is served from the embedding cache; only cache
+        # misses reach the model, which is loaded on the first miss.
+        embeddings = await asyncio.to_thread(
+            self.embedding_cache.encode,
+            [text for _, _, _, text in passages],
+            lambda batch: self.embedding_model.encode(
+                batch, batch_size=len(batch), convert_to_numpy=True
+            ),
+        )
+        await asyncio.to_thread(
+            semantic_index.add,
+            embeddings,
+            [id_ for id_, _, _, _ in passages],
+            [path for _, path, _, _ in passages],
+            [offset for _, _, offset, _ in passages],
+        )
+
+    async def _file_ids(self, paths: List[str]) -> Dict[str, int]:
+        """Map indexed paths to their ``files.id``, which keys their vectors."""
+        ids: Dict[str, int] = {}
+        # Stay well below SQLite's bound-parameter limit.
+        for start in range(0, len(paths), 500):
+            chunk = paths[start : start + 500]
+            placeholders = ",".join("?" for _ in chunk)
+            rows = await self.async_db.fetchall(
+                f"SELECT path, id FROM files WHERE path IN ({placeholders})",
+                tuple(chunk),
+            )
+            ids.update(rows)
+        return ids
+
+    async def save_semantic_index(self) -> bool:
+        """Persist the semantic index if it has unsaved vectors.
+
+        The index is first given the chance to change type or retrain (see
+        :meth:`SemanticIndex.optimize`), so ANN structures follow the corpus
+        size as it grows.
+        """
+        if self._semantic_index is None or not self._semantic_index.dirty:
+            return True
+
+        def optimize_and_save() -> bool:
+            try:
+                self._semantic_index.optimize()
+            except Exception as e:
+                logger.error(f"Error optimizing semantic index: {e}")
+            return self._semantic_index.save()
+
+        self._semantic_saved_at = time.monotonic()
+        return await asyncio.to_thread(optimize_and_save)
+
+    async def _save_semantic_index_debounced(self) -> None:
+        """Save the semantic index at most every ``SEMANTIC_SAVE_INTERVAL``.
+
+        Each save rewrites the whole index, so single-file adds leave their
+        vectors to the next save, to the end of a batch or to :meth:`close`.
+        """
+        if time.monotonic() - self._semantic_saved_at >= SEMANTIC_SAVE_INTERVAL:
+            await self.save_semantic_index()
+
+    async def semantic_recall_report_async(
+        self,
+        queries: Optional[List[str]] = None,
+        sample: int = 100,
+        k: int = 10,
+        index_types: Optional[Sequence[str]] = None,
+        encodings: Optional[Sequence[str]] = None,
+    ) -> List[Dict]:
+        """
+        Compare recall and latency of semantic index settings.
+
+        :param queries: Query texts to evaluate; when omitted, ``sample``
+            stored vectors are used as queries.
+        :param sample: Number of stored vectors to sample if no queries given.
+        :param k: Number of neighbours to evaluate.
+        :param index_types: Index types to compare; defaults to the current one.
+        :param encodings: Vector encodings to compare; defaults to the current one.
+        :return: Rows as returned by :meth:`SemanticIndex.recall_report`.
+        """
+        semantic_index = await asyncio.to_thread(lambda: self.semantic_index)
+        if semantic_index.ntotal == 0:
+            return []
+        if queries:
+            vectors = await asyncio.to_thread(
+                lambda: self.embedding_model.encode(queries, convert_to_numpy=True)
+            )
+        else:
+            vectors = await asyncio.to_thread(
+                semantic_index.sample_vectors, None, sample
+            )
+        return await asyncio.to_thread(
+            lambda: semantic_index.recall_report(
+                vectors, k, index_types, encodings=encodings
+            )
+        )
+
     async def add_to_index_async(self, file_metadata: FileMetadata):
         """Asynchronously index a file in Whoosh, SQLite, and the semantic search index."""
         try:
-            if not file_metadata.path.exists():
-                logger.warning(f"Skipping non-existent file: {file_metadata.path}")
+            prepared = await self._prepare_document(file_metadata)
+            if prepared is None:
                 return
-
-            # Use AsyncFileIO to read file content if preview is empty.
-            preview_content = file_metadata.preview
-            if not preview_content and file_metadata.mime_type.startswith("text/"):
-                preview_content = await AsyncFileIO.read(file_metadata.path)
-                if preview_content.startswith("# "):
-                    logger.warning(
-                        f"Error reading content for indexing: {preview_content}"
-                    )
-                    preview_content = f"[File content error: {file_metadata.path}]"
+            _, preview_content = prepared
 
             # Whoosh indexing (run in a separate thread).
             def index_document():
                 writer = self.index.writer()
-                writer.add_document(
-                    path=str(file_metadata.path), content=preview_content or ""
+                writer.update_document(
+                    path=str(file_metadata.path), content=preview_content
                 )
                 writer.commit(merge=False)
 
-            await asyncio.to_thread(index_document)
-
-            # Convert custom tags (if provided) into a comma-separated string.
-            tags_str = ""
-            if hasattr(file_metadata, "tags") and file_metadata.tags:
-                tags_str = ",".join(file_metadata.tags)
+            async with self._index_write_lock:
+                await asyncio.to_thread(index_document)
 
             # Asynchronous SQLite insertion.
-            sql = """
-                    INSERT OR REPLACE INTO files (path, filename, extension, size, created_at, updated_at, tags)
-                    VALUES (?, ?, ?, ?, datetime('now'), datetime('now'), ?)
-                    """
-            params = (
-                str(file_metadata.path),
-                file_metadata.path.name,
-                file_metadata.extension,
-                file_metadata.size,
-                tags_str,
+            await self.async_db.execute(
+                INSERT_FILE_SQL, self._file_row(file_metadata), commit=True
             )
-            await self.async_db.execute(sql, params, commit=True)
+            await self._write_tags([file_metadata])
+            self._update_filename_catalog([file_metadata])
 
             # Semantic indexing: compute embedding and add to FAISS index.
-            if file_metadata.mime_type.startswith("text") and preview_content:
-                embedding = await asyncio.to_thread(
-                    self.embedding_model.encode, preview_content
-                )
-                import numpy as np
-
-                embedding = np.array(embedding, dtype="float32").reshape(1, -1)
-                dim = embedding.shape[1]
-                if self.semantic_index is None:
-                    self.semantic_index = faiss.IndexFlatL2(dim)
-                self.semantic_index.add(embedding)
-                self.semantic_mapping.append(str(file_metadata.path))
+            await self._add_semantic(file_metadata, preview_content)
+            await self._save_semantic_index_debounced()
         except Exception as e:
             logger.error(f"Error indexing file {file_metadata.path}: {e}")
 
     async def search_filename_async(self, query: str) -> List[str]:
-        """Asynchronously search for files by exact or partial filename match."""
-        sql = "SELECT path FROM files WHERE filename LIKE ?"
-        rows = await self.async_db.fetchall(sql, (f"%{query}%",))
+        """Asynchronously search for files by exact or partial filename match.
+
+        Queries of three or more characters are answered from the trigram
+        FTS5 index; shorter queries fall back to a LIKE scan of ``files``.
+        """
+        async_db = self.async_db
+        if self._filename_fts and len(query) >= TRIGRAM_MIN_QUERY_LENGTH:
+            sql = """
+                SELECT f.path FROM files_fts
+                JOIN files f ON f.id = files_fts.rowid
+                WHERE files_fts.filename LIKE ?
+                """
+        else:
+            sql = "SELECT path FROM files WHERE filename LIKE ?"
+        rows = await async_db.fetchall(sql, (f"%{query}%",))
         return [Path(row[0]).as_posix() for row in rows]
 
+    def _update_filename_catalog(self, file_metadata: Iterable[FileMetadata]) -> None:
+        """Keep the filename catalog in step with index writes."""
+        for metadata in file_metadata:
+            self.filename_catalog.add(metadata.path.name, str(metadata.path))
+
     async def fuzzy_search_async(
-        self, query: str, threshold: float = 80.0
+        self,
+        query: str,
+        threshold: float = 80.0,
+        limit: Optional[int] = 5,
+        max_length_ratio: Optional[float] = None,
     ) -> List[str]:
-        """Asynchronously perform fuzzy search on filenames using RapidFuzz."""
-        sql = "SELECT filename, path FROM files"
-        all_files = await self.async_db.fetchall(sql)
-        mapping = {filename: path for filename, path in all_files}
-        matches = rapidfuzz.process.extract(query, mapping, score_cutoff=threshold)
-        return [match[2] for match in matches]
-
-    def full_text_search(self, query: str) -> List[str]:
+        """Asynchronously perform fuzzy search on filenames using RapidFuzz.
+
+        Matching runs against the resident :class:`FilenameCatalog`, which is
+        read from SQLite on the first query and updated by index writes.
+
+        :param query: Filename to match approximately.
+        :param threshold: Minimum score (0-100) for a match.
+        :param limit: Maximum number of distinct filenames to return.
+        :param max_length_ratio: Optional length prefilter, see
+            :meth:`FilenameCatalog.search`.
+        :return: Paths of every file whose name matched, best match first.
+        """
+        if not self.filename_catalog.loaded:
+            async with self._catalog_load_lock:
+                if not self.filename_catalog.loaded:
+                    # Writes from here on are replayed over the rows read.
+                    self.filename_catalog.begin_load()
+                    rows = await self.async_db.fetchall(
+                        "SELECT filename, path FROM files"
+                    )
+                    await asyncio.to_thread(self.filename_catalog.load, rows)
+        return await asyncio.to_thread(
+            self.filename_catalog.search, query, threshold, limit, max_length_ratio
+        )
+
+    def full_text_search(self, query: str, limit: int = 20) -> List[str]:
         """Perform full-text search on file contents (synchronous)."""
         try:
             with self.index.searcher() as searcher:
                 query_parser = QueryParser("content", schema=self.index.schema)
                 search_query = query_parser.parse(query)
-                results = searcher.search(search_query, limit=20)
+                results = searcher.search(search_query, limit=limit)
                 return [result["path"] for result in results]
         except Exception as e:
             logger.error(f"Error in full-text search: {e}")
             return []
 
+    @staticmethod
+    def _compile_metadata_filters(
+        filters: Optional[Dict], alias: str = "files"
+    ) -> Tuple[str, List]:
+        """
+        Translate metadata filters into a WHERE clause over ``files``.
+
+        Tag filters become ``id IN`` subqueries over the ``file_tags``
+        primary key, so each tag is an index lookup rather than a scan of
+        the comma-joined ``files.tags`` column.
+
+        :param filters: Filters as accepted by :meth:`metadata_search_async`.
+        :param alias: Name or alias of the ``files`` table in the query.
+        :return: The clause (starting with ``1=1``) and its parameters.
+        """
+        clause = "1=1"
+        params: List = []
+        if not filters:
+            return clause, params
+        if "extension" in filters:
+            clause += (
+                f" AND {alias}.extension IN ("
+                + ",".join("?" for _ in filters["extension"])
+                + ")"
+            )
+            params.extend(filters["extension"])
+        if "size_min" in filters:
+            clause += f" AND {alias}.size >= ?"
+            params.append(filters["size_min"])
+        if "size_max" in filters:
+            clause += f" AND {alias}.size <= ?"
+            params.append(filters["size_max"])
+        if "date_after" in filters:
+            clause += f" AND {alias}.updated_at >= ?"
+            params.append(filters["date_after"])
+        if "date_before" in filters:
+            clause += f" AND {alias}.updated_at <= ?"
+            params.append(filters["date_before"])
+        any_tags = normalize_tags(filters.get("tags") or ())
+        if any_tags:
+            clause += (
+                f" AND {alias}.id IN (SELECT file_id FROM file_tags WHERE tag IN ("
+                + ",".join("?" for _ in any_tags)
+                + "))"
+            )
+            params.extend(any_tags)
+        all_tags = normalize_tags(filters.get("tags_all") or ())
+        if all_tags:
+            clause += (
+                f" AND {alias}.id IN ("
+                + " INTERSECT ".join(
+                    "SELECT file_id FROM file_tags WHERE tag = ?" for _ in all_tags
+                )
+                + ")"
+            )
+            params.extend(all_tags)
+        return clause, params
+
     async def metadata_search_async(self, filters: Optional[Dict] = None) -> List[str]:
         """
         Asynchronously search by metadata filters (size, extension, timestamps, and custom tags).
 
-        :param filters: Dictionary with keys: extension, size_min, size_max, date_after, date_before, tags.
+        :param filters: Dictionary with keys: extension, size_min, size_max,
+            date_after, date_before, tags (files with any of these tags) and
+            tags_all (files with every one of these tags). Tags match
+            case-insensitively.
         :return: List of matching file paths.
         """
-        query_str = "SELECT path FROM files WHERE 1=1"
-        params = []
-        if filters:
-            if "extension" in filters:
-                query_str += (
-                    " AND extension IN ("
-                    + ",".join("?" for _ in filters["extension"])
-                    + ")"
-                )
-                params.extend(filters["extension"])
-            if "size_min" in filters:
-                query_str += " AND size >= ?"
-                params.append(filters["size_min"])
-            if "size_max" in filters:
-                query_str += " AND size <= ?"
-                params.append(filters["size_max"])
-            if "date_after" in filters:
-                query_str += " AND updated_at >= ?"
-                params.append(filters["date_after"])
-            if "date_before" in filters:
-                query_str += " AND updated_at <= ?"
-                params.append(filters["date_before"])
-            if "tags" in filters:
-                tag_conditions = []
-                for tag in filters["tags"]:
-                    tag_conditions.append("tags LIKE ?")
-                    params.append(f"%{tag}%")
-                if tag_conditions:
-                    query_str += " AND (" + " OR ".join(tag_conditions) + ")"
-        rows = await self.async_db.fetchall(query_str, tuple(params))
+        clause, params = self._compile_metadata_filters(filters)
+        rows = await self.async_db.fetchall(
+            f"SELECT path FROM files WHERE {clause}", tuple(params)
+        )
         return [Path(row[0]).as_posix() for row in rows]
 
+    async def tag_facets_async(
+        self, filters: Optional[Dict] = None, limit: Optional[int] = None
+    ) -> List[Tuple[str, int]]:
+        """
+        Count the files carrying each tag, optionally within a filtered set.
+
+        :param filters: Metadata filters restricting the counted files, as
+            accepted by :meth:`metadata_search_async`.
+        :param limit: Maximum number of tags to return, most frequent first.
+        :return: ``(tag, file count)`` pairs ordered by count, then tag.
+        """
+        if filters:
+            clause, params = self._compile_metadata_filters(filters, alias="f")
+            sql = (
+                "SELECT t.tag, COUNT(*) AS n FROM file_tags t "
+                f"JOIN files f ON f.id = t.file_id WHERE {clause} GROUP BY t.tag"
+            )
+        else:
+            # Grouped straight off the (tag, file_id) primary key.
+            sql, params = "SELECT tag, COUNT(*) AS n FROM file_tags GROUP BY tag", []
+        sql += " ORDER BY n DESC, tag"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        rows = await self.async_db.fetchall(sql, tuple(params))
+        return [(tag, count) for tag, count in rows]
+
+    def _load_semantic(self) -> None:
+        """Load the embedding model and semantic index (blocking)."""
+        self.embedding_model
+        self.semantic_index
+
+    async def warm_up(self) -> None:
+        """Load the embedding model and semantic index ahead of the first query.
+
+        Hybrid search skips the semantic backend until the model is loaded, so
+        one-shot callers such as the CLI warm up first to include it.
+        """
+        try:
+            await run_detached(self._load_semantic)
+        except Exception as e:
+            logger.error(f"Error loading the semantic search backend: {e}")
+
+    def _start_warm_up(self) -> None:
+        """Load the semantic backend on a daemon thread unless already loading."""
+        if self._warm_up_thread is not None and self._warm_up_thread.is_alive():
+            return
+
+        def load():
+            try:
+                self._load_semantic()
+            except Exception as e:
+                logger.error(f"Error loading the semantic search backend: {e}")
+
+        self._warm_up_thread = threading.Thread(
+            target=load, name="semantic-warm-up", daemon=True
+        )
+        self._warm_up_thread.start()
+
+    def _semantic_search_sync(self, query: str, top_k: int) -> List[str]:
+        """Encode ``query`` and search the semantic index (blocking)."""
+        semantic_index = self.semantic_index
+        if semantic_index.ntotal == 0:
+            logger.warning(
+                "Semantic index is empty. No semantic search can be performed."
+            )
+            return []
+        query_embedding = self.embedding_model.encode(query)
+        return semantic_index.search(query_embedding, top_k)
+
     async def semantic_search_async(self, query: str, top_k: int = 5) -> List[str]:
         """
         Asynchronously perform semantic search using FAISS and sentence-transformers.
 
+        Passages are matched individually and aggregated per file, each file
+        ranked by its closest passage. The search runs on a daemon thread, so
+        a query abandoned by a hybrid search deadline never delays shutdown.
+
         :param query: Query string to encode.
-        :param top_k: Number of nearest neighbors to return.
+        :param top_k: Number of files to return.
         :return: List of file paths for the top matching documents.
         """
-        if self.semantic_index is None or self.semantic_index.ntotal == 0:
-            logger.warning(
-                "Semantic index is empty. No semantic search can be performed."
-            )
+        return await run_detached(self._semantic_search_sync, query, top_k)
+
+    async def semantic_passage_search_async(
+        self, query: str, top_k: int = 5
+    ) -> List[Tuple[str, int]]:
+        """
+        Semantic search returning the matching passages themselves.
+
+        :param query: Query string to encode.
+        :param top_k: Number of passages to return.
+        :return: ``(path, offset)`` of each passage, nearest first; ``offset``
+            is the character position where the passage starts in the file.
+        """
+        semantic_index = await asyncio.to_thread(lambda: self.semantic_index)
+        if semantic_index.ntotal == 0:
             return []
-        query_embedding = await asyncio.to_thread(self.embedding_model.encode, query)
-        import numpy as np
-
-        query_embedding = np.array(query_embedding, dtype="float32").reshape(1, -1)
-        distances, indices = self.semantic_index.search(query_embedding, top_k)
-        results = []
-        for idx in indices[0]:
-            if idx < len(self.semantic_mapping):
-                results.append(self.semantic_mapping[idx])
+        query_embedding = await asyncio.to_thread(
+            lambda: self.embedding_model.encode(query)
+        )
+        passages = await asyncio.to_thread(
+            semantic_index.search_passages, query_embedding, top_k
+        )
+        return [(path, offset) for path, offset, _ in passages]
+
+    @staticmethod
+    def reciprocal_rank_fusion(
+        rankings: Dict[str, Sequence[str]], rrf_k: int = HYBRID_RRF_K
+    ) -> List[Tuple[str, float]]:
+        """
+        Fuse ranked result lists with reciprocal rank fusion.
+
+        Each path scores ``sum(1 / (rrf_k + rank))`` over the lists it appears
+        in, with ranks starting at 1, so documents found by several backends
+        rise above those that only one backend ranks highly.
+
+        :param rankings: Ranked paths per backend name.
+        :param rrf_k: Rank offset damping the weight of top positions.
+        :return: ``(path, score)`` pairs, best first.
+        """
+        scores: Dict[str, float] = {}
+        for ranked in rankings.values():
+            for rank, path in enumerate(dict.fromkeys(ranked), start=1):
+                scores[path] = scores.get(path, 0.0) + 1.0 / (rrf_k + rank)
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+    def _hybrid_backend(self, name: str, query: str, depth: int) -> Awaitable:
+        """Coroutine running hybrid backend ``name`` for ``depth`` results."""
+        if name == "filename":
+            return self.search_filename_async(query)
+        if name == "fuzzy":
+            return self.fuzzy_search_async(query, limit=depth)
+        if name == "fulltext":
+            return asyncio.to_thread(self.full_text_search, query, depth)
+        if name == "semantic":
+            return self.semantic_search_async(query, top_k=depth)
+        raise ValueError(f"Unknown hybrid search backend: {name}")
+
+    @staticmethod
+    async def _run_with_deadline(
+        name: str, awaitable: Awaitable, deadline: Optional[float]
+    ) -> Optional[List[str]]:
+        """Await a backend, returning None if it fails or misses its deadline."""
+        start = time.perf_counter()
+        try:
+            results = await asyncio.wait_for(awaitable, timeout=deadline)
+        except asyncio.TimeoutError:
+            logger.warning(f"Hybrid search: {name} missed its {deadline}s deadline")
+            return None
+        except Exception as e:
+            logger.error(f"Hybrid search: {name} failed: {e}")
+            return None
+        logger.debug(
+            f"Hybrid search: {name} returned {len(results)} results "
+            f"in {time.perf_counter() - start:.3f}s"
+        )
         return results
 
+    async def hybrid_search_async(
+        self,
+        query: str,
+        filters: Optional[Dict] = None,
+        k: int = 10,
+        backends: Optional[Iterable[str]] = None,
+        deadlines: Optional[Dict[str, float]] = None,
+        depth: int = HYBRID_CANDIDATE_DEPTH,
+        rrf_k: int = HYBRID_RRF_K,
+    ) -> List[str]:
+        """
+        Run several search backends concurrently and fuse their rankings.
+
+        The filename, fuzzy, full-text and semantic backends (or the subset
+        named in ``backends``) run at the same time, each bounded by its own
+        deadline. A backend that fails or runs late is left out of the fusion,
+        so it lowers result quality instead of raising latency. Until the
+        embedding model is loaded, the semantic backend is skipped and the
+        model is loaded in the background (see :meth:`warm_up`). When
+        ``filters`` are given, :meth:`metadata_search_async` runs alongside
+        and only paths it accepts are kept.
+
+        :param query: Search query passed to every backend.
+        :param filters: Optional metadata filters, see :meth:`metadata_search_async`.
+        :param k: Number of fused results to return.
+        :param backends: Backend names to use; defaults to all of them.
+        :param deadlines: Per-backend timeouts in seconds, overriding
+            ``HYBRID_BACKEND_DEADLINES``; None disables a backend's deadline.
+        :param depth: Number of results requested from each backend.
+        :param rrf_k: Rank offset for reciprocal rank fusion.
+        :return: Up to ``k`` file paths, best first.
+        """
+        selected = list(backends) if backends is not None else HYBRID_BACKENDS
+        unknown = [name for name in selected if name not in HYBRID_BACKENDS]
+        if unknown:
+            raise ValueError(f"Unknown hybrid search backends: {unknown}")
+
+        if "semantic" in selected and self._embedding_model is None:
+            # Loading the model takes longer than any query deadline allows.
+            logger.info("Hybrid search: embedding model not loaded; skipping semantic")
+            self._start_warm_up()
+            selected = [name for name in selected if name != "semantic"]
+
+        depth = max(depth, k)
+        limits = {**HYBRID_BACKEND_DEADLINES, **(deadlines or {})}
+        tasks = {
+            name: asyncio.ensure_future(
+                self._run_with_deadline(
+                    name, self._hybrid_backend(name, query, depth), limits.get(name)
+                )
+            )
+            for name in selected
+        }
+        filter_task = None
+        if filters:
+            filter_task = asyncio.ensure_future(
+                self._run_with_deadline(
+                    "metadata",
+                    self.metadata_search_async(filters),
+                    limits.get("metadata", HYBRID_FILTER_DEADLINE),
+                )
+            )
+
+        rankings: Dict[str, List[str]] = {}
+        for name, task in tasks.items():
+            results = await task
+            if results is not None:
+                rankings[name] = [Path(path).as_posix() for path in results[:depth]]
+
+        if filter_task is not None:
+            allowed = await filter_task
+            if allowed is None:
+                # Unfiltered results would be wrong rather than merely worse.
+                logger.warning("Hybrid search: metadata filter unavailable")
+                return []
+            allowed_paths = {Path(path).as_posix() for path in allowed}
+            rankings = {
+                name: [path for path in ranked if path in allowed_paths]
+                for name, ranked in rankings.items()
+            }
+
+        fused = self.reciprocal_rank_fusion(rankings, rrf_k=rrf_k)
+        return [path for path, _ in fused[:k]]
+
     async def add_to_index_batch(
-        self, file_metadata_list: List[FileMetadata], batch_size: int = 20
+        self,
+        file_metadata_list: List[FileMetadata],
+        batch_size: int = 20,
+        commit_every: int = WHOOSH_COMMIT_EVERY,
+        commit_interval: float = WHOOSH_COMMIT_INTERVAL,
+        optimize: bool = False,
+        embedding_batch_size: int = EMBEDDING_BATCH_SIZE,
     ) -> List[Path]:
         """
         Add multiple files to the search index in batches.
 
+        All documents go through a single :class:`BatchIndexWriter`, so Whoosh
+        commits every ``commit_every`` documents or ``commit_interval`` seconds
+        and merges segments once at the end. A file is only written to SQLite,
+        the filename catalog and FAISS once its Whoosh commit has succeeded,
+        with one ``executemany`` transaction per commit; a file Whoosh rejects
+        or whose commit fails is left out of the result. Text documents are
+        buffered so their passages are embedded ``embedding_batch_size`` at a
+        time and added to FAISS as one matrix per model call.
+
+        Full-text writes from :meth:`add_to_index_async` and
+        :meth:`remove_from_index` wait until the batch has finished.
+
         Args:
             file_metadata_list: List of file metadata objects to index
-            batch_size: Number of files to process in each batch
+            batch_size: Number of files to read concurrently per batch
+            commit_every: Number of documents per Whoosh commit
+            commit_interval: Maximum seconds between Whoosh commits
+            optimize: Merge the Whoosh index into a single segment when done
+            embedding_batch_size: Number of passages encoded per embedding call
 
         Returns:
             List of successfully indexed file paths
         """
+        writer = BatchIndexWriter(
+            self.index, commit_every=commit_every, commit_interval=commit_interval
+        )
+        indexed: List[Path] = []
+        pending_embeddings: List[Tuple[FileMetadata, str]] = []
+        # Documents handed to Whoosh but not yet committed, by path.
+        uncommitted: Dict[str, Tuple[FileMetadata, str]] = {}
 
-        async def index_single_file(metadata: FileMetadata) -> Optional[Path]:
+        async def flush_embeddings(documents: List[Tuple[FileMetadata, str]]):
             try:
-                await self.add_to_index_async(metadata)
-                return metadata.path
+                await self._add_semantic_batch(documents, embedding_batch_size)
             except Exception as e:
-                logger.error(f"Error indexing file {metadata.path}: {e}")
-                return None
+                logger.error(f"Error embedding batch of {len(documents)} files: {e}")
+
+        async def record_committed():
+            """Write the other backends for documents Whoosh has committed."""
+            committed = [
+                uncommitted.pop(path)
+                for path in writer.take_committed()
+                if path in uncommitted
+            ]
+            if not committed:
+                return
+            await self.async_db.executemany(
+                INSERT_FILE_SQL,
+                [self._file_row(metadata) for metadata, _ in committed],
+            )
+            await self._write_tags([metadata for metadata, _ in committed])
+            self._update_filename_catalog(metadata for metadata, _ in committed)
+
+            for metadata, content in committed:
+                indexed.append(metadata.path)
+                if self._wants_embedding(metadata, content):
+                    pending_embeddings.append((metadata, content))
+            while len(pending_embeddings) >= embedding_batch_size:
+                await flush_embeddings(pending_embeddings[:embedding_batch_size])
+                del pending_embeddings[:embedding_batch_size]
+
+        async with self._index_write_lock:
+            try:
+                for start in range(0, len(file_metadata_list), batch_size):
+                    chunk = file_metadata_list[start : start + batch_size]
+                    prepared = await BatchProcessor.process_batch(
+                        chunk, self._prepare_document, batch_size=batch_size
+                    )
+                    prepared = [item for item in prepared if item is not None]
+                    if not prepared:
+                        continue
+
+                    for metadata, content in prepared:
+                        uncommitted[str(metadata.path)] = (metadata, content)
+                    try:
+                        failed = await asyncio.to_thread(
+                            writer.add_documents,
+                            [
+                                (str(metadata.path), content)
+                                for metadata, content in prepared
+                            ],
+                        )
+                    except Exception as e:
+                        logger.error(f"Error writing batch to full-text index: {e}")
+                    else:
+                        for path in failed:
+                            uncommitted.pop(path, None)
+                    await record_committed()
+
+                try:
+                    await asyncio.to_thread(writer.close, optimize)
+                except Exception as e:
+                    logger.error(f"Error finalizing full-text index: {e}")
+                await record_committed()
+                if pending_embeddings:
+                    await flush_embeddings(pending_embeddings)
+            finally:
+                # Releases the Whoosh lock if the batch was interrupted.
+                await asyncio.to_thread(writer.cancel)
+                await self.save_semantic_index()
+
+        logger.info(
+            f"Indexed {len(indexed)} files with {writer.commits} full-text commits"
+        )
+        return indexed
+
+    def _has_semantic_index(self) -> bool:
+        """Whether a semantic index is loaded or persisted, without loading it."""
+        from .semantic_index import INDEX_FILENAME
+
+        return (
+            self._semantic_index is not None
+            or (self.index_dir / "semantic" / INDEX_FILENAME).exists()
+        )
+
+    async def _remove_semantic(self, paths: List[str]) -> int:
+        """Drop the vectors stored for ``paths`` from the semantic index."""
+        if not paths or not self._has_semantic_index():
+            return 0
+        semantic_index = await asyncio.to_thread(lambda: self.semantic_index)
+        return await asyncio.to_thread(semantic_index.remove, paths)
+
+    async def remove_from_index(self, paths: Iterable[str]) -> int:
+        """
+        Remove files from Whoosh, SQLite, the filename catalog and FAISS.
+
+        Args:
+            paths: Paths of the files to forget, as stored in the index
+
+        Returns:
+            Number of paths removed
+        """
+        paths = [str(path) for path in paths]
+        if not paths:
+            return 0
+
+        def delete_documents():
+            writer = self.index.writer()
+            try:
+                for path in paths:
+                    writer.delete_by_term("path", path)
+            except Exception:
+                writer.cancel()
+                raise
+            writer.commit(merge=False)
+
+        try:
+            async with self._index_write_lock:
+                await asyncio.to_thread(delete_documents)
+        except Exception as e:
+            logger.error(f"Error removing files from full-text index: {e}")
+
+        rows = [(path,) for path in paths]
+        await self.async_db.executemany("DELETE FROM files WHERE path = ?", rows)
+        await self.async_db.executemany(DELETE_MANIFEST_SQL, rows)
+        for path in paths:
+            self.filename_catalog.remove(path)
+
+        try:
+            await self._remove_semantic(paths)
+            await self.save_semantic_index()
+        except Exception as e:
+            logger.error(f"Error removing files from semantic index: {e}")
+
+        logger.info(f"Removed {len(paths)} files from the search index")
+        return len(paths)
+
+    async def _load_manifest(self, root: Path) -> Dict[str, FileSignature]:
+        """Stored signatures for every indexed path below ``root``."""
+        low, high = subtree_bounds(root)
+        rows = await self.async_db.fetchall(
+            "SELECT path, inode, size, mtime_ns FROM index_manifest "
+            "WHERE path >= ? AND path < ?",
+            (low, high),
+        )
+        return {row[0]: FileSignature(*row[1:]) for row in rows}
+
+    def _storage_paths(self) -> List[Path]:
+        """Files and directories the engine writes, which are never indexed."""
+        db_path = Path(self.db_path)
+        return [Path(self.index_dir), db_path] + [
+            db_path.with_name(db_path.name + suffix)
+            for suffix in ("-wal", "-shm", "-journal")
+        ]
+
+    async def reindex_incremental(
+        self,
+        root: Path,
+        file_reader=None,
+        include_patterns: Optional[Set[str]] = None,
+        ignore_patterns: Optional[Set[str]] = None,
+        **batch_options,
+    ) -> Dict[str, int]:
+        """
+        Bring the index for ``root`` up to date with what is on disk.
+
+        The tree is compared with the manifest of ``(path, inode, size,
+        mtime_ns)`` recorded by the previous run. Only new and modified files
+        are read, parsed and indexed; files that disappeared are removed from
+        every backend. Paths indexed before the manifest existed count as new
+        on the first run.
+
+        Args:
+            root: Directory whose files are indexed
+            file_reader: ``FileReader`` used to build metadata for changed
+                files; a default reader is created if omitted
+            include_patterns: Patterns for files to include
+            ignore_patterns: Patterns for files to exclude
+            **batch_options: Passed through to :meth:`add_to_index_batch`
 
-        results = await BatchProcessor.process_batch(
-            file_metadata_list, index_single_file, batch_size=batch_size
+        Returns:
+            Counts of added, modified, removed, unchanged and indexed files
+        """
+        current = await asyncio.to_thread(
+            scan_tree, root, include_patterns, ignore_patterns, self._storage_paths()
         )
+        stored = await self._load_manifest(root)
+        diff = diff_manifest(stored, current)
+        logger.info(
+            f"Incremental reindex of {root}: {len(diff.added)} new, "
+            f"{len(diff.modified)} modified, {len(diff.removed)} removed, "
+            f"{diff.unchanged} unchanged"
+        )
+
+        await self.remove_from_index(diff.removed)
 
-        # Filter out None values from failed operations
-        return [result for result in results if result is not None]
+        changed = diff.added + diff.modified
+        indexed: List[Path] = []
+        if changed:
+            if file_reader is None:
+                from backend.file_reader.file_reader import FileReader
+
+                file_reader = FileReader()
+            metadata = await BatchProcessor.process_batch(
+                [Path(path) for path in changed], file_reader.process_file
+            )
+            metadata = [
+                item for item in metadata if item is not None and item.size >= 0
+            ]
+            # Updated files replace their vectors by id; dropping them first
+            # also covers files that no longer produce an embedding.
+            try:
+                await self._remove_semantic(changed)
+            except Exception as e:
+                logger.error(f"Error removing stale semantic vectors: {e}")
+            indexed = await self.add_to_index_batch(metadata, **batch_options)
+
+            await self.async_db.executemany(
+                UPSERT_MANIFEST_SQL,
+                [
+                    (str(path), *current[str(path)])
+                    for path in indexed
+                    if str(path) in current
+                ],
+            )
+
+        return {
+            "added": len(diff.added),
+            "modified": len(diff.modified),
+            "removed": len(diff.removed),
+            "unchanged": diff.unchanged,
+            "indexed": len(indexed),
+        }
 
 
 # Example Usage:
@@ -0,0 +1,962 @@
+"""Persistent FAISS vector store backing semantic search."""
+
+import functools
+import json
+import logging
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from backend.config.settings import (
+    SEMANTIC_ANN_AUTO_TYPE,
+    SEMANTIC_ANN_MIN_VECTORS,
+    SEMANTIC_HNSW_EF_CONSTRUCTION,
+    SEMANTIC_HNSW_EF_SEARCH,
+    SEMANTIC_HNSW_M,
+    SEMANTIC_INDEX_TYPE,
+    SEMANTIC_IVF_NLIST,
+    SEMANTIC_IVF_NPROBE,
+    SEMANTIC_PQ_M,
+    SEMANTIC_RERANK_FACTOR,
+    SEMANTIC_TRAIN_SAMPLE,
+    SEMANTIC_VECTOR_ENCODING,
+)
+
+from .vector_store import VectorStore
+
+logger = logging.getLogger(__name__)
+
+SEMANTIC_FORMAT_VERSION = 5
+INDEX_FILENAME = "semantic.faiss"
+META_FILENAME = "semantic_meta.json"
+MAPPING_FILENAME = "semantic_mapping.npz"
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+# How flat, IVF-Flat and HNSW indexes store vectors in memory. IVF-PQ always
+# stores product-quantized codes.
+VECTOR_ENCODINGS = ("float32", "float16", "int8", "pq")
+# IVF inverted lists become read-only when memory-mapped, so only flat and
+# HNSW indexes are mapped; IVF-PQ codes are small enough to read into RAM.
+MMAP_INDEX_TYPES = ("flat", "hnsw")
+# FAISS warns below roughly 39 training points per IVF cell.
+MIN_POINTS_PER_CELL = 39
+PQ_TRAINING_POINTS = 256
+# Rebuild an HNSW index once this fraction of its vectors are tombstones.
+HNSW_COMPACT_RATIO = 0.1
+# Compact the vector store on save once superseded rows exceed this fraction
+# of the live vectors.
+STORE_COMPACT_RATIO = 0.25
+# Retrain IVF, int8 and PQ indexes once the corpus outgrows its training
+# size by this factor.
+RETRAIN_GROWTH = 4
+# Passages fetched per requested file in the first round of a file search.
+PASSAGE_FETCH_FACTOR = 4
+
+
+def import_faiss():
+    """Import FAISS on first use so that non-semantic callers never load it."""
+    try:
+        import faiss
+    except ImportError:
+        raise ImportError("FAISS is not installed. Run `pip install faiss-cpu`.")
+    return faiss
+
+
+def _synchronized(method):
+    """Run a :class:`SemanticIndex` method while holding the index's lock."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def ivf_nlist(count: int, nlist: Optional[int] = None) -> int:
+    """Number of IVF cells for ``count`` vectors, or 0 if too few to train."""
+    limit = count // MIN_POINTS_PER_CELL
+    if nlist is None:
+        nlist = int(4 * math.sqrt(count))
+    return max(0, min(nlist, limit))
+
+
+def pq_subquantizers(dimension: int, m: int = SEMANTIC_PQ_M) -> int:
+    """Largest number of PQ sub-quantizers up to ``m`` dividing ``dimension``."""
+    for candidate in range(min(m, dimension), 0, -1):
+        if dimension % candidate == 0:
+            return candidate
+    return 1
+
+
+def choose_index_type(
+    count: int,
+    index_type: str = SEMANTIC_INDEX_TYPE,
+    ann_min_vectors: int = SEMANTIC_ANN_MIN_VECTORS,
+    auto_type: str = SEMANTIC_ANN_AUTO_TYPE,
+) -> str:
+    """
+    Pick the index type to use for a corpus of ``count`` vectors.
+
+    Args:
+        count: Number of vectors in the index
+        index_type: Configured type, or "auto" to decide by corpus size
+        ann_min_vectors: Corpus size from which "auto" switches to ANN
+        auto_type: ANN type "auto" switches to
+
+    Returns:
+        One of ``INDEX_TYPES``; falls back to "flat" when the corpus is too
+        small to train the requested type
+    """
+    if index_type == "auto":
+        index_type = "flat" if count < ann_min_vectors else auto_type
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown semantic index type: {index_type}")
+    if index_type.startswith("ivf") and ivf_nlist(count) < 1:
+        return "flat"
+    if index_type == "ivf_pq" and count < PQ_TRAINING_POINTS:
+        return "flat"
+    return index_type
+
+
+def choose_encoding(count: int, encoding: str = SEMANTIC_VECTOR_ENCODING) -> str:
+    """Vector encoding to use for ``count`` vectors.
+
+    PQ codebooks need at least ``PQ_TRAINING_POINTS`` vectors to train, so
+    smaller corpora keep float32 until they have grown.
+    """
+    if encoding not in VECTOR_ENCODINGS:
+        raise ValueError(f"Unknown vector encoding: {encoding}")
+    if encoding == "pq" and count < PQ_TRAINING_POINTS:
+        return "float32"
+    return encoding
+
+
+class SemanticIndex:
+    """FAISS index of passage vectors keyed by stable ids, persisted on disk.
+
+    Each vector is a passage of a file, stored under an integer id derived
+    from the file's SQLite row id (through an ``IndexIDMap2`` for flat and
+    HNSW indexes; IVF lists hold ids natively) together with its path and
+    character offset. Re-adding an id replaces its vector, and
+    :meth:`remove` drops every passage of a file. :meth:`search` aggregates
+    passage hits into a ranking of files.
+    The index is exact (flat) or approximate (IVF-Flat, IVF-PQ or HNSW), and
+    its vectors can be held as float32, float16, int8 scalar-quantized or
+    product-quantized codes to cut resident memory. :meth:`optimize` switches
+    between them as the corpus grows, training from full-precision vectors:
+    an exact flat index already holds them, while other indexes keep copies
+    in a :class:`VectorStore` that are also used to re-rank the top
+    candidates of quantized indexes exactly.
+
+    The index lives in ``directory`` as a FAISS file, a binary file mapping
+    ids to paths and offsets, and a small JSON metadata file recording the
+    format version, embedding model and vector dimension. When any of those
+    no longer match, the stored index is discarded so that it is rebuilt
+    rather than queried with incompatible embeddings.
+
+    Public methods hold a re-entrant lock, so adds, removals, rebuilds,
+    saves and searches from different threads never overlap; FAISS does not
+    support modifying an index while it is searched.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        model_name: str,
+        mmap: bool = True,
+        index_type: str = SEMANTIC_INDEX_TYPE,
+        nprobe: int = SEMANTIC_IVF_NPROBE,
+        ef_search: int = SEMANTIC_HNSW_EF_SEARCH,
+        encoding: str = SEMANTIC_VECTOR_ENCODING,
+        rerank_factor: int = SEMANTIC_RERANK_FACTOR,
+    ):
+        """
+        Args:
+            directory: Directory holding the index files
+            model_name: Name of the embedding model producing the vectors
+            mmap: Memory-map the FAISS file on load instead of reading it
+            index_type: "auto" or one of ``INDEX_TYPES``
+            nprobe: IVF cells visited per query
+            ef_search: HNSW candidate list size per query
+            encoding: One of ``VECTOR_ENCODINGS``
+            rerank_factor: For quantized indexes, fetch this many candidates
+                per result and re-rank them with the float32 vectors on
+                disk; 0 disables re-ranking
+        """
+        if index_type != "auto" and index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown semantic index type: {index_type}")
+        if encoding not in VECTOR_ENCODINGS:
+            raise ValueError(f"Unknown vector encoding: {encoding}")
+        self.directory = directory
+        self.model_name = model_name
+        self.mmap = mmap
+        self.configured_type = index_type
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        self.configured_encoding = encoding
+        self.rerank_factor = rerank_factor
+        self.index = None
+        self.index_type = "flat"
+        self.encoding = "float32"
+        self.mapping: Dict[int, str] = {}  # Maps vector IDs to file paths.
+        self.offsets: Dict[int, int] = {}  # Maps vector IDs to passage offsets.
+        self._ids_by_path: Dict[str, Set[int]] = {}
+        self.dimension: Optional[int] = None
+        self.store = VectorStore(directory)
+        # The flat float32 index when it holds the exact vectors itself, in
+        # which case nothing is written to the store.
+        self._vector_index = None
+        self._trained_count = 0
+        self._tombstones = 0
+        self._mmapped = False
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    @property
+    def index_path(self) -> Path:
+        return self.directory / INDEX_FILENAME
+
+    @property
+    def meta_path(self) -> Path:
+        return self.directory / META_FILENAME
+
+    @property
+    def mapping_path(self) -> Path:
+        return self.directory / MAPPING_FILENAME
+
+    @property
+    def ntotal(self) -> int:
+        """Number of live passage vectors, excluding HNSW tombstones."""
+        return len(self.mapping)
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    @_synchronized
+    def load(self) -> bool:
+        """Load the persisted index, discarding it if it is stale.
+
+        Returns:
+            True if an index was loaded, False if starting empty
+        """
+        paths = (self.meta_path, self.index_path, self.mapping_path)
+        if not all(path.exists() for path in paths):
+            return False
+        try:
+            meta = json.loads(self.meta_path.read_text(encoding="utf-8"))
+            passages = self._read_mapping()
+        except Exception as e:
+            logger.error(f"Unreadable semantic index metadata {self.meta_path}: {e}")
+            self.clear()
+            return False
+
+        reason = self._incompatibility(meta)
+        if reason:
+            logger.warning(f"Discarding semantic index ({reason}); it will be rebuilt")
+            self.clear()
+            return False
+
+        faiss = import_faiss()
+        index_type = meta["index_type"]
+        mmap = self.mmap and index_type in MMAP_INDEX_TYPES
+        try:
+            flags = faiss.IO_FLAG_MMAP if mmap else 0
+            index = faiss.read_index(str(self.index_path), flags)
+        except Exception as e:
+            logger.error(f"Error reading semantic index {self.index_path}: {e}")
+            self.clear()
+            return False
+
+        tombstones = meta.get("tombstones", 0)
+        if (
+            index.d != meta["dimension"]
+            or len(passages) != meta.get("count")
+            or index.ntotal != len(passages) + tombstones
+        ):
+            logger.warning("Semantic index does not match its metadata; rebuilding")
+            self.clear()
+            return False
+
+        self.index = index
+        self.index_type = index_type
+        self.encoding = meta.get("encoding", "float32")
+        self._set_mapping(passages)
+        self.dimension = index.d
+        self.store.dimension = index.d
+        self._vector_index = index if self._holds_vectors() else None
+        if self._vector_index is not None and len(self.store):
+            self.store.clear()
+        self._trained_count = meta.get("trained_count", 0)
+        self._tombstones = tombstones
+        self._mmapped = mmap
+        self._dirty = False
+        self._apply_search_params()
+        logger.info(
+            f"Loaded {index_type}/{self.encoding} semantic index "
+            f"with {self.ntotal} vectors"
+        )
+        return True
+
+    def _incompatibility(self, meta: Dict[str, Any]) -> Optional[str]:
+        """Describe why stored metadata cannot be used, or None if it can."""
+        if meta.get("format_version") != SEMANTIC_FORMAT_VERSION:
+            return f"format version {meta.get('format_version')}"
+        if meta.get("model_name") != self.model_name:
+            return f"embedding model changed from {meta.get('model_name')}"
+        if not isinstance(meta.get("dimension"), int):
+            return "missing dimension"
+        if meta.get("index_type") not in INDEX_TYPES:
+            return f"unknown index type {meta.get('index_type')}"
+        if meta.get("encoding", "float32") not in VECTOR_ENCODINGS:
+            return f"unknown encoding {meta.get('encoding')}"
+        return None
+
+    @_synchronized
+    def save(self) -> bool:
+        """Atomically write the index and its metadata to disk.
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if self.index is None:
+            return False
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._ensure_writable()
+            stale = len(self.store) - self.ntotal
+            if self._vector_index is None and stale > STORE_COMPACT_RATIO * max(
+                self.ntotal, 1
+            ):
+                logger.info(f"Compacting {stale} superseded stored vectors")
+                self.store.compact(sorted(self.mapping))
+            tmp_index = self.index_path.with_suffix(".faiss.tmp")
+            import_faiss().write_index(self.index, str(tmp_index))
+            meta = {
+                "format_version": SEMANTIC_FORMAT_VERSION,
+                "model_name": self.model_name,
+                "dimension": self.dimension,
+                "index_type": self.index_type,
+                "encoding": self.encoding,
+                "trained_count": self._trained_count,
+                "tombstones": self._tombstones,
+                "count": self.ntotal,
+            }
+            tmp_mapping = self.mapping_path.with_suffix(".npz.tmp")
+            self._write_mapping(tmp_mapping)
+            tmp_meta = self.meta_path.with_suffix(".json.tmp")
+            tmp_meta.write_text(json.dumps(meta), encoding="utf-8")
+            os.replace(tmp_index, self.index_path)
+            os.replace(tmp_mapping, self.mapping_path)
+            os.replace(tmp_meta, self.meta_path)
+            self._dirty = False
+            return True
+        except Exception as e:
+            logger.error(f"Error saving semantic index to {self.directory}: {e}")
+            return False
+
+    def _write_mapping(self, path: Path) -> None:
+        """Write ids, offsets and paths as arrays, each path stored once."""
+        paths = list(self._ids_by_path)
+        position = {path: row for row, path in enumerate(paths)}
+        ids = np.fromiter(self.mapping, dtype="int64", count=len(self.mapping))
+        offsets = np.array([self.offsets.get(id_, 0) for id_ in self.mapping])
+        path_rows = np.array([position[path] for path in self.mapping.values()])
+        # NUL cannot occur in a path, so it safely separates them.
+        names = np.frombuffer("\0".join(paths).encode("utf-8"), dtype="uint8")
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                ids=ids,
+                offsets=offsets.astype("int64"),
+                path_rows=path_rows.astype("int32"),
+                paths=names,
+            )
+
+    def _read_mapping(self) -> Dict[int, Tuple[str, int]]:
+        with np.load(self.mapping_path, allow_pickle=False) as data:
+            names = data["paths"].tobytes().decode("utf-8")
+            paths = names.split("\0") if names else []
+            return {
+                id_: (paths[row], offset)
+                for id_, row, offset in zip(
+                    data["ids"].tolist(),
+                    data["path_rows"].tolist(),
+                    data["offsets"].tolist(),
+                )
+            }
+
+    @_synchronized
+    def clear(self) -> None:
+        """Drop the in-memory index and remove persisted files."""
+        self.index = None
+        self.index_type = "flat"
+        self.encoding = "float32"
+        self._set_mapping({})
+        self.dimension = None
+        self._vector_index = None
+        self._trained_count = 0
+        self._tombstones = 0
+        self._mmapped = False
+        self._dirty = False
+        self.store.clear()
+        for path in (self.index_path, self.meta_path, self.mapping_path):
+            try:
+                path.unlink(missing_ok=True)
+            except OSError as e:
+                logger.error(f"Error removing {path}: {e}")
+
+    def _set_mapping(self, passages: Dict[int, Tuple[str, int]]) -> None:
+        self.mapping = {}
+        self.offsets = {}
+        self._ids_by_path = {}
+        for id_, (path, offset) in passages.items():
+            self._register(id_, path, offset)
+
+    def _register(self, id_: int, path: str, offset: int) -> None:
+        self.mapping[id_] = path
+        if offset:
+            self.offsets[id_] = offset
+        self._ids_by_path.setdefault(path, set()).add(id_)
+
+    def _unregister(self, id_: int) -> None:
+        path = self.mapping.pop(id_)
+        self.offsets.pop(id_, None)
+        ids = self._ids_by_path[path]
+        ids.discard(id_)
+        if not ids:
+            del self._ids_by_path[path]
+
+    def _ensure_writable(self) -> None:
+        """Copy a memory-mapped index into RAM before it is modified."""
+        if self._mmapped and self.index is not None:
+            holds_vectors = self._vector_index is self.index
+            self.index = import_faiss().clone_index(self.index)
+            if holds_vectors:
+                self._vector_index = self.index
+            self._mmapped = False
+            self._apply_search_params()
+
+    def _base_index(self):
+        """The index wrapped by the ``IndexIDMap2`` of a flat or HNSW index."""
+        return import_faiss().downcast_index(self.index.index)
+
+    def _holds_vectors(self) -> bool:
+        """Whether the current index stores exact, reconstructible vectors."""
+        return self.index_type == "flat" and self.encoding == "float32"
+
+    @_synchronized
+    def vectors(self, ids: Sequence[int]) -> np.ndarray:
+        """Full-precision vectors for ``ids``, in order.
+
+        Raises:
+            KeyError: If any id has no stored vector
+        """
+        if self._vector_index is None:
+            return self.store.get(ids)
+        ids = np.asarray(ids, dtype="int64")
+        if not len(ids):
+            return np.empty((0, self.dimension or 0), dtype="float32")
+        try:
+            return self._vector_index.reconstruct_batch(ids)
+        except RuntimeError as e:
+            raise KeyError(f"No stored vector for ids {ids[:5]}") from e
+
+    def iter_vectors(
+        self, ids: Sequence[int], chunk_size: int = 65536
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Yield ``(ids, vectors)`` chunks so callers never hold every vector."""
+        ids = np.asarray(ids, dtype="int64")
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start : start + chunk_size]
+            yield chunk, self.vectors(chunk)
+
+    @_synchronized
+    def sample_vectors(
+        self, ids: Optional[Sequence[int]], count: int, seed: int = 0
+    ) -> np.ndarray:
+        """Vectors of up to ``count`` ids drawn at random from ``ids``.
+
+        ``ids`` of None samples from every live vector.
+        """
+        if ids is None:
+            ids = sorted(self.mapping)
+        ids = np.asarray(ids, dtype="int64")
+        if len(ids) > count:
+            ids = np.sort(np.random.default_rng(seed).choice(ids, count, replace=False))
+        return self.vectors(ids)
+
+    def _apply_search_params(
+        self, nprobe: Optional[int] = None, ef_search: Optional[int] = None
+    ) -> None:
+        """Set the query-time accuracy knobs of the current index type."""
+        if self.index is None:
+            return
+        if self.index_type.startswith("ivf"):
+            ivf = import_faiss().extract_index_ivf(self.index)
+            ivf.nprobe = min(nprobe or self.nprobe, ivf.nlist)
+        elif self.index_type == "hnsw":
+            self._base_index().hnsw.efSearch = ef_search or self.ef_search
+
+    def _new_index(self, index_type: str, count: int, encoding: str = "float32"):
+        """Create an empty, possibly untrained index of the given type."""
+        faiss = import_faiss()
+        d = self.dimension
+        sq_types = {
+            "float16": faiss.ScalarQuantizer.QT_fp16,
+            "int8": faiss.ScalarQuantizer.QT_8bit,
+        }
+        if index_type == "flat":
+            if encoding in sq_types:
+                base = faiss.IndexScalarQuantizer(d, sq_types[encoding])
+            elif encoding == "pq":
+                base = faiss.IndexPQ(d, pq_subquantizers(d), 8)
+            else:
+                base = faiss.IndexFlatL2(d)
+            return faiss.IndexIDMap2(base)
+        if index_type == "hnsw":
+            if encoding in sq_types:
+                base = faiss.IndexHNSWSQ(d, sq_types[encoding], SEMANTIC_HNSW_M)
+            elif encoding == "pq":
+                base = faiss.IndexHNSWPQ(d, pq_subquantizers(d), SEMANTIC_HNSW_M)
+            else:
+                base = faiss.IndexHNSWFlat(d, SEMANTIC_HNSW_M)
+            base.hnsw.efConstruction = SEMANTIC_HNSW_EF_CONSTRUCTION
+            return faiss.IndexIDMap2(base)
+        # IVF lists store ids themselves and delete by id, whereas an ID map
+        # would go out of step with them after a removal.
+        nlist = ivf_nlist(count, SEMANTIC_IVF_NLIST)
+        quantizer = faiss.IndexFlatL2(d)
+        if index_type == "ivf_pq" or encoding == "pq":
+            return faiss.IndexIVFPQ(quantizer, d, nlist, pq_subquantizers(d), 8)
+        if encoding in sq_types:
+            return faiss.IndexIVFScalarQuantizer(
+                quantizer, d, nlist, sq_types[encoding]
+            )
+        return faiss.IndexIVFFlat(quantizer, d, nlist)
+
+    def _build(self, index_type: str, ids: np.ndarray, encoding: str = "float32"):
+        """Build an index of ``index_type`` over the stored vectors of ``ids``."""
+        index = self._new_index(index_type, len(ids), encoding)
+        if not index.is_trained:
+            sample = self.sample_vectors(ids, SEMANTIC_TRAIN_SAMPLE)
+            index.train(sample)
+        for chunk_ids, vectors in self.iter_vectors(ids):
+            index.add_with_ids(vectors, chunk_ids)
+        return index
+
+    def _target(self) -> Tuple[str, str]:
+        """Index type and encoding the current corpus size calls for."""
+        index_type = choose_index_type(self.ntotal, self.configured_type)
+        encoding = choose_encoding(self.ntotal, self.configured_encoding)
+        if index_type == "ivf_pq":
+            encoding = "pq"
+        return index_type, encoding
+
+    @property
+    def quantized(self) -> bool:
+        """Whether stored vectors are lossy approximations of the originals."""
+        return self.encoding != "float32" or self.index_type == "ivf_pq"
+
+    @_synchronized
+    def rebuild(
+        self, index_type: Optional[str] = None, encoding: Optional[str] = None
+    ) -> None:
+        """Rebuild the index from the full-precision vectors.
+
+        Args:
+            index_type: Type to build; defaults to :func:`choose_index_type`
+                for the configured type and current corpus size
+            encoding: Vector encoding; defaults to :func:`choose_encoding`
+        """
+        if self.dimension is None:
+            return
+        target_type, target_encoding = self._target()
+        index_type = index_type or target_type
+        encoding = encoding or target_encoding
+        ids = np.array(sorted(self.mapping), dtype="int64")
+        start = time.perf_counter()
+        index = self._build(index_type, ids, encoding)
+        self.index = index
+        self.index_type = index_type
+        self.encoding = encoding
+        # The old source is read until the new index is built and stored.
+        if self._holds_vectors():
+            self.store.clear()
+            self.store.dimension = self.dimension
+            self._vector_index = index
+        else:
+            self.store.rewrite(self.iter_vectors(ids))
+            self._vector_index = None
+        self._trained_count = len(ids)
+        self._tombstones = 0
+        self._mmapped = False
+        self._dirty = True
+        self._apply_search_params()
+        logger.info(
+            f"Built {index_type}/{encoding} semantic index over {len(ids)} "
+            f"vectors in {time.perf_counter() - start:.2f}s"
+        )
+
+    @_synchronized
+    def optimize(self) -> bool:
+        """Rebuild the index if its type or training no longer fits the corpus.
+
+        Switches type or encoding when the corpus crosses the automatic size
+        policy, retrains IVF, int8 and PQ indexes that have outgrown their
+        training sample, and compacts HNSW indexes carrying many deleted
+        vectors.
+
+        Returns:
+            True if the index was rebuilt
+        """
+        if self.index is None:
+            return False
+        target, encoding = self._target()
+        trained = target.startswith("ivf") or encoding in ("int8", "pq")
+        reason = None
+        if (target, encoding) != (self.index_type, self.encoding):
+            reason = (
+                f"switching from {self.index_type}/{self.encoding} "
+                f"to {target}/{encoding}"
+            )
+        elif trained and self.ntotal > RETRAIN_GROWTH * self._trained_count:
+            reason = "corpus outgrew index training"
+        elif target == "hnsw" and (
+            self._tombstones > HNSW_COMPACT_RATIO * self.index.ntotal
+        ):
+            reason = f"{self._tombstones} deleted vectors"
+        if reason is None:
+            return False
+        logger.info(f"Rebuilding semantic index: {reason}")
+        self.rebuild(target, encoding)
+        return True
+
+    @_synchronized
+    def add(
+        self,
+        vectors: np.ndarray,
+        ids: List[int],
+        paths: List[str],
+        offsets: Optional[List[int]] = None,
+    ) -> None:
+        """Store vectors under the given ids, replacing any existing vectors.
+
+        Args:
+            vectors: Matrix of shape (len(ids), dimension)
+            ids: Vector id of each row of ``vectors``
+            paths: File path for each row of ``vectors``
+            offsets: Character offset of each passage in its file
+        """
+        vectors = np.ascontiguousarray(vectors, dtype="float32").reshape(len(ids), -1)
+        if self.index is None:
+            self.dimension = vectors.shape[1]
+            # float16 needs no training; other encodings start as float32
+            # and are trained by optimize() once there is data to train on.
+            encoding = "float16" if self.configured_encoding == "float16" else "float32"
+            self.index = self._new_index("flat", len(ids), encoding)
+            self.index_type = "flat"
+            self.encoding = encoding
+            self._vector_index = self.index if self._holds_vectors() else None
+        elif vectors.shape[1] != self.dimension:
+            raise ValueError(
+                f"Embedding dimension {vectors.shape[1]} does not match "
+                f"index dimension {self.dimension}"
+            )
+        # Keep only the last vector for ids repeated within the batch.
+        latest = {int(id_): row for row, id_ in enumerate(ids)}
+        rows = sorted(latest.values())
+        id_array = np.array([int(ids[row]) for row in rows], dtype="int64")
+
+        self._ensure_writable()
+        self.remove_ids(id_array)
+        if self._vector_index is None:
+            self.store.append(id_array, vectors[rows])
+        self.index.add_with_ids(vectors[rows], id_array)
+        for row in rows:
+            self._register(int(ids[row]), paths[row], offsets[row] if offsets else 0)
+        self._dirty = True
+
+    @_synchronized
+    def remove_ids(self, ids: Iterable[int]) -> int:
+        """Delete the vectors stored under ``ids``.
+
+        Returns:
+            Number of vectors removed
+        """
+        present = [int(id_) for id_ in ids if int(id_) in self.mapping]
+        if not present:
+            return 0
+        self._ensure_writable()
+        if self.index_type == "hnsw":
+            removed = self._tombstone(present)
+        else:
+            removed = self.index.remove_ids(np.array(present, dtype="int64"))
+        for id_ in present:
+            self._unregister(id_)
+        self._dirty = True
+        return int(removed)
+
+    def _tombstone(self, ids: List[int]) -> int:
+        """Hide HNSW vectors, which FAISS cannot delete, by unlabelling them."""
+        faiss = import_faiss()
+        labels = faiss.vector_to_array(self.index.id_map)
+        hidden = np.isin(labels, np.array(ids, dtype="int64"))
+        labels[hidden] = -1
+        faiss.copy_array_to_vector(labels, self.index.id_map)
+        self.index.construct_rev_map()
+        count = int(hidden.sum())
+        self._tombstones += count
+        return count
+
+    @_synchronized
+    def remove(self, paths: Iterable[str]) -> int:
+        """Delete every passage vector stored for ``paths``.
+
+        Returns:
+            Number of vectors removed
+        """
+        return self.remove_ids(
+            [id_ for path in paths for id_ in self._ids_by_path.get(path, ())]
+        )
+
+    def _search_ids(
+        self, queries: np.ndarray, top_k: int, rerank_factor: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Distances and ids of the nearest live vectors, ids padded with -1.
+
+        Quantized indexes return ``rerank_factor`` times as many candidates,
+        which are re-ranked by exact distance to their stored float32 vectors.
+        """
+        if rerank_factor is None:
+            rerank_factor = self.rerank_factor
+        candidates = top_k
+        if self.quantized and rerank_factor > 1:
+            candidates = min(top_k * rerank_factor, self.ntotal)
+        fetch = candidates
+        if self._tombstones:
+            # Tombstoned neighbours come back unlabelled; over-fetch to cover them.
+            fetch += min(self._tombstones, 4 * candidates)
+        distances, ids = self.index.search(queries, min(fetch, self.index.ntotal))
+        if candidates > top_k:
+            distances, ids = self._rerank(queries, ids)
+        result_d = np.full((len(queries), top_k), np.inf, dtype="float32")
+        result_i = np.full((len(queries), top_k), -1, dtype="int64")
+        for row, found in enumerate(ids):
+            live = found >= 0
+            count = min(int(live.sum()), top_k)
+            result_d[row, :count] = distances[row][live][:count]
+            result_i[row, :count] = found[live][:count]
+        return result_d, result_i
+
+    def _rerank(
+        self, queries: np.ndarray, ids: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Order candidate ids by exact squared L2 distance, dropping -1 slots."""
+        distances = np.full(ids.shape, np.inf, dtype="float32")
+        ranked = np.full(ids.shape, -1, dtype="int64")
+        for row, found in enumerate(ids):
+            found = found[found >= 0]
+            if not len(found):
+                continue
+            exact = self.vectors(found) - queries[row]
+            d = np.einsum("ij,ij->i", exact, exact)
+            order = np.argsort(d, kind="stable")
+            distances[row, : len(found)] = d[order]
+            ranked[row, : len(found)] = found[order]
+        return distances, ranked
+
+    @_synchronized
+    def search_passages(
+        self, vector: np.ndarray, top_k: int
+    ) -> List[Tuple[str, int, float]]:
+        """Return ``(path, offset, distance)`` for the ``top_k`` nearest passages."""
+        if self.ntotal == 0:
+            return []
+        query = np.ascontiguousarray(vector, dtype="float32").reshape(1, -1)
+        distances, ids = self._search_ids(query, min(top_k, self.ntotal))
+        return [
+            (self.mapping[id_], self.offsets.get(id_, 0), float(distance))
+            for distance, id_ in zip(distances[0].tolist(), ids[0].tolist())
+            if id_ in self.mapping
+        ]
+
+    @_synchronized
+    def search(self, vector: np.ndarray, top_k: int) -> List[str]:
+        """Return the ``top_k`` files whose best passage is nearest.
+
+        Files are ranked by their closest passage. Passages are fetched in
+        growing rounds until ``top_k`` distinct files are found or the index
+        is exhausted, so files with many similar passages cannot crowd the
+        others out.
+        """
+        fetch = top_k * PASSAGE_FETCH_FACTOR
+        while True:
+            passages = self.search_passages(vector, fetch)
+            paths = list(dict.fromkeys(path for path, _, _ in passages))
+            if len(paths) >= top_k or fetch >= self.ntotal:
+                return paths[:top_k]
+            fetch *= 2
+
+    def _exact_neighbours(self, queries: np.ndarray, k: int) -> np.ndarray:
+        """Ground-truth neighbour ids, computed chunk by chunk from exact vectors."""
+        faiss = import_faiss()
+        best_d = np.full((len(queries), 0), np.inf, dtype="float32")
+        best_i = np.empty((len(queries), 0), dtype="int64")
+        for chunk_ids, vectors in self.iter_vectors(sorted(self.mapping)):
+            d, i = faiss.knn(queries, vectors, min(k, len(chunk_ids)))
+            best_d = np.hstack([best_d, d])
+            best_i = np.hstack([best_i, chunk_ids[i]])
+            order = np.argsort(best_d, axis=1, kind="stable")[:, :k]
+            best_d = np.take_along_axis(best_d, order, axis=1)
+            best_i = np.take_along_axis(best_i, order, axis=1)
+        return best_i
+
+    @_synchronized
+    def recall_report(
+        self,
+        queries: np.ndarray,
+        k: int = 10,
+        index_types: Optional[Sequence[str]] = None,
+        nprobe_values: Sequence[int] = (1, 4, 16, 64),
+        ef_search_values: Sequence[int] = (16, 32, 64, 128),
+        encodings: Optional[Sequence[str]] = None,
+        rerank_factors: Optional[Sequence[int]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Measure recall@k, latency and index size across index settings.
+
+        Each requested index type and encoding is built from the exact vectors
+        (the live index is reused for its own combination) and queried one
+        vector at a time, sweeping ``nprobe`` for IVF, ``efSearch`` for HNSW
+        and the re-rank factor for quantized indexes. Recall is measured
+        against exact search over the stored float32 vectors.
+
+        Args:
+            queries: Query vectors, one per row
+            k: Number of neighbours to evaluate
+            index_types: Types to compare; defaults to the current type
+            nprobe_values: IVF ``nprobe`` settings to try
+            ef_search_values: HNSW ``efSearch`` settings to try
+            encodings: Vector encodings to compare; defaults to the current one
+            rerank_factors: Re-rank factors to try on quantized indexes;
+                defaults to the configured factor
+
+        Returns:
+            One row per setting with index_type, encoding, param, value,
+            rerank, recall@k, mean_ms, p95_ms, build_s and index_mb
+        """
+        if self.ntotal == 0:
+            return []
+        queries = np.ascontiguousarray(queries, dtype="float32").reshape(
+            -1, self.dimension
+        )
+        k = min(k, self.ntotal)
+        truth = self._exact_neighbours(queries, k)
+        ids = np.array(sorted(self.mapping), dtype="int64")
+
+        faiss = import_faiss()
+        live = (self.index, self.index_type, self.encoding, self._tombstones)
+        rows: List[Dict[str, Any]] = []
+        try:
+            for index_type in index_types or [live[1]]:
+                for encoding in encodings or [live[2]]:
+                    encoding = choose_encoding(len(ids), encoding)
+                    if index_type == "ivf_pq":
+                        encoding = "pq"
+                    start = time.perf_counter()
+                    if (index_type, encoding) == live[1:3]:
+                        index, tombstones = live[0], live[3]
+                    else:
+                        index, tombstones = self._build(index_type, ids, encoding), 0
+                    build_s = time.perf_counter() - start
+                    self.index, self.index_type, self.encoding = (
+                        index,
+                        index_type,
+                        encoding,
+                    )
+                    self._tombstones = tombstones
+                    index_mb = len(faiss.serialize_index(index)) / 2**20
+                    rows.extend(
+                        self._sweep(
+                            queries,
+                            truth,
+                            k,
+                            nprobe_values,
+                            ef_search_values,
+                            rerank_factors,
+                            {"build_s": build_s, "index_mb": index_mb},
+                        )
+                    )
+        finally:
+            self.index, self.index_type, self.encoding, self._tombstones = live
+            self._apply_search_params()
+        return rows
+
+    def _sweep(
+        self,
+        queries: np.ndarray,
+        truth: np.ndarray,
+        k: int,
+        nprobe_values: Sequence[int],
+        ef_search_values: Sequence[int],
+        rerank_factors: Optional[Sequence[int]],
+        extra: Dict[str, Any],
+    ) -> List[Dict[str, Any]]:
+        """Recall and latency rows for the current index over each setting."""
+        if self.index_type.startswith("ivf"):
+            sweep = [("nprobe", value) for value in nprobe_values]
+        elif self.index_type == "hnsw":
+            sweep = [("ef_search", value) for value in ef_search_values]
+        else:
+            sweep = [(None, None)]
+        factors = [0]
+        if self.quantized:
+            factors = list(rerank_factors or [self.rerank_factor])
+        rows: List[Dict[str, Any]] = []
+        for param, value in sweep:
+            self._apply_search_params(**({param: value} if param else {}))
+            for factor in factors:
+                latencies = []
+                hits = 0
+                for query, expected in zip(queries, truth):
+                    t0 = time.perf_counter()
+                    found = self._search_ids(query.reshape(1, -1), k, factor)[1][0]
+                    latencies.append((time.perf_counter() - t0) * 1000)
+                    hits += len(np.intersect1d(found, expected))
+                rows.append(
+                    {
+                        "index_type": self.index_type,
+                        "encoding": self.encoding,
+                        "param": param,
+                        "value": value,
+                        "rerank": factor,
+                        "recall": hits / (k * len(queries)),
+                        "mean_ms": float(np.mean(latencies)),
+                        "p95_ms": float(np.percentile(latencies, 95)),
+                        **extra,
+                    }
+                )
+        return rows
+
+
+def format_recall_report(rows: List[Dict[str, Any]]) -> str:
+    """Render :meth:`SemanticIndex.recall_report` rows as a text table."""
+    lines = [
+        f"{'index':<10} {'encoding':<8} {'setting':<14} {'rerank':>6} "
+        f"{'recall':>7} {'mean ms':>8} {'p95 ms':>8} {'build s':>8} {'MB':>8}"
+    ]
+    for row in rows:
+        setting = f"{row['param']}={row['value']}" if row["param"] else "-"
+        lines.append(
+            f"{row['index_type']:<10} {row['encoding']:<8} {setting:<14} "
+            f"{row['rerank']:>6} {row['recall']:>7.3f} {row['mean_ms']:>8.3f} "
+            f"{row['p95_ms']:>8.3f} {row['build_s']:>8.2f} {row['index_mb']:>8.2f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,163 @@
+"""Full-precision on-disk copy of the vectors held by the semantic index."""
+
+import logging
+import os
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+VECTORS_FILENAME = "vectors.f32"
+IDS_FILENAME = "vector_ids.i64"
+
+
+class VectorStore:
+    """Append-only float32 vectors and their ids, read through memory maps.
+
+    Vectors added to a quantized or approximate semantic index are also
+    appended here, so ANN indexes can be trained and rebuilt from exact
+    vectors without keeping them resident. A re-added id appends a new row;
+    lookups always resolve to the most recent row for an id, and
+    :meth:`compact` drops the rest.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.dimension: Optional[int] = None
+        self._vectors: Optional[np.memmap] = None
+        self._ids: Optional[np.memmap] = None
+        self._sorted_ids: Optional[np.ndarray] = None
+        self._sorted_rows: Optional[np.ndarray] = None
+
+    @property
+    def vectors_path(self) -> Path:
+        return self.directory / VECTORS_FILENAME
+
+    @property
+    def ids_path(self) -> Path:
+        return self.directory / IDS_FILENAME
+
+    def __len__(self) -> int:
+        if not self.ids_path.exists():
+            return 0
+        return self.ids_path.stat().st_size // np.dtype("int64").itemsize
+
+    def _invalidate(self) -> None:
+        self._vectors = None
+        self._ids = None
+        self._sorted_ids = None
+        self._sorted_rows = None
+
+    def append(self, ids: Sequence[int], vectors: np.ndarray) -> None:
+        """Append one row per id."""
+        vectors = np.ascontiguousarray(vectors, dtype="float32").reshape(len(ids), -1)
+        if not len(ids):
+            return
+        if self.dimension is None:
+            self.dimension = vectors.shape[1]
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Vectors are written before ids, so an interrupted append leaves at
+        # most an unreferenced vector tail; trim it to keep rows aligned.
+        expected = len(self) * self.dimension * np.dtype("float32").itemsize
+        if self.vectors_path.exists() and self.vectors_path.stat().st_size != expected:
+            os.truncate(self.vectors_path, expected)
+        with open(self.vectors_path, "ab") as f:
+            f.write(vectors.tobytes())
+        with open(self.ids_path, "ab") as f:
+            f.write(np.asarray(ids, dtype="int64").tobytes())
+        self._invalidate()
+
+    def _maps(self) -> Tuple[np.memmap, np.memmap]:
+        if self._ids is None:
+            rows = len(self)
+            self._ids = np.memmap(self.ids_path, dtype="int64", mode="r", shape=(rows,))
+            self._vectors = np.memmap(
+                self.vectors_path,
+                dtype="float32",
+                mode="r",
+                shape=(rows, self.dimension),
+            )
+        return self._ids, self._vectors
+
+    def rows_of(self, ids: Sequence[int]) -> np.ndarray:
+        """Latest row of each id, or -1 where the id was never stored."""
+        ids = np.asarray(ids, dtype="int64")
+        if len(self) == 0 or self.dimension is None:
+            return np.full(len(ids), -1, dtype="int64")
+        if self._sorted_ids is None:
+            stored, _ = self._maps()
+            # Reverse so that np.unique keeps the last occurrence of each id.
+            reversed_ids = np.asarray(stored[::-1])
+            unique, first = np.unique(reversed_ids, return_index=True)
+            self._sorted_ids = unique
+            self._sorted_rows = len(reversed_ids) - 1 - first
+        positions = np.searchsorted(self._sorted_ids, ids)
+        positions = np.minimum(positions, len(self._sorted_ids) - 1)
+        found = self._sorted_ids[positions] == ids
+        return np.where(found, self._sorted_rows[positions], -1)
+
+    def get(self, ids: Sequence[int]) -> np.ndarray:
+        """Float32 vectors for ``ids``, in order.
+
+        Raises:
+            KeyError: If any id has no stored vector
+        """
+        rows = self.rows_of(ids)
+        if not len(rows):
+            return np.empty((0, self.dimension or 0), dtype="float32")
+        if (rows < 0).any():
+            raise KeyError(f"No stored vector for ids {np.asarray(ids)[rows < 0][:5]}")
+        _, vectors = self._maps()
+        return np.asarray(vectors[rows], dtype="float32")
+
+    def iter_vectors(
+        self, ids: Sequence[int], chunk_size: int = 65536
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Yield ``(ids, vectors)`` chunks so callers never hold every vector."""
+        ids = np.asarray(ids, dtype="int64")
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start : start + chunk_size]
+            yield chunk, self.get(chunk)
+
+    def sample(self, ids: Sequence[int], count: int, seed: int = 0) -> np.ndarray:
+        """Vectors of up to ``count`` ids drawn at random from ``ids``."""
+        ids = np.asarray(ids, dtype="int64")
+        if len(ids) > count:
+            ids = np.sort(np.random.default_rng(seed).choice(ids, count, replace=False))
+        return self.get(ids)
+
+    def compact(self, ids: Sequence[int]) -> None:
+        """Rewrite the store keeping only the latest vectors of ``ids``."""
+        self.rewrite(self.iter_vectors(ids))
+
+    def rewrite(self, chunks: Iterable[Tuple[np.ndarray, np.ndarray]]) -> None:
+        """Atomically replace the store with ``(ids, vectors)`` chunks.
+
+        The chunks may be read from this store; it is only replaced once they
+        have all been written.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_vectors = self.vectors_path.with_suffix(".f32.tmp")
+        tmp_ids = self.ids_path.with_suffix(".i64.tmp")
+        with open(tmp_vectors, "wb") as vf, open(tmp_ids, "wb") as idf:
+            for chunk_ids, vectors in chunks:
+                vectors = np.ascontiguousarray(vectors, dtype="float32")
+                if len(chunk_ids) and self.dimension is None:
+                    self.dimension = vectors.shape[1]
+                vf.write(vectors.tobytes())
+                idf.write(np.asarray(chunk_ids, dtype="int64").tobytes())
+        self._invalidate()
+        os.replace(tmp_vectors, self.vectors_path)
+        os.replace(tmp_ids, self.ids_path)
+
+    def clear(self) -> None:
+        """Delete the stored vectors."""
+        self._invalidate()
+        self.dimension = None
+        for path in (self.vectors_path, self.ids_path):
+            try:
+                path.unlink(missing_ok=True)
+            except OSError as e:
+                logger.error(f"Error removing {path}: {e}")
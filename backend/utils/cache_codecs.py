@@ -0,0 +1,130 @@
+"""Serialization and compression of values stored in the disk cache."""
+
+import functools
+import json
+import logging
+import pickle
+import zlib
+from typing import Any, Callable, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Tried in order when the compression setting is "auto".
+AUTO_COMPRESSION = ("zstd", "lz4", "zlib")
+
+
+def _import(module: str, package: str):
+    try:
+        return __import__(module, fromlist=["_"])
+    except ImportError:
+        raise ImportError(f"{package} is not installed. Run `pip install {package}`.")
+
+
+@functools.lru_cache(maxsize=None)
+def _serializer(name: str) -> Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]:
+    if name == "json":
+        return (
+            lambda value: json.dumps(value, separators=(",", ":")).encode("utf-8"),
+            json.loads,
+        )
+    if name == "pickle":
+        return (
+            functools.partial(pickle.dumps, protocol=pickle.HIGHEST_PROTOCOL),
+            pickle.loads,
+        )
+    if name == "msgpack":
+        msgpack = _import("msgpack", "msgpack")
+        return (
+            functools.partial(msgpack.packb, use_bin_type=True),
+            functools.partial(msgpack.unpackb, raw=False, strict_map_key=False),
+        )
+    raise ValueError(f"Unknown cache serializer: {name}")
+
+
+@functools.lru_cache(maxsize=None)
+def _compressor(name: str) -> Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]:
+    if name == "zstd":
+        zstandard = _import("zstandard", "zstandard")
+        return (
+            zstandard.ZstdCompressor(level=3).compress,
+            zstandard.ZstdDecompressor().decompress,
+        )
+    if name == "lz4":
+        lz4_frame = _import("lz4.frame", "lz4")
+        return lz4_frame.compress, lz4_frame.decompress
+    if name == "zlib":
+        return functools.partial(zlib.compress, level=1), zlib.decompress
+    raise ValueError(f"Unknown cache compression: {name}")
+
+
+@functools.lru_cache(maxsize=None)
+def resolve_compression(name: str) -> str:
+    """
+    Map a compression setting to an available compressor.
+
+    Args:
+        name: "auto", "none" or a compressor name ("zstd", "lz4", "zlib")
+
+    Returns:
+        The compressor to use, or "none"
+    """
+    if name != "auto":
+        if name != "none":
+            _compressor(name)
+        return name
+    for candidate in AUTO_COMPRESSION:
+        try:
+            _compressor(candidate)
+            return candidate
+        except ImportError:
+            continue
+    return "none"
+
+
+def encode(
+    value: Any, serializer: str, compression: str = "none", min_bytes: int = 0
+) -> Tuple[str, bytes]:
+    """
+    Serialize and optionally compress a value.
+
+    Values the serializer cannot represent (msgpack and JSON reject tuples
+    as keys, ``Path`` and dataclasses) fall back to pickle. Payloads under
+    ``min_bytes`` are stored uncompressed, where compression rarely pays.
+
+    Args:
+        value: Value to encode
+        serializer: "pickle", "msgpack" or "json"
+        compression: Compressor name or "none"
+        min_bytes: Smallest serialized size worth compressing
+
+    Returns:
+        Codec name recorded with the entry (e.g. "pickle+zstd") and the data
+    """
+    try:
+        data = _serializer(serializer)[0](value)
+    except (TypeError, ValueError, OverflowError) as e:
+        if serializer == "pickle":
+            raise
+        logger.debug(f"{serializer} cannot encode value, using pickle: {e}")
+        serializer = "pickle"
+        data = _serializer(serializer)[0](value)
+    if compression == "none" or len(data) < min_bytes:
+        return serializer, data
+    return f"{serializer}+{compression}", _compressor(compression)[0](data)
+
+
+def decode(codec: str, data: bytes) -> Any:
+    """
+    Decode data written by :func:`encode`.
+
+    Args:
+        codec: Codec name recorded with the entry
+        data: Encoded bytes
+
+    Returns:
+        The original value
+    """
+    serializer, _, compression = codec.partition("+")
+    if compression:
+        data = _compressor(compression)[1](data)
+    return _serializer(serializer)[1](data)
@@ -1,49 +1,192 @@
 """Provides caching capabilities for performance optimization."""
 
+import asyncio
+import contextlib
+import functools
+import hashlib
+import inspect
 import logging
-import os
+import sys
+import threading
 import time
 from collections import OrderedDict
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, Optional
-
-from backend.config.settings import CACHE_DIR
-from backend.utils.async_io import AsyncFileIO
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from backend.config.settings import (
+    CACHE_DIR,
+    CACHE_SWEEP_BUDGET,
+    CACHE_SWEEP_INTERVAL,
+    CHUNK_SIZE,
+    CONTENT_CACHE_HASH,
+    CONTENT_CACHE_TTL,
+    MAX_CACHE_SIZE,
+    MAX_MEMORY_CACHE_BYTES,
+)
+from backend.utils.disk_cache import (
+    CACHE_DB_FILENAME,
+    CacheEntry,
+    DiskCacheBackend,
+    SQLiteDiskCache,
+)
 
 logger = logging.getLogger(__name__)
 
 
+def estimate_size(value: Any) -> int:
+    """
+    Estimate the memory held by a value, following the objects it contains.
+
+    Containers, strings, bytes and object ``__dict__``/``__slots__`` are
+    walked; objects reachable twice are counted once.
+
+    Args:
+        value: Object to measure
+
+    Returns:
+        Approximate size in bytes
+    """
+    seen = set()
+    total = 0
+    stack = [value]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, (str, bytes, bytearray, int, float, bool)):
+            continue
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        else:
+            if hasattr(obj, "__dict__"):
+                stack.append(vars(obj))
+            for slot in getattr(type(obj), "__slots__", ()):
+                if hasattr(obj, slot):
+                    stack.append(getattr(obj, slot))
+    return total
+
+
 class LRUCache:
-    """Limited size in-memory LRU cache implementation."""
+    """Limited size in-memory LRU cache implementation.
 
-    def __init__(self, max_size: int = 1000):
-        """Initialize LRU cache with maximum size."""
+    The cache is bounded by entry count (``max_size``), by the total size of
+    its values in bytes (``max_bytes``), or both; the least recently used
+    entries are evicted until every bound holds. Value sizes are estimated
+    with :func:`estimate_size` unless the caller passes one to :meth:`put`.
+    """
+
+    def __init__(self, max_size: Optional[int] = 1000, max_bytes: Optional[int] = None):
+        """
+        Initialize LRU cache.
+
+        Args:
+            max_size: Maximum number of entries, or None for no count limit
+            max_bytes: Maximum total size of values, or None for no byte limit
+        """
         self.cache = OrderedDict()
         self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._sizes: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.cache)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.cache
+
+    def keys(self) -> Iterator[str]:
+        return iter(list(self.cache))
+
+    def oldest(self, limit: int) -> List[Tuple[str, Any]]:
+        """Up to ``limit`` least recently used entries, oldest first."""
+        return list(islice(self.cache.items(), limit))
 
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache, moving item to end (most recently used)."""
         if key not in self.cache:
+            self.misses += 1
             return None
 
         # Move to end (mark as recently used)
         self.cache.move_to_end(key)
+        self.hits += 1
         return self.cache[key]
 
-    def put(self, key: str, value: Any) -> None:
-        """Add or update value in cache, evicting oldest item if full."""
-        # If already exists, update and move to end
-        if key in self.cache:
-            self.cache.move_to_end(key)
-            self.cache[key] = value
+    def put(self, key: str, value: Any, size: Optional[int] = None) -> None:
+        """
+        Add or update value in cache, evicting least recently used items.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            size: Size of the value in bytes; estimated when omitted and the
+                cache has a byte limit
+        """
+        if size is None:
+            size = estimate_size(value) if self.max_bytes is not None else 0
+        self.pop(key)
+        if self.max_bytes is not None and size > self.max_bytes:
+            # Caching it would flush everything else and still not fit.
+            logger.debug(f"Not caching {key}: {size} bytes exceeds the budget")
+            self.evictions += 1
             return
 
-        # Add new item
         self.cache[key] = value
+        self._sizes[key] = size
+        self.current_bytes += size
+
+        # Evict oldest items if needed
+        while (self.max_size is not None and len(self.cache) > self.max_size) or (
+            self.max_bytes is not None and self.current_bytes > self.max_bytes
+        ):
+            oldest, _ = self.cache.popitem(last=False)
+            self.current_bytes -= self._sizes.pop(oldest)
+            self.evictions += 1
+
+    def pop(self, key: str) -> Optional[Any]:
+        """Remove an entry, returning its value or None if absent."""
+        if key not in self.cache:
+            return None
+        self.current_bytes -= self._sizes.pop(key)
+        return self.cache.pop(key)
 
-        # Evict oldest item if needed
-        if len(self.cache) > self.max_size:
-            self.cache.popitem(last=False)
+    def clear(self) -> None:
+        """Remove every entry; counters are kept."""
+        self.cache.clear()
+        self._sizes.clear()
+        self.current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count, bytes held, limits, and hit/miss/eviction counters."""
+        return {
+            "entries": len(self.cache),
+            "max_size": self.max_size,
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
 
 
 class CacheManager:
@@ -52,21 +195,74 @@ class CacheManager:
     def __init__(
         self,
         cache_dir: Path = CACHE_DIR,
-        memory_cache_size: int = 1000,
-        disk_cache_ttl: int = 3600,
-    ):  # 1 hour TTL by default
+        memory_cache_size: Optional[int] = 1000,
+        disk_cache_ttl: int = 3600,  # 1 hour TTL by default
+        memory_cache_bytes: Optional[int] = MAX_MEMORY_CACHE_BYTES,
+        disk_backend: Optional[DiskCacheBackend] = None,
+        disk_cache_max_bytes: Optional[int] = MAX_CACHE_SIZE,
+        sweep_interval: float = CACHE_SWEEP_INTERVAL,
+        sweep_budget: int = CACHE_SWEEP_BUDGET,
+    ):
         """
         Initialize the cache manager.
 
         Args:
-            cache_dir: Directory to store disk cache files
-            memory_cache_size: Maximum number of items in memory cache
+            cache_dir: Directory holding the disk cache
+            memory_cache_size: Maximum number of items in memory cache, or None
             disk_cache_ttl: Time-to-live for disk cache entries in seconds
+            memory_cache_bytes: Maximum estimated bytes held by the memory
+                cache, or None to bound it by item count only
+            disk_backend: Disk storage to use; defaults to a single SQLite
+                file in ``cache_dir``
+            disk_cache_max_bytes: Size the sweeper shrinks the disk cache
+                to, or None for no limit
+            sweep_interval: Seconds between background sweeps of expired
+                entries, or 0 to sweep only when :meth:`sweep` is called
+            sweep_budget: Most entries each sweep removes from memory and
+                from disk
         """
         self.cache_dir = cache_dir
-        self.memory_cache = LRUCache(max_size=memory_cache_size)
+        self.memory_cache = LRUCache(
+            max_size=memory_cache_size, max_bytes=memory_cache_bytes
+        )
         self.disk_cache_ttl = disk_cache_ttl
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.disk = disk_backend or SQLiteDiskCache(cache_dir / CACHE_DB_FILENAME)
+        self.disk_cache_max_bytes = disk_cache_max_bytes
+        self.sweep_interval = sweep_interval
+        self.sweep_budget = sweep_budget
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        # Computations started by get_or_compute, by key.
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._sweeper: Optional[asyncio.Task] = None
+
+    async def _lookup(self, key: str, grace: float = 0.0) -> Optional[CacheEntry]:
+        """Find an entry in memory, then on disk, that expired less than
+        ``grace`` seconds ago if at all; entries expired for longer are dropped.
+        """
+        now = time.time()
+        entry = self.memory_cache.get(key)
+        if entry is not None:
+            if not entry.expired(now, grace):
+                self.hits += 1
+                return entry
+            self.memory_cache.pop(key)
+            self.expirations += 1
+
+        try:
+            entry = await self.disk.get_entry(key, grace)
+        except Exception as e:
+            logger.error(f"Error reading disk cache entry {key}: {e}")
+            entry = None
+        if entry is not None:
+            # Update memory cache
+            self.memory_cache.put(key, entry)
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
 
     async def get(self, key: str) -> Optional[Any]:
         """
@@ -78,53 +274,114 @@ class CacheManager:
         Returns:
             Cached item or None if not found or expired
         """
-        # Try memory cache first
-        memory_result = self.memory_cache.get(key)
-        if memory_result is not None:
-            return memory_result
-
-        # Try disk cache
-        cache_file = self.cache_dir / f"{key}.json"
-        if await AsyncFileIO.exists(cache_file):
-            try:
-                # Check if cache entry is expired
-                stats = os.stat(cache_file)
-                if time.time() - stats.st_mtime > self.disk_cache_ttl:
-                    await self.invalidate(key)
-                    return None
-
-                data = await AsyncFileIO.read_json(cache_file)
-                if data:
-                    # Update memory cache
-                    self.memory_cache.put(key, data)
-                    return data
-            except Exception as e:
-                logger.error(f"Error reading cache file {cache_file}: {e}")
-
-        return None
+        entry = await self._lookup(key)
+        return entry.value if entry is not None else None
 
-    async def put(self, key: str, value: Any) -> bool:
+    async def put(
+        self,
+        key: str,
+        value: Any,
+        size: Optional[int] = None,
+        ttl: Optional[float] = None,
+    ) -> bool:
         """
         Store item in both memory and disk cache.
 
         Args:
             key: Cache key
-            value: Data to cache (must be JSON serializable)
+            value: Data to cache (must be picklable)
+            size: Size of the value in bytes, if known; otherwise estimated
+            ttl: Seconds until the entry expires; defaults to ``disk_cache_ttl``
 
         Returns:
             True if successful, False otherwise
         """
+        ttl = self.disk_cache_ttl if ttl is None else ttl
+        self._start_sweeper()
         try:
             # Update memory cache
-            self.memory_cache.put(key, value)
+            self.memory_cache.put(key, CacheEntry(value, time.time() + ttl), size)
 
             # Update disk cache
-            cache_file = self.cache_dir / f"{key}.json"
-            return await AsyncFileIO.write_json(cache_file, value)
+            return await self.disk.put(key, value, ttl)
         except Exception as e:
             logger.error(f"Error writing to cache for key {key}: {e}")
             return False
 
+    async def get_or_compute(
+        self,
+        key: str,
+        factory: Callable[[], Union[Any, Awaitable[Any]]],
+        ttl: Optional[float] = None,
+        stale_ttl: float = 0.0,
+        cache_if: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """
+        Get an item from cache, computing and storing it on a miss.
+
+        Concurrent callers missing the same key share one call to
+        ``factory``: the first starts it and the rest await its result. With
+        ``stale_ttl``, an entry that expired less than that many seconds ago
+        is returned at once while a single background computation refreshes
+        it.
+
+        Args:
+            key: Cache key
+            factory: Callable producing the value; may be a coroutine function
+            ttl: Seconds until the computed entry expires; defaults to
+                ``disk_cache_ttl``
+            stale_ttl: Seconds past expiry during which the old value is
+                still served
+            cache_if: Predicate a computed value must pass to be stored;
+                values failing it are returned but computed again next time
+
+        Returns:
+            The cached or computed value
+        """
+        entry = await self._lookup(key, stale_ttl)
+        if entry is not None:
+            if entry.expired(time.time()):
+                self._compute(key, factory, ttl, cache_if)
+            return entry.value
+        # Shielded so that a cancelled caller does not cancel the others.
+        return await asyncio.shield(self._compute(key, factory, ttl, cache_if))
+
+    def _compute(
+        self,
+        key: str,
+        factory: Callable[[], Union[Any, Awaitable[Any]]],
+        ttl: Optional[float],
+        cache_if: Optional[Callable[[Any], bool]] = None,
+    ) -> asyncio.Task:
+        """Return the running computation for a key, starting one if needed."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run_factory(key, factory, ttl, cache_if))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return task
+
+    async def _run_factory(
+        self,
+        key: str,
+        factory: Callable[[], Union[Any, Awaitable[Any]]],
+        ttl: Optional[float],
+        cache_if: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        value = factory()
+        if inspect.isawaitable(value):
+            value = await value
+        if cache_if is None or cache_if(value):
+            await self.put(key, value, ttl=ttl)
+        return value
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            # Waiting callers see the error; this covers background refreshes.
+            logger.error(f"Error computing cache entry {key}: {task.exception()}")
+
     async def invalidate(self, key: str) -> None:
         """
         Remove item from both memory and disk cache.
@@ -132,17 +389,29 @@ class CacheManager:
         Args:
             key: Cache key to invalidate
         """
-        # Remove from memory cache
-        if key in self.memory_cache.cache:
-            del self.memory_cache.cache[key]
+        self.memory_cache.pop(key)
+        try:
+            await self.disk.delete(key)
+        except Exception as e:
+            logger.error(f"Error removing disk cache entry {key}: {e}")
 
-        # Remove from disk cache
-        cache_file = self.cache_dir / f"{key}.json"
-        if await AsyncFileIO.exists(cache_file):
-            try:
-                os.remove(cache_file)
-            except Exception as e:
-                logger.error(f"Error removing cache file {cache_file}: {e}")
+    async def invalidate_prefix(self, prefix: str) -> None:
+        """
+        Remove all cache entries whose key starts with a prefix.
+
+        Unlike :meth:`invalidate_pattern`, this is an indexed range delete on
+        disk.
+
+        Args:
+            prefix: Key prefix to match
+        """
+        for key in self.memory_cache.keys():
+            if key.startswith(prefix):
+                self.memory_cache.pop(key)
+        try:
+            await self.disk.delete_prefix(prefix)
+        except Exception as e:
+            logger.error(f"Error removing cache entries with prefix {prefix}: {e}")
 
     async def invalidate_pattern(self, pattern: str) -> None:
         """
@@ -152,61 +421,244 @@ class CacheManager:
             pattern: Pattern to match against cache keys
         """
         # Remove from memory cache
-        keys_to_remove = [
-            key for key in self.memory_cache.cache.keys() if pattern in key
-        ]
-        for key in keys_to_remove:
-            del self.memory_cache.cache[key]
+        for key in self.memory_cache.keys():
+            if pattern in key:
+                self.memory_cache.pop(key)
 
         # Remove from disk cache
         try:
-            for cache_file in self.cache_dir.glob(f"*{pattern}*.json"):
-                try:
-                    os.remove(cache_file)
-                except Exception as e:
-                    logger.error(f"Error removing cache file {cache_file}: {e}")
+            await self.disk.delete_pattern(pattern)
         except Exception as e:
-            logger.error(f"Error removing cache files matching pattern {pattern}: {e}")
+            logger.error(
+                f"Error removing cache entries matching pattern {pattern}: {e}"
+            )
 
     async def clear(self) -> None:
         """Clear all cache entries from both memory and disk."""
         # Clear memory cache
-        self.memory_cache.cache.clear()
+        self.memory_cache.clear()
 
         # Clear disk cache
         try:
-            for cache_file in self.cache_dir.glob("*.json"):
-                try:
-                    os.remove(cache_file)
-                except Exception as e:
-                    logger.error(f"Error removing cache file {cache_file}: {e}")
+            await self.disk.clear()
         except Exception as e:
             logger.error(f"Error clearing disk cache: {e}")
 
+    async def sweep(self) -> Tuple[int, int]:
+        """
+        Remove expired entries, within ``sweep_budget`` per tier.
+
+        The least recently used memory entries are checked, as those are the
+        likeliest to have expired unread; on disk, entries are removed in
+        order of expiry, then evicted while the cache exceeds
+        ``disk_cache_max_bytes``.
+
+        Returns:
+            Numbers of entries expired and evicted
+        """
+        now = time.time()
+        expired = 0
+        for key, entry in self.memory_cache.oldest(self.sweep_budget):
+            if entry.expired(now):
+                self.memory_cache.pop(key)
+                expired += 1
+        self.expirations += expired
+
+        try:
+            disk_expired, evicted = await self.disk.sweep(
+                self.sweep_budget, self.disk_cache_max_bytes
+            )
+        except Exception as e:
+            logger.error(f"Error sweeping disk cache: {e}")
+            return expired, 0
+        return expired + disk_expired, evicted
+
+    def _start_sweeper(self) -> None:
+        """Run :meth:`sweep` periodically on the current event loop."""
+        if self.sweep_interval <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        if (
+            self._sweeper is not None
+            and not self._sweeper.done()
+            and self._sweeper.get_loop() is loop
+        ):
+            return
+        self._sweeper = loop.create_task(self._sweep_periodically())
+
+    async def _sweep_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            expired, evicted = await self.sweep()
+            if expired or evicted:
+                logger.debug(
+                    f"Cache sweep expired {expired} and evicted {evicted} entries"
+                )
+
+    async def close(self) -> None:
+        """Stop the sweeper and release the disk backend."""
+        if self._sweeper is not None and not self._sweeper.done():
+            self._sweeper.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._sweeper
+        self._sweeper = None
+        await self.disk.close()
+
     async def get_stats(self) -> Dict[str, Any]:
         """
         Get cache statistics.
 
+        Every figure is a maintained counter, so this takes constant time
+        however many entries the cache holds.
+
         Returns:
             Dictionary containing cache statistics
         """
-        disk_cache_size = 0
-        disk_cache_count = 0
+        disk = {"entries": 0, "bytes": 0, "expirations": 0, "evictions": 0}
         try:
-            for cache_file in self.cache_dir.glob("*.json"):
-                disk_cache_size += os.path.getsize(cache_file)
-                disk_cache_count += 1
+            disk = await self.disk.stats()
         except Exception as e:
             logger.error(f"Error calculating disk cache stats: {e}")
 
+        memory = self.memory_cache.stats()
         return {
-            "memory_cache_size": len(self.memory_cache.cache),
-            "memory_cache_max_size": self.memory_cache.max_size,
-            "disk_cache_size_bytes": disk_cache_size,
-            "disk_cache_count": disk_cache_count,
+            "memory_cache_size": memory["entries"],
+            "memory_cache_max_size": memory["max_size"],
+            "memory_cache_bytes": memory["bytes"],
+            "memory_cache_max_bytes": memory["max_bytes"],
+            "memory_cache_hits": memory["hits"],
+            "memory_cache_misses": memory["misses"],
+            "memory_cache_evictions": memory["evictions"],
+            "disk_cache_size_bytes": disk["bytes"],
+            "disk_cache_count": disk["entries"],
             "disk_cache_ttl": self.disk_cache_ttl,
+            "disk_cache_max_bytes": self.disk_cache_max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expirations": self.expirations + disk["expirations"],
+            "evictions": memory["evictions"] + disk["evictions"],
         }
 
 
-# Create a singleton instance for application-wide use
-cache_manager = CacheManager()
+_shared_cache: Optional[CacheManager] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_cache_manager() -> CacheManager:
+    """
+    Return the application-wide cache manager, creating it on first use.
+
+    It stores its disk cache in ``CACHE_DIR``, so importing this module never
+    touches the disk.
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = CacheManager(CACHE_DIR)
+        return _shared_cache
+
+
+def set_cache_manager(manager: Optional[CacheManager]) -> Optional[CacheManager]:
+    """
+    Replace the application-wide cache manager.
+
+    Args:
+        manager: Cache manager to share, or None to create a new one in
+            ``CACHE_DIR`` on next use
+
+    Returns:
+        The previously shared cache manager, if one had been created
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        previous, _shared_cache = _shared_cache, manager
+    return previous
+
+
+def __getattr__(name: str) -> Any:
+    # ``cache_manager`` predates get_cache_manager(); resolve it lazily.
+    if name == "cache_manager":
+        return get_cache_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _hash_file(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_error_result(value: Any) -> bool:
+    """Whether ``value`` is a parser-style ``{"error": ...}`` result."""
+    return isinstance(value, dict) and "error" in value
+
+
+def memoize_by_content(
+    version: int = 1,
+    path_arg: str = "file_path",
+    hash_content: bool = CONTENT_CACHE_HASH,
+    ttl: float = CONTENT_CACHE_TTL,
+    cache: Optional[CacheManager] = None,
+    is_error: Callable[[Any], bool] = is_error_result,
+) -> Callable:
+    """
+    Cache the results of an async function of a file by the file's content.
+
+    Results are keyed on the function, ``version``, the resolved path, the
+    file size and either its modification time in nanoseconds or a hash of
+    its bytes, so an unchanged file is never processed twice, even across
+    runs. When a file changes, entries for its earlier contents are dropped.
+    Bump ``version`` whenever the function's output changes for the same
+    input. Exceptions and results flagged by ``is_error`` are not cached, so
+    a transient failure is retried on the next call.
+
+    Args:
+        version: Version of the function's output format
+        path_arg: Name of the parameter holding the file path
+        hash_content: Key on a hash of the file's bytes instead of its
+            modification time; slower, but survives copies and touches
+        ttl: Seconds until a cached result expires
+        cache: Cache manager to use; defaults to the shared one from
+            :func:`get_cache_manager`, looked up on every call
+        is_error: Predicate marking results that report a failure
+
+    Returns:
+        Decorator for an async function or method
+    """
+
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable:
+        signature = inspect.signature(func)
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            manager = cache or get_cache_manager()
+            path = Path(signature.bind(*args, **kwargs).arguments[path_arg])
+            try:
+                path = path.resolve()
+                stat = path.stat()
+                stamp = (
+                    await asyncio.to_thread(_hash_file, path)
+                    if hash_content
+                    else stat.st_mtime_ns
+                )
+            except OSError:
+                # Missing or unreadable: let the function report it.
+                return await func(*args, **kwargs)
+
+            prefix = f"content:{name}:{path.as_posix()}|"
+            key = f"{prefix}{version}:{stat.st_size}:{stamp}"
+
+            async def compute():
+                await manager.invalidate_prefix(prefix)
+                return await func(*args, **kwargs)
+
+            return await manager.get_or_compute(
+                key, compute, ttl=ttl, cache_if=lambda value: not is_error(value)
+            )
+
+        return wrapper
+
+    return decorator
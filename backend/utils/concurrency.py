@@ -1,12 +1,46 @@
 """Provides enhanced concurrency tools for efficient parallel processing."""
 
 import asyncio
+import contextlib
 import functools
+import importlib
 import logging
+import multiprocessing
 import os
-from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+from collections import deque
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from concurrent.futures.process import BrokenProcessPool
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, TypeVar
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from backend.config.settings import (
+    PROCESS_POOL_CHUNK_SIZE,
+    PROCESS_POOL_MAX_MEMORY_MB,
+    PROCESS_POOL_SIZE,
+    PROCESS_POOL_TASK_TIMEOUT,
+    PROCESS_POOL_WARMUP_MODULES,
+    THREAD_POOL_AGING_SECONDS,
+    THREAD_POOL_LOW_PRIORITY_SHARE,
+)
 
 logger = logging.getLogger(__name__)
 T = TypeVar("T")
@@ -20,22 +54,136 @@ class TaskPriority(Enum):
     HIGH = 2
 
 
+class _QueuedTask(NamedTuple):
+    priority: TaskPriority
+    enqueued_at: float
+    # Resolved when the task is given a worker thread.
+    started: asyncio.Future
+
+
+class PriorityStats:
+    """Queue depth and wait-time counters for one priority level."""
+
+    def __init__(self, limit: Optional[int]):
+        self.limit = limit
+        self.running = 0
+        self.submitted = 0
+        self.started = 0
+        self.aged = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def as_dict(self, queued: int) -> Dict[str, Any]:
+        return {
+            "queued": queued,
+            "running": self.running,
+            "limit": self.limit,
+            "submitted": self.submitted,
+            "started": self.started,
+            "aged": self.aged,
+            "avg_wait_ms": 1000 * self.total_wait / self.started
+            if self.started
+            else 0.0,
+            "max_wait_ms": 1000 * self.max_wait,
+        }
+
+
 class AsyncThreadPoolExecutor:
-    """Thread pool executor with async interface and priority scheduling."""
+    """Thread pool executor with async interface and priority scheduling.
 
-    def __init__(self, max_workers: Optional[int] = None):
+    Submitted calls wait in one FIFO queue per priority and are handed to the
+    worker threads by a dispatcher, never more than there are threads, so
+    the pool itself never queues. The dispatcher starts the waiting task with
+    the highest effective priority: its own level plus one for every
+    ``aging_seconds`` it has waited, so a steady stream of HIGH work cannot
+    starve LOW work forever. Per-priority limits keep, for example,
+    background LOW work from occupying every thread.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        aging_seconds: float = THREAD_POOL_AGING_SECONDS,
+        priority_limits: Optional[Dict[TaskPriority, int]] = None,
+    ):
         """
         Initialize executor with optional worker limit.
 
         Args:
             max_workers: Maximum number of worker threads (defaults to CPU count * 5)
+            aging_seconds: Seconds of waiting that raise a task's effective
+                priority by one level
+            priority_limits: Most threads each priority may occupy at once;
+                by default LOW may use ``THREAD_POOL_LOW_PRIORITY_SHARE`` of
+                them and the other levels are unlimited
         """
         if max_workers is None:
             max_workers = min(32, os.cpu_count() * 5)
+        if priority_limits is None:
+            priority_limits = {
+                TaskPriority.LOW: max(
+                    1, int(max_workers * THREAD_POOL_LOW_PRIORITY_SHARE)
+                )
+            }
+
+        self.max_workers = max_workers
+        self.aging_seconds = aging_seconds
+        self.executor = self._new_executor()
+        self._running = 0
+        self._queues: Dict[TaskPriority, Deque[_QueuedTask]] = {
+            priority: deque() for priority in TaskPriority
+        }
+        self._stats = {
+            priority: PriorityStats(priority_limits.get(priority))
+            for priority in TaskPriority
+        }
 
-        self.executor = ThreadPoolExecutor(max_workers=max_workers)
-        self.semaphore = asyncio.Semaphore(max_workers)
-        self._tasks: Dict[asyncio.Task, TaskPriority] = {}
+    def _new_executor(self) -> Executor:
+        return ThreadPoolExecutor(max_workers=self.max_workers)
+
+    def _next_task(self, now: float) -> Optional[_QueuedTask]:
+        """Pop the waiting task with the highest aged priority, if any may start."""
+        heads = []
+        for priority, queue in self._queues.items():
+            while queue and queue[0].started.done():
+                queue.popleft()  # Cancelled while waiting.
+            stats = self._stats[priority]
+            if queue and (stats.limit is None or stats.running < stats.limit):
+                heads.append(queue[0])
+        if not heads:
+            return None
+
+        def rank(task: _QueuedTask):
+            waited = now - task.enqueued_at
+            # Ties go to the task that has waited longest.
+            return task.priority.value + waited / self.aging_seconds, waited
+
+        best = max(heads, key=rank)
+        self._queues[best.priority].popleft()
+        if any(task.priority.value > best.priority.value for task in heads):
+            self._stats[best.priority].aged += 1
+        return best
+
+    def _dispatch(self) -> None:
+        """Start waiting tasks while worker threads are free."""
+        now = time.monotonic()
+        while self._running < self.max_workers:
+            task = self._next_task(now)
+            if task is None:
+                return
+            waited = now - task.enqueued_at
+            stats = self._stats[task.priority]
+            stats.running += 1
+            stats.started += 1
+            stats.total_wait += waited
+            stats.max_wait = max(stats.max_wait, waited)
+            self._running += 1
+            task.started.set_result(None)
+
+    def _release(self, priority: TaskPriority) -> None:
+        self._running -= 1
+        self._stats[priority].running -= 1
+        self._dispatch()
 
     async def submit(
         self,
@@ -56,24 +204,50 @@ class AsyncThreadPoolExecutor:
         Returns:
             Result of the function execution
         """
-        async with self.semaphore:
-            loop = asyncio.get_event_loop()
-
-            # Create the task
-            task = loop.create_task(
-                loop.run_in_executor(
-                    self.executor, functools.partial(func, *args, **kwargs)
-                )
-            )
+        loop = asyncio.get_running_loop()
+        queued = _QueuedTask(priority, time.monotonic(), loop.create_future())
+        self._queues[priority].append(queued)
+        self._stats[priority].submitted += 1
+        self._dispatch()
+
+        try:
+            await queued.started
+        except asyncio.CancelledError:
+            if queued.started.done() and not queued.started.cancelled():
+                # Given a thread just as the caller gave up.
+                self._release(priority)
+            else:
+                with contextlib.suppress(ValueError):
+                    self._queues[priority].remove(queued)
+            raise
+
+        try:
+            return await self._execute(func, args, kwargs)
+        finally:
+            self._release(priority)
+
+    async def _execute(
+        self, func: Callable[..., T], args: Tuple, kwargs: Dict[str, Any]
+    ) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(func, *args, **kwargs)
+        )
 
-            # Store task with priority
-            self._tasks[task] = priority
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Scheduling metrics for each priority level.
 
-            try:
-                return await task
-            finally:
-                if task in self._tasks:
-                    del self._tasks[task]
+        Returns:
+            Per priority name: tasks queued and running, the thread limit,
+            tasks submitted and started, how many started ahead of
+            higher-priority work by aging, and average and maximum queue
+            wait in milliseconds
+        """
+        return {
+            priority.name: self._stats[priority].as_dict(len(self._queues[priority]))
+            for priority in TaskPriority
+        }
 
     async def submit_batch(
         self,
@@ -114,9 +288,278 @@ class AsyncThreadPoolExecutor:
         Args:
             wait: Whether to wait for pending futures to complete
         """
+        # Tasks still queued will never get a thread.
+        for queue in self._queues.values():
+            while queue:
+                queue.popleft().started.cancel()
         self.executor.shutdown(wait=wait)
 
 
+def _warm_up(modules: Sequence[str]) -> None:
+    """Import modules in a new worker process before it takes any task."""
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except Exception as e:
+            logger.warning(f"Worker could not pre-import {module}: {e}")
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _run_guarded(
+    func: Callable[..., T],
+    args: Tuple,
+    kwargs: Dict[str, Any],
+    max_memory_bytes: Optional[int],
+) -> Tuple[T, bool]:
+    """Run a task in a worker; also report whether the worker has grown too big."""
+    result = func(*args, **kwargs)
+    if max_memory_bytes is None:
+        return result, False
+    import psutil
+
+    return result, psutil.Process().memory_info().rss > max_memory_bytes
+
+
+def _map_chunk(func: Callable[[Any], T], items: List[Any]) -> List[Any]:
+    """Apply a function to a chunk of items, returning errors in place of results."""
+    results = []
+    for item in items:
+        try:
+            results.append(func(item))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+class AsyncProcessPoolExecutor(AsyncThreadPoolExecutor):
+    """Process pool with the async interface of AsyncThreadPoolExecutor.
+
+    Meant for CPU-bound work that would hold the GIL on a thread; tasks are
+    scheduled by priority exactly as on the thread pool. Workers are spawned
+    on demand and import ``warmup_modules`` as they start, so the first task
+    does not pay for loading parser libraries. Functions and arguments must
+    be picklable: module-level functions, not closures or lambdas.
+
+    Workers are recycled, by replacing the pool, when a task leaves one using
+    more than ``max_memory_mb``. A task running past ``task_timeout`` raises
+    ``TimeoutError`` and its pool is replaced at once; the old pool's workers
+    are killed only once every other task running there has finished, since
+    ending any worker of a ``ProcessPoolExecutor`` breaks the whole pool.
+    Tasks caught in a pool that breaks are retried once.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = PROCESS_POOL_SIZE,
+        warmup_modules: Sequence[str] = PROCESS_POOL_WARMUP_MODULES,
+        task_timeout: Optional[float] = PROCESS_POOL_TASK_TIMEOUT,
+        max_memory_mb: Optional[int] = PROCESS_POOL_MAX_MEMORY_MB,
+        aging_seconds: float = THREAD_POOL_AGING_SECONDS,
+        priority_limits: Optional[Dict[TaskPriority, int]] = None,
+    ):
+        """
+        Initialize executor; no process starts until work is submitted.
+
+        Args:
+            max_workers: Number of worker processes
+            warmup_modules: Modules each worker imports when it starts
+            task_timeout: Seconds a task may run, or None for no limit
+            max_memory_mb: Worker memory (RSS) that triggers recycling after
+                a task, or None for no limit
+            aging_seconds: Seconds of waiting that raise a task's effective
+                priority by one level
+            priority_limits: Most workers each priority may occupy at once
+        """
+        self.warmup_modules = list(warmup_modules)
+        self.task_timeout = task_timeout
+        self.max_memory_bytes = (
+            max_memory_mb * 1024 * 1024 if max_memory_mb is not None else None
+        )
+        self.recycles = 0
+        self.timeouts = 0
+        # Futures still running in each pool, to know when a retired one is idle.
+        self._in_flight: Dict[Executor, Set[Future]] = {}
+        # Retired pools holding a timed-out task, with their worker processes.
+        self._stuck: Dict[Executor, List[Any]] = {}
+        super().__init__(max_workers, aging_seconds, priority_limits)
+
+    def _new_executor(self) -> Executor:
+        # Forking a process that runs threads can copy held locks; spawn.
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_up,
+            initargs=(self.warmup_modules,),
+        )
+
+    def _recycle(self, executor: Executor) -> None:
+        """Replace the pool; tasks already in the old one finish there."""
+        if executor is not self.executor:
+            return  # Already replaced by another task.
+        self.executor = self._new_executor()
+        self.recycles += 1
+        executor.shutdown(wait=False)
+        self._reap(executor)
+
+    def _abandon(self, executor: Executor) -> None:
+        """Retire a pool whose task timed out, killing it once it is idle."""
+        if executor not in self._stuck:
+            # Shutting the pool down forgets its processes; keep them.
+            processes = getattr(executor, "_processes", None) or {}
+            self._stuck[executor] = list(processes.values())
+        self._recycle(executor)
+
+    def _reap(self, executor: Executor) -> None:
+        """Kill a retired pool's stuck workers once its other tasks are done."""
+        if executor is self.executor or self._in_flight.get(executor):
+            return
+        self._in_flight.pop(executor, None)
+        # ProcessPoolExecutor cannot stop a running task; end its workers.
+        for process in self._stuck.pop(executor, ()):
+            process.terminate()
+
+    async def _execute(
+        self, func: Callable[..., T], args: Tuple, kwargs: Dict[str, Any]
+    ) -> T:
+        for attempt in range(2):
+            executor = self.executor
+            future = executor.submit(
+                _run_guarded, func, args, kwargs, self.max_memory_bytes
+            )
+            running = self._in_flight.setdefault(executor, set())
+            running.add(future)
+            try:
+                result, over_memory = await asyncio.wait_for(
+                    asyncio.wrap_future(future), self.task_timeout
+                )
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                self._abandon(executor)
+                raise TimeoutError(
+                    f"{getattr(func, '__name__', func)} ran longer than "
+                    f"{self.task_timeout}s; its worker will be stopped once "
+                    "the other tasks in its pool finish"
+                )
+            except BrokenProcessPool:
+                self._recycle(executor)
+                if attempt:
+                    raise
+                logger.warning("Worker process pool broke; retrying task")
+                continue
+            finally:
+                running.discard(future)
+                self._reap(executor)
+            if over_memory:
+                logger.info("Recycling worker processes over the memory limit")
+                self._recycle(executor)
+            return result
+
+    async def warm_up(self) -> None:
+        """Start every worker process now rather than on first use."""
+        await asyncio.gather(
+            *(
+                asyncio.wrap_future(self.executor.submit(_ping))
+                for _ in range(self.max_workers)
+            )
+        )
+
+    async def submit_batch(
+        self,
+        func: Callable[[Any], T],
+        items: List[Any],
+        priority: TaskPriority = TaskPriority.MEDIUM,
+        max_concurrent: Optional[int] = None,
+        chunk_size: int = PROCESS_POOL_CHUNK_SIZE,
+    ) -> List[T]:
+        """
+        Submit a batch of items for processing in chunks.
+
+        Each worker call handles ``chunk_size`` items, so small tasks do not
+        pay a round trip each.
+
+        Args:
+            func: Function to execute on each item
+            items: List of items to process
+            priority: Task priority level
+            max_concurrent: Maximum number of chunks in flight
+            chunk_size: Items per worker call
+
+        Returns:
+            List of results in the order of input items, with the exception
+            raised for any item that failed
+        """
+        chunks = [
+            items[start : start + chunk_size]
+            for start in range(0, len(items), chunk_size)
+        ]
+        results = await super().submit_batch(
+            functools.partial(_map_chunk, func), chunks, priority, max_concurrent
+        )
+        flat = []
+        for chunk, result in zip(chunks, results):
+            # A chunk that failed as a whole fails each of its items.
+            flat.extend(result if isinstance(result, list) else [result] * len(chunk))
+        return flat
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        stats = super().stats()
+        stats["pool"] = {
+            "workers": self.max_workers,
+            "recycles": self.recycles,
+            "timeouts": self.timeouts,
+        }
+        return stats
+
+    def shutdown(self, wait: bool = True):
+        super().shutdown(wait=wait)
+        for processes in self._stuck.values():
+            for process in processes:
+                process.terminate()
+        self._stuck.clear()
+        self._in_flight.clear()
+
+
+async def run_detached(func: Callable[..., T], *args: Any) -> T:
+    """
+    Run a blocking function on its own daemon thread and await its result.
+
+    Unlike ``asyncio.to_thread`` or a thread pool, neither ``asyncio.run``
+    nor interpreter exit waits for the thread, so work abandoned after a
+    timeout or cancellation cannot delay shutdown. Only use it for work that
+    is safe to drop midway, such as a read-only query.
+
+    Args:
+        func: Blocking function to run
+        *args: Arguments for the function
+
+    Returns:
+        The function's result
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def settle(outcome: Callable[[], None]) -> None:
+        if not future.done():
+            outcome()
+
+    def run() -> None:
+        try:
+            result = func(*args)
+        except BaseException as e:
+            outcome = functools.partial(future.set_exception, e)
+        else:
+            outcome = functools.partial(future.set_result, result)
+        with contextlib.suppress(RuntimeError):  # The loop has already closed.
+            loop.call_soon_threadsafe(settle, outcome)
+
+    name = f"detached-{getattr(func, '__name__', 'task')}"
+    threading.Thread(target=run, name=name, daemon=True).start()
+    return await future
+
+
 class RateLimiter:
     """Rate limiter for controlling operation frequency."""
 
@@ -233,4 +676,5 @@ class TaskQueue:
 
 # Create singleton instances for application-wide use
 thread_pool = AsyncThreadPoolExecutor()
+process_pool = AsyncProcessPoolExecutor()
 task_queue = TaskQueue()
@@ -0,0 +1,368 @@
+"""Disk storage backends for the cache manager."""
+
+import asyncio
+import hashlib
+import logging
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from backend.config.settings import (
+    CACHE_COMPRESS_MIN_BYTES,
+    CACHE_COMPRESSION,
+    CACHE_SERIALIZER,
+)
+from backend.utils import cache_codecs
+from backend.utils.sqlasync_io import AsyncSQL
+
+logger = logging.getLogger(__name__)
+
+CACHE_DB_FILENAME = "cache.sqlite"
+
+CACHE_SCHEMA_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS cache_entries (
+        key_hash BLOB PRIMARY KEY,
+        key TEXT NOT NULL,
+        value BLOB NOT NULL,
+        size INTEGER NOT NULL,
+        expires_at REAL,
+        codec TEXT NOT NULL DEFAULT 'json'
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_cache_key ON cache_entries(key)",
+    "CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache_entries(expires_at)",
+    # Entry count and total size, kept current by triggers so that stats
+    # never scan the table.
+    """
+    CREATE TABLE IF NOT EXISTS cache_stats (
+        id INTEGER PRIMARY KEY CHECK (id = 0),
+        entries INTEGER NOT NULL,
+        bytes INTEGER NOT NULL
+    )
+    """,
+    """
+    INSERT OR IGNORE INTO cache_stats (id, entries, bytes)
+    SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS cache_stats_insert
+    AFTER INSERT ON cache_entries BEGIN
+        UPDATE cache_stats SET entries = entries + 1, bytes = bytes + NEW.size;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS cache_stats_delete
+    AFTER DELETE ON cache_entries BEGIN
+        UPDATE cache_stats SET entries = entries - 1, bytes = bytes - OLD.size;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS cache_stats_update
+    AFTER UPDATE OF size ON cache_entries BEGIN
+        UPDATE cache_stats SET bytes = bytes + NEW.size - OLD.size;
+    END
+    """,
+]
+UPSERT_ENTRY_SQL = """
+    INSERT INTO cache_entries (key_hash, key, value, size, expires_at, codec)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(key_hash) DO UPDATE SET
+        value = excluded.value,
+        size = excluded.size,
+        expires_at = excluded.expires_at,
+        codec = excluded.codec
+    """
+
+
+class CacheEntry(NamedTuple):
+    """A cached value and the time it expires, or None if it never does."""
+
+    value: Any
+    expires_at: Optional[float]
+
+    def expired(self, now: float, grace: float = 0.0) -> bool:
+        return self.expires_at is not None and now >= self.expires_at + grace
+
+
+def hash_key(key: str) -> bytes:
+    """Fixed-size digest identifying a cache key of any length or content."""
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+
+
+def prefix_bounds(prefix: str) -> Tuple[str, str]:
+    """Half-open string range ``[low, high)`` of all keys starting with ``prefix``.
+
+    An indexed range scan, unlike ``LIKE 'prefix%'``, needs no escaping of
+    ``%`` and ``_`` in the prefix.
+    """
+    return prefix, prefix + "\U0010ffff"
+
+
+class DiskCacheBackend(ABC):
+    """Persistent key-value storage behind :class:`CacheManager`."""
+
+    async def get(self, key: str) -> Optional[Any]:
+        """
+        Load a value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The stored value, or None if absent or expired
+        """
+        entry = await self.get_entry(key)
+        return entry.value if entry is not None else None
+
+    @abstractmethod
+    async def get_entry(self, key: str, grace: float = 0.0) -> Optional[CacheEntry]:
+        """
+        Load a value with its expiry time.
+
+        Args:
+            key: Cache key
+            grace: Also return entries that expired less than this many
+                seconds ago
+
+        Returns:
+            The entry, or None if absent or expired for longer than ``grace``
+        """
+
+    @abstractmethod
+    async def put(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """
+        Store a value.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Seconds until the entry expires, or None to keep it
+
+        Returns:
+            True if the value was stored
+        """
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Remove one entry."""
+
+    @abstractmethod
+    async def delete_prefix(self, prefix: str) -> None:
+        """Remove every entry whose key starts with ``prefix``."""
+
+    @abstractmethod
+    async def delete_pattern(self, pattern: str) -> None:
+        """Remove every entry whose key contains ``pattern``."""
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Remove every entry."""
+
+    @abstractmethod
+    async def sweep(
+        self, budget: int, max_bytes: Optional[int] = None
+    ) -> Tuple[int, int]:
+        """
+        Remove expired entries, then evict entries while over a size limit.
+
+        Args:
+            budget: Most entries to remove in this call
+            max_bytes: Stored bytes to shrink to, or None for no limit
+
+        Returns:
+            Numbers of entries expired and evicted
+        """
+
+    @abstractmethod
+    async def stats(self) -> Dict[str, Any]:
+        """Entry count, stored bytes, and expiration and eviction counters."""
+
+    async def close(self) -> None:
+        """Release resources held by the backend."""
+
+
+class SQLiteDiskCache(DiskCacheBackend):
+    """All cache entries in one SQLite file.
+
+    Rows are keyed by a hash of the cache key, so keys containing path
+    separators or other characters unsafe in file names are fine, and the
+    cache never creates more than a few files however many entries it holds.
+    The key text is indexed for prefix invalidation and the expiry time for
+    sweeping; triggers keep the entry count and total size in a one-row
+    table. Values are encoded by :mod:`cache_codecs`, and each row records
+    the codec that wrote it, so settings can change without invalidating
+    existing entries.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        serializer: str = CACHE_SERIALIZER,
+        compression: str = CACHE_COMPRESSION,
+        compress_min_bytes: int = CACHE_COMPRESS_MIN_BYTES,
+    ):
+        """
+        Initialize the backend; the database is created on first use.
+
+        Args:
+            db_path: Path of the SQLite cache file
+            serializer: "pickle", "msgpack" or "json"
+            compression: "auto", "none" or "zstd", "lz4" or "zlib"
+            compress_min_bytes: Smallest serialized value that is compressed
+        """
+        self.db_path = db_path
+        self.db = AsyncSQL(db_path)
+        self.serializer = serializer
+        self.compression = cache_codecs.resolve_compression(compression)
+        self.compress_min_bytes = compress_min_bytes
+        self.expirations = 0
+        self.evictions = 0
+        self._ready = False
+
+    async def _ensure_schema(self) -> None:
+        if self._ready:
+            return
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        for statement in CACHE_SCHEMA_SQL:
+            await self.db.execute(statement, commit=True)
+        columns = await self.db.fetchall("PRAGMA table_info(cache_entries)")
+        if "codec" not in {column[1] for column in columns}:
+            # Entries written before codecs were recorded are JSON.
+            await self.db.execute(
+                "ALTER TABLE cache_entries "
+                "ADD COLUMN codec TEXT NOT NULL DEFAULT 'json'",
+                commit=True,
+            )
+        self._ready = True
+
+    async def get_entry(self, key: str, grace: float = 0.0) -> Optional[CacheEntry]:
+        await self._ensure_schema()
+        row = await self.db.fetchone(
+            "SELECT value, expires_at, codec FROM cache_entries WHERE key_hash = ?",
+            (hash_key(key),),
+        )
+        if row is None:
+            return None
+        value, expires_at, codec = row
+        if CacheEntry(None, expires_at).expired(time.time(), grace):
+            await self.delete(key)
+            self.expirations += 1
+            return None
+        try:
+            value = await asyncio.to_thread(cache_codecs.decode, codec, value)
+            return CacheEntry(value, expires_at)
+        except ImportError as e:
+            logger.error(f"Cannot decode cache entry for {key}: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Corrupt cache entry for {key}: {e}")
+            await self.delete(key)
+            return None
+
+    async def put(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        await self._ensure_schema()
+        try:
+            codec, data = await asyncio.to_thread(
+                cache_codecs.encode,
+                value,
+                self.serializer,
+                self.compression,
+                self.compress_min_bytes,
+            )
+        except Exception as e:
+            logger.error(f"Cannot serialize cache value for {key}: {e}")
+            return False
+        expires_at = time.time() + ttl if ttl is not None else None
+        try:
+            await self.db.enqueue(
+                UPSERT_ENTRY_SQL,
+                (hash_key(key), key, data, len(data), expires_at, codec),
+            )
+        except Exception as e:
+            logger.error(f"Error writing cache entry for {key}: {e}")
+            return False
+        return True
+
+    async def delete(self, key: str) -> None:
+        await self._ensure_schema()
+        await self.db.execute(
+            "DELETE FROM cache_entries WHERE key_hash = ?",
+            (hash_key(key),),
+            commit=True,
+        )
+
+    async def delete_prefix(self, prefix: str) -> None:
+        await self._ensure_schema()
+        await self.db.execute(
+            "DELETE FROM cache_entries WHERE key >= ? AND key < ?",
+            prefix_bounds(prefix),
+            commit=True,
+        )
+
+    async def delete_pattern(self, pattern: str) -> None:
+        await self._ensure_schema()
+        # Substring matches cannot use an index; prefer delete_prefix.
+        await self.db.execute(
+            "DELETE FROM cache_entries WHERE instr(key, ?) > 0", (pattern,), commit=True
+        )
+
+    async def clear(self) -> None:
+        await self._ensure_schema()
+        await self.db.execute("DELETE FROM cache_entries", commit=True)
+
+    async def sweep(
+        self, budget: int, max_bytes: Optional[int] = None
+    ) -> Tuple[int, int]:
+        await self._ensure_schema()
+        now = time.time()
+        rows = await self.db.fetchall(
+            "SELECT key_hash FROM cache_entries WHERE expires_at <= ? "
+            "ORDER BY expires_at LIMIT ?",
+            (now, budget),
+        )
+        if rows:
+            # Skip entries rewritten since they were selected.
+            await self.db.executemany(
+                "DELETE FROM cache_entries WHERE key_hash = ? AND expires_at <= ?",
+                [(key_hash, now) for (key_hash,) in rows],
+            )
+        expired = len(rows)
+        self.expirations += expired
+
+        evicted = []
+        excess = (await self.stats())["bytes"] - max_bytes if max_bytes else 0
+        if excess > 0 and budget > expired:
+            candidates = await self.db.fetchall(
+                "SELECT key_hash, size FROM cache_entries "
+                "WHERE expires_at IS NOT NULL ORDER BY expires_at LIMIT ?",
+                (budget - expired,),
+            )
+            for key_hash, size in candidates:
+                if excess <= 0:
+                    break
+                evicted.append(key_hash)
+                excess -= size
+            if evicted:
+                await self.db.executemany(
+                    "DELETE FROM cache_entries WHERE key_hash = ?",
+                    [(key_hash,) for key_hash in evicted],
+                )
+        self.evictions += len(evicted)
+        return expired, len(evicted)
+
+    async def stats(self) -> Dict[str, Any]:
+        await self._ensure_schema()
+        row = await self.db.fetchone("SELECT entries, bytes FROM cache_stats")
+        count, size = row or (0, 0)
+        return {
+            "entries": count,
+            "bytes": size,
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+            "path": str(self.db_path),
+        }
+
+    async def close(self) -> None:
+        await self.db.close()
@@ -1,35 +1,450 @@
 """Asynchronous SQLite operations for The Aichemist Codex."""
 
+import asyncio
+import contextlib
+import functools
 import logging
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, List, Tuple
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, TypeVar
 
-import aiosqlite
+from backend.config.settings import (
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_CACHE_SIZE_KB,
+    SQLITE_INSTRUMENT,
+    SQLITE_MMAP_SIZE,
+    SQLITE_READ_CONNECTIONS,
+    SQLITE_SLOW_QUERY_MS,
+    SQLITE_WRITE_BATCH_MS,
+    SQLITE_WRITE_BATCH_SIZE,
+)
 
 logger = logging.getLogger(__name__)
+T = TypeVar("T")
+
+# Upper bounds in milliseconds of the latency histogram buckets.
+LATENCY_BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, float("inf"))
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_sql(query: str) -> str:
+    """
+    Reduce a statement to its shape so that variants share statistics.
+
+    Literals become ``?``, whitespace is collapsed, and ``IN`` lists of any
+    length become ``(?...)``.
+
+    Args:
+        query: SQL statement
+
+    Returns:
+        Normalized statement text
+    """
+    query = _SPACE_RE.sub(" ", _LITERAL_RE.sub("?", query)).strip()
+    return _IN_LIST_RE.sub("(?...)", query)
+
+
+class StatementStats:
+    """Call counts and a latency histogram for one normalized statement."""
+
+    __slots__ = ("count", "errors", "total_ms", "max_ms", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS_MS)
+
+    def record(self, elapsed_ms: float, failed: bool) -> None:
+        self.count += 1
+        self.errors += failed
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                self.buckets[i] += 1
+                break
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_ms": self.total_ms,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "max_ms": self.max_ms,
+            "histogram": {
+                f"<={bound:g}ms": n
+                for bound, n in zip(LATENCY_BUCKETS_MS, self.buckets)
+                if n
+            },
+        }
+
+
+class _QueuedWrite(NamedTuple):
+    query: str
+    params: Any
+    many: bool
+    future: Future
 
 
 class AsyncSQL:
-    def __init__(self, db_path: Path):
+    """Async access to a SQLite database through persistent pooled connections.
+
+    Statements run on connections that stay open for the life of the object:
+    one writer, so writes never contend for the database lock among
+    themselves, and ``readers`` read-only connections shared by all queries.
+    Each connection belongs to a worker thread and is opened on first use.
+    The database is switched to WAL journaling, so readers see the last
+    committed state without blocking, or being blocked by, the writer.
+
+    Committed writes go through a queue: writes arriving together are
+    applied in one transaction, flushed once ``batch_size`` statements are
+    waiting or ``batch_ms`` milliseconds after the first, with runs of the
+    same statement merged into one ``executemany``. Each caller resumes when
+    the transaction holding its write has committed. A write made with
+    ``commit=False`` bypasses the queue and stays in the writer's open
+    transaction until the next flush or until the pool is closed.
+
+    With ``instrument`` enabled, every statement's latency is recorded
+    under its normalized text (see :meth:`stats`), and statements slower
+    than ``slow_query_ms`` are logged with their ``EXPLAIN QUERY PLAN``.
+
+    Call :meth:`close`, or use the object as an async context manager, to
+    flush queued writes and release the connections.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        readers: int = SQLITE_READ_CONNECTIONS,
+        batch_size: int = SQLITE_WRITE_BATCH_SIZE,
+        batch_ms: float = SQLITE_WRITE_BATCH_MS,
+        instrument: bool = SQLITE_INSTRUMENT,
+        slow_query_ms: Optional[float] = SQLITE_SLOW_QUERY_MS,
+    ):
+        """
+        Initialize the pool; no connection is opened until the first query.
+
+        Args:
+            db_path: Path of the SQLite database file
+            readers: Number of read-only connections
+            batch_size: Queued statements that trigger an immediate flush
+            batch_ms: Longest a queued write waits for others to join it
+            instrument: Record per-statement latency statistics
+            slow_query_ms: Log instrumented statements slower than this,
+                or None to never log them
+        """
         self.db_path = db_path
+        self.readers = max(1, readers)
+        self._writer = ThreadPoolExecutor(1, thread_name_prefix="sqlite-writer")
+        self._reader_pool = ThreadPoolExecutor(
+            self.readers, thread_name_prefix="sqlite-reader"
+        )
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self.batch_size = max(1, batch_size)
+        self.batch_ms = batch_ms
+        self._queue: List[_QueuedWrite] = []
+        self._queue_ready = threading.Condition()
+        self._flush_scheduled = False
+        self.transactions = 0
+        # commit=False writes in the writer's open transaction.
+        self._uncommitted = 0
+        self.instrument = instrument
+        self.slow_query_ms = slow_query_ms
+        self.slow_queries = 0
+        self._stats: Dict[str, StatementStats] = {}
+        self._plans: Dict[str, str] = {}
+        self._stats_lock = threading.Lock()
+
+    async def __aenter__(self) -> "AsyncSQL":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    def _connection(self, readonly: bool) -> sqlite3.Connection:
+        """Connection owned by the calling worker thread, opened on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        if readonly:
+            # Only the writer may switch the database to WAL; make sure it has
+            # before readers attach.
+            self._writer.submit(self._connection, False).result()
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=SQLITE_BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False,
+        )
+        pragmas = [
+            f"mmap_size = {SQLITE_MMAP_SIZE}",
+            f"cache_size = -{SQLITE_CACHE_SIZE_KB}",
+        ]
+        if readonly:
+            pragmas.append("query_only = ON")
+        else:
+            pragmas += ["journal_mode = WAL", "synchronous = NORMAL"]
+        for pragma in pragmas:
+            conn.execute(f"PRAGMA {pragma}")
+        self._local.conn = conn
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+    @contextlib.contextmanager
+    def _measure(self, conn: sqlite3.Connection, query: str, params: Any):
+        """Time the enclosed statement if instrumentation is enabled.
+
+        ``params`` is a sample parameter tuple used to explain slow
+        statements, or None for statements that have no query plan.
+        """
+        if not self.instrument:
+            yield
+            return
+        start = time.perf_counter()
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            key = normalize_sql(query)
+            with self._stats_lock:
+                self._stats.setdefault(key, StatementStats()).record(elapsed_ms, failed)
+            if (
+                not failed
+                and self.slow_query_ms is not None
+                and elapsed_ms > self.slow_query_ms
+            ):
+                with self._stats_lock:
+                    self.slow_queries += 1
+                plan = self._query_plan(conn, key, query, params)
+                logger.warning(f"Slow query ({elapsed_ms:.1f} ms): {key}\n{plan}")
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _savepoint(conn: sqlite3.Connection):
+        """Undo only the enclosed statements if they fail.
+
+        The writer's transaction may hold earlier ``commit=False`` writes
+        whose callers were already told they succeeded, so a failure rolls
+        back to a savepoint instead of discarding the whole transaction.
+        """
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+        conn.execute("SAVEPOINT write")
+        try:
+            yield
+        except Exception:
+            conn.execute("ROLLBACK TO write")
+            conn.execute("RELEASE write")
+            raise
+        conn.execute("RELEASE write")
+
+    def _commit(self, conn: sqlite3.Connection) -> None:
+        """Commit the writer's transaction, or roll all of it back on failure."""
+        try:
+            with self._measure(conn, "COMMIT", None):
+                conn.commit()
+        except Exception:
+            conn.rollback()
+            if self._uncommitted:
+                logger.error(
+                    f"Commit to {self.db_path} failed; {self._uncommitted} "
+                    "earlier uncommitted writes were rolled back"
+                )
+            self._uncommitted = 0
+            raise
+        self._uncommitted = 0
+
+    def _query_plan(
+        self, conn: sqlite3.Connection, key: str, query: str, params: Any
+    ) -> str:
+        """``EXPLAIN QUERY PLAN`` of a statement, cached per normalized text."""
+        plan = self._plans.get(key)
+        if plan is not None:
+            return plan
+        if params is None:
+            return "(no query plan)"
+        try:
+            rows = conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+        except sqlite3.Error as e:
+            return f"(no query plan: {e})"
+        depth: Dict[int, int] = {0: -1}
+        lines = []
+        for node, parent, _, detail in rows:
+            depth[node] = depth.get(parent, -1) + 1
+            lines.append("  " * (depth[node] + 1) + detail)
+        plan = "\n".join(lines)
+        self._plans[key] = plan
+        return plan
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Counters and per-statement latency statistics.
+
+        Returns:
+            Transactions committed from the write queue, writes currently
+            queued, slow statements logged, and for each normalized statement
+            its count, errors, total/mean/max milliseconds and histogram,
+            slowest total first
+        """
+        with self._stats_lock:
+            statements = sorted(
+                self._stats.items(), key=lambda item: item[1].total_ms, reverse=True
+            )
+            return {
+                "transactions": self.transactions,
+                "queued": len(self._queue),
+                "slow_queries": self.slow_queries,
+                "statements": {key: stat.as_dict() for key, stat in statements},
+            }
+
+    def reset_stats(self) -> None:
+        """Clear the recorded statement statistics."""
+        with self._stats_lock:
+            self._stats.clear()
+            self.slow_queries = 0
+
+    async def _run(
+        self, executor: ThreadPoolExecutor, fn: Callable[..., T], *args
+    ) -> T:
+        if self._closed:
+            raise RuntimeError(f"Database pool for {self.db_path} is closed")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(fn, *args))
+
+    def _write(self, query: str, params: Any, many: bool, commit: bool) -> None:
+        conn = self._connection(readonly=False)
+        with self._savepoint(conn):
+            with self._measure(conn, query, params[0] if many and params else params):
+                if many:
+                    conn.executemany(query, params)
+                else:
+                    conn.execute(query, params)
+        if commit:
+            self._commit(conn)
+        else:
+            self._uncommitted += 1
+
+    def enqueue(
+        self, query: str, params: Any = (), many: bool = False
+    ) -> "asyncio.Future[None]":
+        """
+        Queue a write for the next coalesced transaction.
+
+        Args:
+            query: SQL statement
+            params: Statement parameters, or a list of them if ``many``
+            many: Run the statement once per parameter tuple
+
+        Returns:
+            Future resolving once the write has committed, or raising the
+            error that made it fail
+        """
+        if self._closed:
+            raise RuntimeError(f"Database pool for {self.db_path} is closed")
+        future: Future = Future()
+        with self._queue_ready:
+            self._queue.append(_QueuedWrite(query, params, many, future))
+            if not self._flush_scheduled:
+                self._flush_scheduled = True
+                self._writer.submit(self._flush_queue)
+            elif len(self._queue) >= self.batch_size:
+                self._queue_ready.notify()
+        return asyncio.wrap_future(future)
+
+    def _flush_queue(self) -> None:
+        """Wait briefly for more writes, then commit the queue as one batch."""
+        deadline = time.monotonic() + self.batch_ms / 1000
+        with self._queue_ready:
+            while len(self._queue) < self.batch_size and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._queue_ready.wait(remaining)
+            batch, self._queue = self._queue, []
+            self._flush_scheduled = False
+        # Writes whose caller gave up before they started are dropped.
+        batch = [item for item in batch if item.future.set_running_or_notify_cancel()]
+        if batch:
+            self._apply_batch(batch)
+
+    def _apply_batch(self, batch: List[_QueuedWrite]) -> None:
+        conn = self._connection(readonly=False)
+        try:
+            with self._savepoint(conn):
+                for query, params in self._coalesce(batch):
+                    with self._measure(conn, query, params[0] if params else ()):
+                        if len(params) == 1:
+                            conn.execute(query, params[0])
+                        else:
+                            conn.executemany(query, params)
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0].future.set_exception(e)
+                return
+            # Isolate the failing write so the rest of the batch still lands.
+            for item in batch:
+                self._apply_batch([item])
+            return
+        try:
+            self._commit(conn)
+        except Exception as e:
+            # Nothing in the batch was committed; no caller may see success.
+            for item in batch:
+                item.future.set_exception(e)
+            return
+        self.transactions += 1
+        for item in batch:
+            item.future.set_result(None)
+
+    @staticmethod
+    def _coalesce(batch: List[_QueuedWrite]) -> List[Tuple[str, List]]:
+        """Merge consecutive writes of the same statement, keeping order."""
+        groups: List[Tuple[str, List]] = []
+        for query, params, many, _ in batch:
+            if not groups or groups[-1][0] != query:
+                groups.append((query, []))
+            if many:
+                groups[-1][1].extend(params)
+            else:
+                groups[-1][1].append(params)
+        return groups
+
+    def _fetch(self, query: str, params: Tuple, one: bool) -> Any:
+        conn = self._connection(readonly=True)
+        with self._measure(conn, query, params):
+            cursor = conn.execute(query, params)
+            try:
+                return cursor.fetchone() if one else cursor.fetchall()
+            finally:
+                cursor.close()
 
     async def execute(
         self, query: str, params: Tuple = (), commit: bool = False
     ) -> None:
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                await db.execute(query, params)
-                if commit:
-                    await db.commit()
+            if commit:
+                await self.enqueue(query, params)
+            else:
+                await self._run(self._writer, self._write, query, params, False, False)
         except Exception as e:
             logger.error(f"Error executing query: {query} with params {params}: {e}")
 
     async def fetchall(self, query: str, params: Tuple = ()) -> List[Tuple[Any, ...]]:
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                async with db.execute(query, params) as cursor:
-                    rows = await cursor.fetchall()
-                    return rows
+            return await self._run(self._reader_pool, self._fetch, query, params, False)
         except Exception as e:
             logger.error(
                 f"Error fetching rows for query: {query} with params {params}: {e}"
@@ -38,10 +453,7 @@ class AsyncSQL:
 
     async def fetchone(self, query: str, params: Tuple = ()) -> Tuple[Any, ...]:
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                async with db.execute(query, params) as cursor:
-                    row = await cursor.fetchone()
-                    return row
+            return await self._run(self._reader_pool, self._fetch, query, params, True)
         except Exception as e:
             logger.error(
                 f"Error fetching one for query: {query} with params {params}: {e}"
@@ -50,10 +462,38 @@ class AsyncSQL:
 
     async def executemany(self, query: str, params_list: List[Tuple]) -> None:
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                await db.executemany(query, params_list)
-                await db.commit()
+            await self.enqueue(query, params_list, many=True)
         except Exception as e:
             logger.error(
                 f"Error executing many for query: {query} with params {params_list}: {e}"
             )
+
+    def _commit_pending(self) -> None:
+        conn: Optional[sqlite3.Connection] = getattr(self._local, "conn", None)
+        if conn is not None and conn.in_transaction:
+            self._commit(conn)
+
+    def _shutdown(self) -> None:
+        with self._queue_ready:
+            # Flush the queue now rather than after the batch delay.
+            self._queue_ready.notify_all()
+        try:
+            self._writer.submit(self._commit_pending).result()
+        except Exception as e:
+            logger.error(f"Error committing pending writes to {self.db_path}: {e}")
+        self._writer.shutdown(wait=True)
+        self._reader_pool.shutdown(wait=True)
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logger.error(f"Error closing connection to {self.db_path}: {e}")
+
+    async def close(self) -> None:
+        """Flush queued writes, commit any open transaction, close connections."""
+        if self._closed:
+            return
+        self._closed = True
+        await asyncio.to_thread(self._shutdown)
@@ -18,6 +18,23 @@ for subdir in BACKEND_DIR.iterdir():
 sys.path.insert(0, str(BACKEND_DIR))
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path_factory, monkeypatch):
+    """
+    Point the shared cache manager at a temporary directory.
+
+    Memoized parsers and summaries would otherwise read and write the
+    project's own data/cache, so a test could be served a result cached by
+    an earlier run. The manager is only created if a test uses it.
+    """
+    from backend.utils import cache_manager
+
+    monkeypatch.setattr(cache_manager, "CACHE_DIR", tmp_path_factory.mktemp("cache"))
+    previous = cache_manager.set_cache_manager(None)
+    yield
+    cache_manager.set_cache_manager(previous)
+
+
 @pytest.fixture(autouse=True)
 def new_log_file(tmp_path_factory):
     """
@@ -0,0 +1,353 @@
+import pytest
+
+from backend.utils.cache_manager import CacheManager, LRUCache, estimate_size
+
+
+def test_lru_cache_count_mode_evicts_oldest():
+    cache = LRUCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert list(cache.keys()) == ["a", "c"]
+    assert cache.stats()["evictions"] == 1
+    assert cache.current_bytes == 0
+
+
+def test_lru_cache_byte_budget():
+    cache = LRUCache(max_size=None, max_bytes=1000)
+    cache.put("a", "x", size=400)
+    cache.put("b", "y", size=400)
+    cache.get("a")
+    cache.put("c", "z", size=400)
+
+    assert "b" not in cache
+    assert cache.current_bytes == 800
+    cache.put("huge", "w", size=5000)
+    assert "huge" not in cache
+    assert cache.current_bytes == 800
+
+    cache.put("a", "x", size=100)
+    assert cache.current_bytes == 500
+    assert cache.pop("c") == "z"
+    assert cache.current_bytes == 100
+    assert cache.stats() == {
+        "entries": 1,
+        "max_size": None,
+        "bytes": 100,
+        "max_bytes": 1000,
+        "hits": 1,
+        "misses": 0,
+        "evictions": 2,
+    }
+
+
+def test_estimate_size_follows_nested_values():
+    tree = {"dir": {f"file_{i}.txt": {"size": i} for i in range(100)}}
+    shared = ["x" * 10_000]
+
+    assert estimate_size(tree) > 100 * estimate_size({"size": 0})
+    assert estimate_size([shared, shared]) < 2 * estimate_size(shared)
+
+
+@pytest.mark.asyncio
+async def test_cache_manager_reports_memory_budget(tmp_path):
+    cache = CacheManager(tmp_path, memory_cache_size=None, memory_cache_bytes=50_000)
+    await cache.put("tree", {"a": "x" * 10_000})
+    await cache.put("other", {"b": "y" * 45_000})
+    await cache.invalidate_pattern("other")
+
+    stats = await cache.get_stats()
+    assert stats["memory_cache_size"] == 0
+    assert stats["memory_cache_bytes"] == 0
+    assert stats["memory_cache_evictions"] == 1
+    assert await cache.get("tree") == {"a": "x" * 10_000}
+
+
+@pytest.mark.asyncio
+async def test_disk_cache_uses_one_file_for_any_key(tmp_path):
+    cache = CacheManager(tmp_path, disk_cache_ttl=60)
+    keys = ["file_tree_/a/b_10", "file_tree_/a/b/c_10", "file_tree_/a/bc_10", "x:y"]
+    for key in keys:
+        assert await cache.put(key, {"key": key})
+    cache.memory_cache.clear()
+
+    assert sorted(p.name for p in tmp_path.iterdir() if p.suffix == ".sqlite") == [
+        "cache.sqlite"
+    ]
+    assert await cache.get("file_tree_/a/b/c_10") == {"key": "file_tree_/a/b/c_10"}
+
+    await cache.invalidate_prefix("file_tree_/a/b/")
+    assert await cache.get("file_tree_/a/b/c_10") is None
+    assert await cache.get("file_tree_/a/b_10") is not None
+    await cache.invalidate_pattern(":")
+    assert await cache.get("x:y") is None
+
+    stats = await cache.get_stats()
+    assert stats["disk_cache_count"] == 2
+    assert stats["disk_cache_size_bytes"] > 0
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_disk_cache_entries_expire(tmp_path):
+    cache = CacheManager(tmp_path, disk_cache_ttl=-1)
+    await cache.put("old", [1, 2, 3])
+    cache.memory_cache.clear()
+
+    assert await cache.get("old") is None
+    assert (await cache.get_stats())["disk_cache_count"] == 0
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_disk_cache_records_codec_per_entry(tmp_path):
+    import sqlite3
+    from pathlib import Path
+
+    from backend.file_reader.file_metadata import FileMetadata
+    from backend.utils.disk_cache import SQLiteDiskCache, hash_key
+
+    disk = SQLiteDiskCache(
+        tmp_path / "cache.sqlite", compression="zlib", compress_min_bytes=1000
+    )
+    metadata = FileMetadata(Path("a.txt"), "text/plain", 1, ".txt", "preview")
+    tree = {"dir": {f"file_{i}": {"size": i} for i in range(1000)}}
+    assert await disk.put("metadata", metadata)
+    assert await disk.put("tree", tree)
+    await disk.close()
+
+    conn = sqlite3.connect(tmp_path / "cache.sqlite")
+    codecs = dict(conn.execute("SELECT key, codec FROM cache_entries"))
+    # Entries from before codecs were recorded are read as JSON.
+    conn.execute(
+        "INSERT INTO cache_entries (key_hash, key, value, size) "
+        "VALUES (?, 'legacy', '[1, 2]', 6)",
+        (hash_key("legacy"),),
+    )
+    conn.commit()
+    conn.close()
+    assert codecs == {"metadata": "pickle", "tree": "pickle+zlib"}
+
+    reopened = SQLiteDiskCache(tmp_path / "cache.sqlite", serializer="json")
+    assert await reopened.get("metadata") == metadata
+    assert await reopened.get("tree") == tree
+    assert await reopened.get("legacy") == [1, 2]
+    await reopened.put("path", Path("x"))
+    assert await reopened.get("path") == Path("x")
+    await reopened.close()
+
+
+@pytest.mark.parametrize(
+    "serializer,compression,module",
+    [
+        ("msgpack", "none", "msgpack"),
+        ("pickle", "zstd", "zstandard"),
+        ("pickle", "lz4", "lz4"),
+    ],
+)
+def test_optional_codecs_round_trip(serializer, compression, module):
+    from backend.utils import cache_codecs
+
+    pytest.importorskip(module)
+    value = {"items": list(range(1000)), "name": "tree"}
+
+    codec, data = cache_codecs.encode(value, serializer, compression)
+
+    assert codec == f"{serializer}+{compression}".replace("+none", "")
+    assert cache_codecs.decode(codec, data) == value
+
+
+@pytest.mark.asyncio
+async def test_get_or_compute_runs_one_factory_per_key(tmp_path):
+    import asyncio
+
+    cache = CacheManager(tmp_path, disk_cache_ttl=60)
+    calls = []
+
+    async def build():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"tree": len(calls)}
+
+    results = await asyncio.gather(
+        *(cache.get_or_compute("tree", build) for _ in range(10))
+    )
+
+    assert results == [{"tree": 1}] * 10
+    assert len(calls) == 1
+    assert await cache.get_or_compute("tree", build) == {"tree": 1}
+    assert len(calls) == 1
+
+    async def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_compute("broken", fail)
+    assert await cache.get_or_compute("broken", lambda: "fixed") == "fixed"
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_get_or_compute_serves_stale_while_refreshing(tmp_path):
+    import asyncio
+
+    cache = CacheManager(tmp_path, disk_cache_ttl=60)
+    await cache.put("tree", "old", ttl=-1)
+    refreshed = asyncio.Event()
+
+    async def build():
+        await asyncio.sleep(0.01)
+        refreshed.set()
+        return "new"
+
+    # Expired for longer than stale_ttl: computed in the foreground.
+    assert await cache.get_or_compute("tree", build, stale_ttl=0) == "new"
+
+    await cache.put("tree", "old", ttl=-1)
+    refreshed.clear()
+    stale = await asyncio.gather(
+        *(cache.get_or_compute("tree", build, stale_ttl=30) for _ in range(5))
+    )
+    assert stale == ["old"] * 5
+    assert len(cache._inflight) == 1
+
+    await refreshed.wait()
+    await asyncio.sleep(0.01)
+    assert not cache._inflight
+    assert await cache.get("tree") == "new"
+    await cache.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("hash_content", [False, True])
+async def test_memoize_by_content_skips_unchanged_files(tmp_path, hash_content):
+    import os
+
+    from backend.utils.cache_manager import memoize_by_content
+
+    cache = CacheManager(tmp_path / "cache", disk_cache_ttl=60)
+    calls = []
+
+    @memoize_by_content(hash_content=hash_content, cache=cache)
+    async def parse(file_path):
+        calls.append(file_path)
+        return {"text": file_path.read_text()}
+
+    source = tmp_path / "a.txt"
+    source.write_text("one")
+    assert await parse(source) == {"text": "one"}
+    cache.memory_cache.clear()
+    assert await parse(file_path=source) == {"text": "one"}
+    assert len(calls) == 1
+
+    source.write_text("two!")
+    os.utime(source, ns=(1, 1))
+    assert await parse(source) == {"text": "two!"}
+    assert len(calls) == 2
+    # Entries for earlier contents of the file are dropped.
+    assert (await cache.get_stats())["disk_cache_count"] == 1
+
+    @memoize_by_content(version=2, hash_content=hash_content, cache=cache)
+    async def parse_v2(file_path):
+        calls.append(file_path)
+        return {"text": file_path.read_text()}
+
+    await parse_v2(source)
+    assert len(calls) == 3
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_memoize_by_content_keeps_empty_results(tmp_path):
+    from backend.utils.cache_manager import memoize_by_content
+
+    cache = CacheManager(tmp_path / "cache", disk_cache_ttl=60)
+    calls = []
+
+    @memoize_by_content(cache=cache)
+    async def parse(file_path):
+        calls.append(file_path)
+        return []
+
+    source = tmp_path / "empty.txt"
+    source.write_text("")
+    assert await parse(source) == []
+    cache.memory_cache.clear()
+    assert await parse(source) == []
+    assert len(calls) == 1
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_memoize_by_content_retries_errors(tmp_path):
+    from backend.utils.cache_manager import memoize_by_content
+
+    cache = CacheManager(tmp_path / "cache", disk_cache_ttl=60)
+    outcomes = [TimeoutError("pool busy"), {"error": "unreadable"}, {"text": "ok"}]
+    calls = []
+
+    @memoize_by_content(cache=cache)
+    async def parse(file_path):
+        calls.append(file_path)
+        outcome = outcomes[len(calls) - 1]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    source = tmp_path / "a.txt"
+    source.write_text("data")
+    with pytest.raises(TimeoutError):
+        await parse(source)
+    assert await parse(source) == {"error": "unreadable"}
+    assert await parse(source) == {"text": "ok"}
+    assert await parse(source) == {"text": "ok"}
+    assert len(calls) == 3
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_sweeper_expires_and_evicts_within_budget(tmp_path):
+    import asyncio
+
+    cache = CacheManager(
+        tmp_path, disk_cache_max_bytes=None, sweep_interval=0, sweep_budget=3
+    )
+    for i in range(5):
+        await cache.put(f"old{i}", "x" * 100, ttl=-1)
+    await cache.put("fresh", "y" * 100, ttl=60)
+    await cache.put("fresh", "y" * 200, ttl=60)
+
+    stats = await cache.get_stats()
+    assert stats["disk_cache_count"] == 6
+    assert stats["disk_cache_size_bytes"] > 5 * 100 + 200
+    assert await cache.sweep() == (6, 0)  # 3 from memory, 3 from disk
+    assert await cache.sweep() == (4, 0)
+    assert await cache.sweep() == (0, 0)
+    assert await cache.get("fresh") == "y" * 200
+    assert await cache.get("old0") is None
+
+    stats = await cache.get_stats()
+    assert stats["disk_cache_count"] == 1
+    assert (stats["hits"], stats["misses"], stats["expirations"]) == (1, 1, 10)
+
+    await cache.put("newer", "z", ttl=120)
+    cache.disk_cache_max_bytes = (await cache.get_stats())["disk_cache_size_bytes"] - 1
+    # The entry closest to expiry goes first.
+    assert await cache.sweep() == (0, 1)
+    cache.memory_cache.clear()
+    assert await cache.get("fresh") is None
+    assert await cache.get("newer") == "z"
+    assert (await cache.get_stats())["evictions"] == 1
+    await cache.clear()
+    assert (await cache.get_stats())["disk_cache_size_bytes"] == 0
+
+    cache.sweep_interval = 0.01
+    await cache.put("brief", "w", ttl=0.01)
+    await asyncio.sleep(0.1)
+    assert "brief" not in cache.memory_cache
+    assert (await cache.get_stats())["disk_cache_count"] == 0
+    await cache.close()
+    assert cache._sweeper is None
@@ -50,3 +50,26 @@ class MyClass:
     class_summary = next(item for item in summaries if item["name"] == "MyClass")
     assert "method_one" in class_summary["methods"]
     assert "method_two" in class_summary["methods"]
+
+
+@pytest.mark.asyncio
+async def test_summarize_code_parses_misses_in_one_batch(tmp_path, monkeypatch):
+    """Files that miss the cache share chunked process-pool calls."""
+    from backend.project_reader import code_summary
+
+    for i in range(5):
+        (tmp_path / f"module_{i}.py").write_text(f"def func_{i}():\n    pass\n")
+
+    batches = []
+
+    async def submit_batch(func, items):
+        batches.append(items)
+        return [func(item) for item in items]
+
+    monkeypatch.setattr(code_summary.process_pool, "submit_batch", submit_batch)
+    summary = await code_summary.summarize_code(tmp_path)
+
+    assert len(batches) == 1 and len(batches[0]) == 5
+    assert sorted(f["name"] for s in summary.values() for f in s["functions"]) == [
+        f"func_{i}" for i in range(5)
+    ]
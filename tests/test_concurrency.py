@@ -0,0 +1,147 @@
+import asyncio
+import threading
+
+import pytest
+
+from backend.utils.concurrency import AsyncThreadPoolExecutor, TaskPriority
+
+
+async def _wait_until(condition):
+    for _ in range(200):
+        if condition():
+            return
+        await asyncio.sleep(0.005)
+    raise AssertionError("condition not reached")
+
+
+@pytest.mark.asyncio
+async def test_high_priority_runs_before_queued_low_priority():
+    pool = AsyncThreadPoolExecutor(max_workers=1, aging_seconds=3600)
+    gate = threading.Event()
+    order = []
+
+    blocker = asyncio.create_task(pool.submit(gate.wait))
+    await _wait_until(lambda: pool.stats()["MEDIUM"]["running"] == 1)
+    low = [
+        asyncio.create_task(
+            pool.submit(order.append, f"low{i}", priority=TaskPriority.LOW)
+        )
+        for i in range(3)
+    ]
+    high = asyncio.create_task(
+        pool.submit(order.append, "high", priority=TaskPriority.HIGH)
+    )
+    await _wait_until(lambda: pool.stats()["HIGH"]["queued"] == 1)
+    assert pool.stats()["LOW"]["queued"] == 3
+
+    gate.set()
+    await asyncio.gather(blocker, high, *low)
+    assert order == ["high", "low0", "low1", "low2"]
+
+    stats = pool.stats()
+    assert stats["LOW"]["started"] == 3
+    assert stats["LOW"]["queued"] == 0
+    assert stats["LOW"]["max_wait_ms"] >= stats["HIGH"]["max_wait_ms"] > 0
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_aging_lets_waiting_low_priority_task_go_first():
+    pool = AsyncThreadPoolExecutor(max_workers=1, aging_seconds=0.01)
+    gate = threading.Event()
+    order = []
+
+    blocker = asyncio.create_task(pool.submit(gate.wait))
+    await _wait_until(lambda: pool.stats()["MEDIUM"]["running"] == 1)
+    low = asyncio.create_task(
+        pool.submit(order.append, "low", priority=TaskPriority.LOW)
+    )
+    await asyncio.sleep(0.1)
+    high = asyncio.create_task(
+        pool.submit(order.append, "high", priority=TaskPriority.HIGH)
+    )
+    await _wait_until(lambda: pool.stats()["HIGH"]["queued"] == 1)
+
+    gate.set()
+    await asyncio.gather(blocker, low, high)
+    assert order == ["low", "high"]
+    assert pool.stats()["LOW"]["aged"] == 1
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_priority_limits_and_cancelled_waiters():
+    pool = AsyncThreadPoolExecutor(max_workers=4)
+    gate = threading.Event()
+
+    low = [
+        asyncio.create_task(pool.submit(gate.wait, priority=TaskPriority.LOW))
+        for _ in range(4)
+    ]
+    await _wait_until(lambda: pool.stats()["LOW"]["running"] == 2)
+    assert pool.stats()["LOW"]["limit"] == 2
+    assert pool.stats()["LOW"]["queued"] == 2
+    # Threads kept free of LOW work are available at once.
+    assert await pool.submit(sum, [1, 2], priority=TaskPriority.HIGH) == 3
+
+    low[-1].cancel()
+    await asyncio.gather(low[-1], return_exceptions=True)
+    assert pool.stats()["LOW"]["queued"] == 1
+
+    gate.set()
+    results = await asyncio.gather(*low[:-1])
+    assert results == [True] * 3
+    assert pool.stats()["LOW"]["running"] == 0
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_process_pool_batches_and_recycles_workers():
+    import time
+
+    from backend.utils.concurrency import AsyncProcessPoolExecutor
+
+    pool = AsyncProcessPoolExecutor(
+        max_workers=2, warmup_modules=["json"], task_timeout=5, max_memory_mb=None
+    )
+    await pool.warm_up()
+    assert await pool.submit(pow, 2, 10, priority=TaskPriority.HIGH) == 1024
+
+    results = await pool.submit_batch(int, ["1", "2", "x", "4", "5"], chunk_size=2)
+    assert results[:2] == [1, 2] and results[3:] == [4, 5]
+    assert isinstance(results[2], ValueError)
+    assert pool.stats()["MEDIUM"]["started"] == 3  # One call per chunk
+
+    pool.task_timeout = 0.5
+    with pytest.raises(TimeoutError):
+        await pool.submit(time.sleep, 10)
+    assert await pool.submit(abs, -3) == 3
+
+    pool.max_memory_bytes = 0
+    assert await pool.submit(abs, -4) == 4
+    assert pool.stats()["pool"] == {"workers": 2, "recycles": 2, "timeouts": 1}
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_process_pool_timeout_spares_sibling_tasks():
+    import time
+
+    from backend.utils.concurrency import AsyncProcessPoolExecutor
+
+    pool = AsyncProcessPoolExecutor(
+        max_workers=2, warmup_modules=["json"], task_timeout=1, max_memory_mb=None
+    )
+    await pool.warm_up()
+    stuck = asyncio.create_task(pool.submit(time.sleep, 30))
+    await asyncio.sleep(0.5)
+    # Still running in the old pool when its neighbour times out.
+    sibling = asyncio.create_task(pool.submit(time.sleep, 0.9))
+
+    with pytest.raises(TimeoutError):
+        await stuck
+    assert pool._stuck  # Killing the stuck worker now would break the sibling.
+    assert await pool.submit(abs, -5) == 5
+    assert await sibling is None
+    assert not pool._stuck
+    pool.shutdown()
@@ -1,3 +1,4 @@
+import asyncio
 import shutil
 import time
 from pathlib import Path
@@ -5,7 +6,7 @@ from pathlib import Path
 import pytest
 
 from backend.file_reader.file_metadata import FileMetadata
-from backend.search.search_engine import SearchEngine
+from backend.search.search_engine import SearchEngine, passage_id
 
 # Test directories
 TEST_INDEX_DIR = Path("test_search_index")
@@ -13,8 +14,11 @@ TEST_DB_PATH = Path("test_search_index.sqlite")
 
 
 @pytest.fixture(scope="function")
-def setup_search_engine(tmp_path):
+def setup_search_engine(tmp_path, monkeypatch):
     """Fixture to set up the SearchEngine with a temporary directory."""
+    import backend.search.search_engine as search_engine_module
+
+    monkeypatch.setattr(search_engine_module, "load_embedding_model", FakeEncoder)
     index_dir = tmp_path / "index"
     index_dir.mkdir()
     db_path = tmp_path / "search_index.sqlite"
@@ -69,15 +73,16 @@ def wait_for_indexing():
     time.sleep(0.2)
 
 
-def test_add_to_index(setup_search_engine, sample_files):
+@pytest.mark.asyncio
+async def test_add_to_index(setup_search_engine, sample_files):
     """Test adding files to the search index and metadata storage."""
     search_engine = setup_search_engine
 
     for file_metadata in sample_files:
-        search_engine.add_to_index(file_metadata)
+        await search_engine.add_to_index_async(file_metadata)
 
     # Verify that the files were indexed
-    results = search_engine.search_filename("example1")
+    results = await search_engine.search_filename_async("example1")
 
     # Normalize paths for comparison
     expected_path = str(sample_files[0].path.resolve())
@@ -88,27 +93,29 @@ def test_add_to_index(setup_search_engine, sample_files):
     ), f"{expected_path} should be in the search results."
 
 
-def test_filename_search(setup_search_engine, sample_files):
+@pytest.mark.asyncio
+async def test_filename_search(setup_search_engine, sample_files):
     """Test searching for filenames."""
     search_engine = setup_search_engine
 
     for file_metadata in sample_files:
-        search_engine.add_to_index(file_metadata)
+        await search_engine.add_to_index_async(file_metadata)
 
-    results = search_engine.search_filename("example1")
+    results = await search_engine.search_filename_async("example1")
     assert len(results) == 1, "Filename search should return exactly one result."
 
 
-def test_fuzzy_search(setup_search_engine, sample_files):
+@pytest.mark.asyncio
+async def test_fuzzy_search(setup_search_engine, sample_files):
     """Test fuzzy search functionality."""
     search_engine = setup_search_engine
 
     for file_metadata in sample_files:
-        search_engine.add_to_index(file_metadata)
+        await search_engine.add_to_index_async(file_metadata)
 
     wait_for_indexing()  # ✅ Let SQLite process data
 
-    results = search_engine.fuzzy_search("exmple")
+    results = await search_engine.fuzzy_search_async("exmple", threshold=70)
 
     # ✅ Debugging Output
     print(f"Indexed files: {sample_files}")
@@ -117,35 +124,38 @@ def test_fuzzy_search(setup_search_engine, sample_files):
     assert len(results) >= 1, "Fuzzy search should find example1.txt"
 
 
-def test_full_text_search(setup_search_engine, sample_files):
+@pytest.mark.asyncio
+async def test_full_text_search(setup_search_engine, sample_files):
     """Test full-text search on indexed file content."""
     search_engine = setup_search_engine
 
     for file_metadata in sample_files:
-        search_engine.add_to_index(file_metadata)
+        await search_engine.add_to_index_async(file_metadata)
 
     wait_for_indexing()  # ✅ Give Whoosh time to process
 
-    results = search_engine.full_text_search("searchable")
+    # Only the preview is indexed for files that provide one.
+    results = search_engine.full_text_search("document")
     assert len(results) >= 1, "Full-text search should return at least one result."
     assert any(
         "example2.txt" in path for path in results
     ), "example2.txt should be found."
 
 
-def test_metadata_search(setup_search_engine, sample_files):
+@pytest.mark.asyncio
+async def test_metadata_search(setup_search_engine, sample_files):
     """Test searching files by metadata filters."""
     search_engine = setup_search_engine
 
     for file_metadata in sample_files:
-        search_engine.add_to_index(file_metadata)
+        await search_engine.add_to_index_async(file_metadata)
 
     wait_for_indexing()  # ✅ Allow SQLite to update
 
-    results = search_engine.metadata_search(
+    results = await search_engine.metadata_search_async(
         {
             "extension": [".txt"],
-            "size_min": 10,
+            "size_min": 50,
             "size_max": 5000,
         }  # ✅ Adjust size range
     )
@@ -164,17 +174,19 @@ def test_metadata_search(setup_search_engine, sample_files):
     ), f"{expected_path} should match search criteria."
 
 
-def test_empty_search_results(setup_search_engine):
+@pytest.mark.asyncio
+async def test_empty_search_results(setup_search_engine):
     """Test searches when no files have been indexed."""
     search_engine = setup_search_engine
 
-    assert search_engine.search_filename("nonexistent") == []
-    assert search_engine.fuzzy_search("unknown") == []
+    assert await search_engine.search_filename_async("nonexistent") == []
+    assert await search_engine.fuzzy_search_async("unknown") == []
     assert search_engine.full_text_search("nothing") == []
-    assert search_engine.metadata_search({"extension": [".docx"]}) == []
+    assert await search_engine.metadata_search_async({"extension": [".docx"]}) == []
 
 
-def test_error_handling_in_indexing(setup_search_engine):
+@pytest.mark.asyncio
+async def test_error_handling_in_indexing(setup_search_engine):
     """Test error handling when adding a non-existent file to the index."""
     search_engine = setup_search_engine
 
@@ -186,34 +198,38 @@ def test_error_handling_in_indexing(setup_search_engine):
         preview="This file does not exist.",
     )
 
-    search_engine.add_to_index(non_existent_file)
-    results = search_engine.search_filename("path.txt")
+    await search_engine.add_to_index_async(non_existent_file)
+    results = await search_engine.search_filename_async("path.txt")
     assert len(results) == 0, "Non-existent files should not be indexed."
 
 
-def test_sqlite_indexing_speed(setup_search_engine, tmp_path):
+@pytest.mark.asyncio
+async def test_sqlite_indexing_speed(setup_search_engine, tmp_path):
     """Ensure SQLite indexing improves search speed."""
     search_engine = setup_search_engine
 
     # Insert 5000 sample files
+    files = []
     for i in range(5000):
         file_path = tmp_path / f"file_{i}.txt"
         file_path.write_text(f"Content {i}")
 
-        file_metadata = FileMetadata(
-            path=file_path,
-            mime_type="text/plain",
-            size=file_path.stat().st_size,
-            extension=".txt",
-            preview=f"Content {i}",
+        files.append(
+            FileMetadata(
+                path=file_path,
+                mime_type="text/plain",
+                size=file_path.stat().st_size,
+                extension=".txt",
+                preview=f"Content {i}",
+            )
         )
-        search_engine.add_to_index(file_metadata)
+    await search_engine.add_to_index_batch(files)
 
     # Perform a filename search
     import time
 
     start_time = time.time()
-    results = search_engine.search_filename("file_4999")
+    results = await search_engine.search_filename_async("file_4999")
     end_time = time.time()
 
     assert len(results) == 1, "Filename search should return exactly one result."
@@ -235,3 +251,941 @@ def test_whoosh_recovery_on_corruption(setup_search_engine):
     assert (
         search_engine.index is not None
     ), "Search engine should recover from index corruption."
+
+
+class FakeEncoder:
+    """Deterministic bag-of-words encoder standing in for SentenceTransformer."""
+
+    dimension = 16
+
+    def __init__(self, *args, **kwargs):
+        self.calls = 0
+
+    def encode(self, texts, **kwargs):
+        import numpy as np
+
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        self.calls += 1
+        vectors = np.zeros((len(batch), self.dimension), dtype="float32")
+        for row, text in enumerate(batch):
+            for word in text.lower().split():
+                vectors[row, sum(map(ord, word)) % self.dimension] += 1.0
+        return vectors[0] if single else vectors
+
+
+@pytest.fixture
+def search_engine(tmp_path, monkeypatch):
+    """SearchEngine backed by temporary storage and the fake encoder."""
+    import backend.search.search_engine as search_engine_module
+
+    monkeypatch.setattr(search_engine_module, "load_embedding_model", FakeEncoder)
+    return SearchEngine(index_dir=tmp_path / "index", db_path=tmp_path / "db.sqlite")
+
+
+def make_text_files(directory, count):
+    directory.mkdir(parents=True, exist_ok=True)
+    metadata = []
+    for i in range(count):
+        path = directory / f"doc_{i}.txt"
+        path.write_text(f"document number {i} about searchable things")
+        metadata.append(
+            FileMetadata(
+                path=path,
+                mime_type="text/plain",
+                size=path.stat().st_size,
+                extension=".txt",
+                preview=path.read_text(),
+            )
+        )
+    return metadata
+
+
+@pytest.mark.asyncio
+async def test_rejected_document_keeps_earlier_chunks(search_engine, tmp_path):
+    """A document Whoosh rejects is skipped without losing uncommitted ones."""
+    root = tmp_path / "tree"
+    files = make_text_files(root, 10)
+    prepare = search_engine._prepare_document
+
+    async def prepare_with_failure(file_metadata):
+        prepared = await prepare(file_metadata)
+        if file_metadata.path.name == "doc_7.txt":
+            return file_metadata, 7  # Not text: update_document raises
+        return prepared
+
+    search_engine._prepare_document = prepare_with_failure
+    stats = await search_engine.reindex_incremental(root, batch_size=5)
+
+    expected = {str(f.path) for f in files} - {str(root / "doc_7.txt")}
+    assert stats["indexed"] == 9
+    assert set(search_engine.full_text_search("searchable")) == expected
+    assert set(await search_engine._load_manifest(root)) == expected
+
+    search_engine._prepare_document = prepare
+    retry = await search_engine.reindex_incremental(root)
+    assert retry["added"] == 1 and retry["indexed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_single_add_waits_for_running_batch(search_engine, tmp_path):
+    """Writes issued during a batch queue for the index instead of failing."""
+    files = make_text_files(tmp_path / "docs", 11)
+    batch = asyncio.ensure_future(
+        search_engine.add_to_index_batch(files[:10], batch_size=2)
+    )
+    await asyncio.sleep(0)
+    await search_engine.add_to_index_async(files[10])
+    await batch
+
+    assert search_engine.index.doc_count() == 11
+
+
+@pytest.mark.asyncio
+async def test_missing_index_directory_is_created(tmp_path):
+    """A fresh install has no index directory; the engine creates it on first use."""
+    index_dir = tmp_path / "missing" / "search_index"
+    engine = SearchEngine(index_dir, index_dir / "search.db")
+    try:
+        assert await engine.search_filename_async("notes") == []
+    finally:
+        await engine.close()
+
+    assert (index_dir / "search.db").exists()
+
+
+@pytest.mark.asyncio
+async def test_add_to_index_async_replaces_documents(search_engine, tmp_path):
+    """Re-adding a file replaces its full-text document instead of duplicating it."""
+    files = make_text_files(tmp_path / "docs", 5)
+    await search_engine.add_to_index_batch(files)
+    for file_metadata in files[:3]:
+        await search_engine.add_to_index_async(file_metadata)
+
+    assert search_engine.index.doc_count() == 5
+
+
+@pytest.mark.asyncio
+async def test_add_to_index_batch_uses_single_writer(search_engine, tmp_path):
+    """Batch indexing commits every N documents and merges at the end."""
+    files = make_text_files(tmp_path / "docs", 10)
+
+    indexed = await search_engine.add_to_index_batch(
+        files, batch_size=4, commit_every=3, optimize=True
+    )
+
+    assert sorted(indexed) == sorted(f.path for f in files)
+    assert len(search_engine.index._segments()) == 1
+    assert search_engine.index.doc_count() == 10
+    assert len(search_engine.full_text_search("searchable")) == 10
+    assert len(await search_engine.search_filename_async("doc_")) == 10
+
+
+@pytest.mark.asyncio
+async def test_add_to_index_batch_reindex_does_not_duplicate(search_engine, tmp_path):
+    """Re-indexing the same files replaces their full-text documents."""
+    files = make_text_files(tmp_path / "docs", 5)
+
+    await search_engine.add_to_index_batch(files)
+    await search_engine.add_to_index_batch(files)
+
+    assert search_engine.index.doc_count() == 5
+
+
+@pytest.mark.asyncio
+async def test_semantic_index_persists_across_instances(search_engine, tmp_path):
+    """A new SearchEngine reopens the saved FAISS index and path mapping."""
+    files = make_text_files(tmp_path / "docs", 3)
+    await search_engine.add_to_index_batch(files)
+
+    reopened = SearchEngine(
+        index_dir=search_engine.index_dir, db_path=search_engine.db_path
+    )
+
+    assert reopened.semantic_index.ntotal == 3
+    results = await reopened.semantic_search_async("document number 1", top_k=3)
+    assert sorted(results) == sorted(str(f.path) for f in files)
+
+
+def test_semantic_index_discarded_on_model_change(tmp_path):
+    """A stored index built with another model is discarded, not reused."""
+    import numpy as np
+
+    from backend.search.semantic_index import SemanticIndex
+
+    index = SemanticIndex(tmp_path / "semantic", "model-a")
+    index.add(np.ones((2, 4), dtype="float32"), [1, 2], ["a.txt", "b.txt"])
+    assert index.save()
+
+    assert SemanticIndex(tmp_path / "semantic", "model-a").load()
+    other = SemanticIndex(tmp_path / "semantic", "model-b")
+    assert not other.load()
+    assert other.ntotal == 0
+    assert not (tmp_path / "semantic" / "semantic.faiss").exists()
+
+
+@pytest.mark.asyncio
+async def test_add_to_index_batch_encodes_in_batches(search_engine, tmp_path):
+    """Embeddings are computed per batch of texts rather than per document."""
+    files = make_text_files(tmp_path / "docs", 10)
+
+    await search_engine.add_to_index_batch(
+        files, batch_size=3, embedding_batch_size=4
+    )
+
+    assert search_engine.embedding_model.calls == 3
+    assert search_engine.semantic_index.ntotal == 10
+
+
+@pytest.mark.asyncio
+async def test_unchanged_content_is_not_re_encoded(search_engine, tmp_path):
+    """Re-indexing unchanged files is served from the embedding cache."""
+    files = make_text_files(tmp_path / "docs", 4)
+    await search_engine.add_to_index_batch(files)
+
+    reopened = SearchEngine(
+        index_dir=search_engine.index_dir, db_path=search_engine.db_path
+    )
+    reopened.semantic_index.clear()
+    await reopened.add_to_index_batch(files)
+
+    assert reopened.embedding_model.calls == 0
+    assert reopened.semantic_index.ntotal == 4
+
+
+def test_embedding_cache_round_trip(tmp_path):
+    """Cached vectors are returned for known hashes only."""
+    import numpy as np
+
+    from backend.search.embedding_cache import EmbeddingCache
+
+    cache = EmbeddingCache(tmp_path / "cache", "model-a", dtype="float16")
+    vectors = np.arange(8, dtype="float32").reshape(2, 4)
+    cache.put_many(["h1", "h2"], vectors)
+    cache.close()
+
+    reopened = EmbeddingCache(tmp_path / "cache", "model-a", dtype="float16")
+    found = reopened.get_many(["h2", "missing"])
+    assert list(found) == ["h2"]
+    assert np.allclose(found["h2"], vectors[1])
+    assert EmbeddingCache(tmp_path / "cache", "model-b").get_many(["h1"]) == {}
+
+
+@pytest.mark.asyncio
+async def test_filename_search_does_not_load_heavy_backends(search_engine):
+    """Filename and metadata queries leave Whoosh, FAISS and the model unopened."""
+    assert await search_engine.search_filename_async("anything") == []
+    assert await search_engine.metadata_search_async({"extension": [".txt"]}) == []
+
+    assert search_engine._index is None
+    assert search_engine._semantic_index is None
+    assert search_engine._embedding_model is None
+
+
+@pytest.mark.asyncio
+async def test_filename_search_uses_trigram_index(search_engine, tmp_path):
+    """Substring queries go through files_fts and follow updates and deletes."""
+    files = make_text_files(tmp_path / "docs", 3)
+    await search_engine.add_to_index_batch(files)
+    assert search_engine._filename_fts
+
+    assert await search_engine.search_filename_async("C_1.tx") == [
+        files[1].path.as_posix()
+    ]
+    # Queries shorter than a trigram fall back to LIKE.
+    assert len(await search_engine.search_filename_async("_2")) == 1
+
+    await search_engine.async_db.execute(
+        "DELETE FROM files WHERE path = ?", (str(files[1].path),), commit=True
+    )
+    assert await search_engine.search_filename_async("doc_1") == []
+
+
+@pytest.mark.asyncio
+async def test_filename_index_backfills_existing_rows(tmp_path):
+    """Rows written before the FTS table existed are indexed on startup."""
+    import sqlite3
+
+    db_path = tmp_path / "legacy.sqlite"
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE files (id INTEGER PRIMARY KEY, path TEXT UNIQUE, "
+        "filename TEXT, extension TEXT, size INTEGER, created_at TEXT, "
+        "updated_at TEXT, tags TEXT)"
+    )
+    conn.execute(
+        "INSERT INTO files (path, filename) VALUES ('/a/report.txt', 'report.txt')"
+    )
+    conn.commit()
+    conn.close()
+
+    engine = SearchEngine(index_dir=tmp_path / "index", db_path=db_path)
+
+    assert await engine.search_filename_async("port") == ["/a/report.txt"]
+    assert engine._filename_fts
+
+
+@pytest.mark.asyncio
+async def test_tag_filters_use_file_tags(search_engine, tmp_path):
+    """Tags match whole values with any/all semantics and are faceted."""
+    import sqlite3
+
+    files = make_text_files(tmp_path / "docs", 4)
+    for metadata, tags in zip(
+        files, [["art", "Draft"], ["smart"], ["art"], ["draft", "review"]]
+    ):
+        metadata.tags = tags
+    await search_engine.add_to_index_batch(files)
+    paths = [f.path.as_posix() for f in files]
+
+    any_art = await search_engine.metadata_search_async({"tags": ["art"]})
+    assert sorted(any_art) == [paths[0], paths[2]]
+    either = await search_engine.metadata_search_async({"tags": ["smart", "review"]})
+    assert sorted(either) == [paths[1], paths[3]]
+    both = await search_engine.metadata_search_async({"tags_all": ["ART", "draft"]})
+    assert both == [paths[0]]
+
+    facets = await search_engine.tag_facets_async()
+    assert [(tag.lower(), count) for tag, count in facets] == [
+        ("art", 2),
+        ("draft", 2),
+        ("review", 1),
+        ("smart", 1),
+    ]
+    assert await search_engine.tag_facets_async({"tags": ["review"]}, limit=1) == [
+        ("draft", 1)
+    ]
+
+    files[0].tags = ["review"]
+    await search_engine.add_to_index_batch(files[:1])
+    await search_engine.remove_from_index([str(files[3].path)])
+    assert await search_engine.tag_facets_async() == [
+        ("art", 1),
+        ("review", 1),
+        ("smart", 1),
+    ]
+
+    clause, params = search_engine._compile_metadata_filters(
+        {"tags": ["art"], "tags_all": ["art", "review"]}
+    )
+    conn = sqlite3.connect(search_engine.db_path)
+    plan = conn.execute(
+        f"EXPLAIN QUERY PLAN SELECT path FROM files WHERE {clause}", params
+    ).fetchall()
+    conn.close()
+    details = " ".join(row[-1] for row in plan)
+    assert "file_tags USING" in details
+    assert "SCAN file_tags" not in details
+
+
+@pytest.mark.asyncio
+async def test_fuzzy_search_returns_every_path_for_a_name(search_engine, tmp_path):
+    """Duplicate filenames in different folders are all returned."""
+    first = make_text_files(tmp_path / "a", 1)
+    second = make_text_files(tmp_path / "b", 1)
+    await search_engine.add_to_index_batch(first + second)
+
+    results = await search_engine.fuzzy_search_async("doc_0.txt")
+
+    assert sorted(results) == sorted(str(f.path) for f in first + second)
+
+
+@pytest.mark.asyncio
+async def test_fuzzy_catalog_tracks_new_files(search_engine, tmp_path):
+    """Files indexed after the catalog is loaded are matched without a reload."""
+    await search_engine.add_to_index_batch(make_text_files(tmp_path / "a", 1))
+    assert await search_engine.fuzzy_search_async("report_final") == []
+    assert search_engine.filename_catalog.loaded
+
+    report = tmp_path / "report_final.txt"
+    report.write_text("quarterly numbers")
+    await search_engine.add_to_index_async(
+        FileMetadata(
+            path=report,
+            mime_type="text/plain",
+            size=report.stat().st_size,
+            extension=".txt",
+            preview="quarterly numbers",
+        )
+    )
+
+    assert await search_engine.fuzzy_search_async("report_finl") == [str(report)]
+
+
+@pytest.mark.asyncio
+async def test_fuzzy_catalog_keeps_writes_made_during_first_load(
+    search_engine, tmp_path, monkeypatch
+):
+    """Files indexed or removed while the catalog loads are not lost."""
+    import threading
+
+    old = make_text_files(tmp_path / "a", 1)
+    await search_engine.add_to_index_batch(old)
+
+    catalog = search_engine.filename_catalog
+    load = catalog.load
+    loads = []
+    loading, release = threading.Event(), threading.Event()
+
+    def slow_load(rows):
+        loads.append(rows)
+        loading.set()
+        release.wait(5)
+        load(rows)
+
+    monkeypatch.setattr(catalog, "load", slow_load)
+    first = asyncio.create_task(search_engine.fuzzy_search_async("doc_0.txt", 95))
+    second = asyncio.create_task(search_engine.fuzzy_search_async("report_final"))
+    await asyncio.to_thread(loading.wait, 5)
+
+    report = tmp_path / "report_final.txt"
+    report.write_text("quarterly numbers")
+    await search_engine.add_to_index_async(
+        FileMetadata(
+            path=report,
+            mime_type="text/plain",
+            size=report.stat().st_size,
+            extension=".txt",
+            preview="quarterly numbers",
+        )
+    )
+    await search_engine.remove_from_index([str(old[0].path)])
+    release.set()
+
+    assert await first == []
+    assert await second == [str(report)]
+    assert len(loads) == 1
+
+
+def test_filename_catalog_length_prefilter_and_removal():
+    """The length prefilter skips distant names and removed paths stop matching."""
+    from backend.search.filename_catalog import FilenameCatalog
+
+    catalog = FilenameCatalog()
+    catalog.load([("notes.md", "/a/notes.md"), ("notes.md", "/b/notes.md")])
+    catalog.add("a_very_long_notes_filename.md", "/c/long.md")
+
+    assert catalog.search("notes.md", limit=None, max_length_ratio=1.5) == [
+        "/a/notes.md",
+        "/b/notes.md",
+    ]
+    catalog.remove("/a/notes.md")
+    catalog.remove("/b/notes.md")
+    assert catalog.search("notes.md", max_length_ratio=1.5) == []
+    assert len(catalog) == 1
+
+
+def test_filename_catalog_grows_and_compacts_in_place():
+    """Growth and compaction keep every live name, removed names stop matching."""
+    from backend.search.filename_catalog import FilenameCatalog
+
+    catalog = FilenameCatalog()
+    catalog.load([])
+    for i in range(3000):
+        catalog.add(f"file_{i:04d}.txt", f"/d/file_{i:04d}.txt")
+    for i in range(2500):
+        catalog.remove(f"/d/file_{i:04d}.txt")
+    catalog.add("file_0001.txt", "/e/file_0001.txt")
+
+    assert len(catalog) == 501
+    assert catalog.search("file_2999.txt", threshold=100) == ["/d/file_2999.txt"]
+    assert catalog.search("file_0001.txt", threshold=100) == ["/e/file_0001.txt"]
+    assert catalog.search("file_0002.txt", threshold=100) == []
+
+
+def test_reciprocal_rank_fusion_prefers_agreement():
+    """Paths ranked by several backends outrank a single top hit."""
+    fused = SearchEngine.reciprocal_rank_fusion(
+        {"a": ["x", "y"], "b": ["y", "z"], "c": ["y"]}, rrf_k=60
+    )
+    assert [path for path, _ in fused] == ["y", "x", "z"]
+
+
+@pytest.mark.asyncio
+async def test_hybrid_search_applies_filters(search_engine, tmp_path):
+    """Hybrid results are fused across backends and restricted by filters."""
+    files = make_text_files(tmp_path / "docs", 3)
+    notes = tmp_path / "docs" / "doc_notes.md"
+    notes.write_text("document notes")
+    files.append(
+        FileMetadata(
+            path=notes,
+            mime_type="text/markdown",
+            size=notes.stat().st_size,
+            extension=".md",
+            preview="document notes",
+        )
+    )
+    await search_engine.add_to_index_batch(files)
+
+    results = await search_engine.hybrid_search_async("document", k=10)
+    assert set(results) == {f.path.as_posix() for f in files}
+
+    filtered = await search_engine.hybrid_search_async(
+        "document", filters={"extension": [".md"]}, k=10
+    )
+    assert filtered == [notes.as_posix()]
+
+
+@pytest.mark.asyncio
+async def test_hybrid_search_drops_slow_backend(search_engine, tmp_path, monkeypatch):
+    """A backend that misses its deadline is left out instead of delaying results."""
+    files = make_text_files(tmp_path / "docs", 2)
+    await search_engine.add_to_index_batch(files)
+
+    async def slow_semantic(query, top_k=5):
+        await asyncio.sleep(5)
+        return ["/never/returned.txt"]
+
+    monkeypatch.setattr(search_engine, "semantic_search_async", slow_semantic)
+    start = time.perf_counter()
+    results = await search_engine.hybrid_search_async(
+        "document", k=5, deadlines={"semantic": 0.05}
+    )
+
+    assert time.perf_counter() - start < 2
+    assert "/never/returned.txt" not in results
+    assert set(results) == {f.path.as_posix() for f in files}
+
+    with pytest.raises(ValueError):
+        await search_engine.hybrid_search_async("document", backends=["bogus"])
+
+
+def test_abandoned_semantic_search_does_not_delay_exit(tmp_path, monkeypatch):
+    """asyncio.run returns at the deadline, not when the slow encoder finishes."""
+    import backend.search.search_engine as search_engine_module
+
+    class SlowQueryEncoder(FakeEncoder):
+        def encode(self, texts, **kwargs):
+            if isinstance(texts, str):
+                time.sleep(3)
+            return super().encode(texts, **kwargs)
+
+    monkeypatch.setattr(search_engine_module, "load_embedding_model", SlowQueryEncoder)
+    engine = SearchEngine(index_dir=tmp_path / "index", db_path=tmp_path / "db.sqlite")
+    files = make_text_files(tmp_path / "docs", 2)
+
+    async def index():
+        await engine.add_to_index_batch(files)
+        await engine.close()
+
+    async def search():
+        try:
+            return await engine.hybrid_search_async(
+                "document", k=5, deadlines={"semantic": 0.2}
+            )
+        finally:
+            await engine.close()
+
+    asyncio.run(index())
+    start = time.perf_counter()
+    results = asyncio.run(search())
+
+    assert time.perf_counter() - start < 2
+    assert set(results) == {f.path.as_posix() for f in files}
+
+
+@pytest.mark.asyncio
+async def test_hybrid_search_skips_cold_semantic_backend(
+    search_engine, tmp_path, monkeypatch
+):
+    """A cold embedding model is loaded in the background, not inside a query."""
+    files = make_text_files(tmp_path / "docs", 2)
+    await search_engine.add_to_index_batch(files)
+    await search_engine.close()
+    search_engine.embedding_model = None
+    calls = []
+
+    async def semantic(query, top_k=5):
+        calls.append(query)
+        return []
+
+    monkeypatch.setattr(search_engine, "semantic_search_async", semantic)
+    results = await search_engine.hybrid_search_async("document", k=5)
+    assert set(results) == {f.path.as_posix() for f in files}
+    assert calls == []
+
+    search_engine._warm_up_thread.join(5)
+    assert search_engine._embedding_model is not None
+    await search_engine.hybrid_search_async("document", k=5)
+    assert calls == ["document"]
+
+
+@pytest.mark.asyncio
+async def test_incremental_reindex_only_touches_changes(search_engine, tmp_path):
+    """Unchanged files are skipped and deleted files leave every backend."""
+    root = tmp_path / "tree"
+    root.mkdir()
+    for name in ("keep.txt", "edit.txt", "gone.txt"):
+        (root / name).write_text(f"original {name.split('.')[0]} text")
+
+    first = await search_engine.reindex_incremental(root)
+    assert first["added"] == 3 and first["indexed"] == 3
+    assert search_engine.semantic_index.ntotal == 3
+
+    (root / "edit.txt").write_text("rewritten with zebra content")
+    (root / "gone.txt").unlink()
+    (root / "new.txt").write_text("brand new file")
+
+    second = await search_engine.reindex_incremental(root)
+    assert second == {
+        "added": 1,
+        "modified": 1,
+        "removed": 1,
+        "unchanged": 1,
+        "indexed": 2,
+    }
+    assert search_engine.full_text_search("zebra") == [str(root / "edit.txt")]
+    assert await search_engine.search_filename_async("gone") == []
+    assert str(root / "gone.txt") not in search_engine.full_text_search("original")
+    assert sorted(search_engine.semantic_index.mapping.values()) == sorted(
+        str(root / name) for name in ("keep.txt", "edit.txt", "new.txt")
+    )
+
+    third = await search_engine.reindex_incremental(root)
+    assert third["unchanged"] == 3 and third["indexed"] == 0
+
+
+@pytest.mark.asyncio
+async def test_reindex_skips_index_stored_inside_tree(tmp_path, monkeypatch):
+    """An index kept inside the scanned tree never indexes its own files."""
+    import backend.search.search_engine as search_engine_module
+
+    monkeypatch.setattr(search_engine_module, "load_embedding_model", FakeEncoder)
+    make_text_files(tmp_path, 3)
+    engine = SearchEngine(
+        index_dir=tmp_path / "index", db_path=tmp_path / "search_index.sqlite"
+    )
+
+    first = await engine.reindex_incremental(tmp_path)
+    assert first["added"] == 3
+    await engine.save_semantic_index()
+
+    second = await engine.reindex_incremental(tmp_path)
+    assert second == {
+        "added": 0,
+        "modified": 0,
+        "removed": 0,
+        "unchanged": 3,
+        "indexed": 0,
+    }
+    await engine.close()
+
+
+def test_semantic_index_replaces_and_removes_by_id(tmp_path):
+    """Vectors are keyed by file id: re-adding replaces, removing deletes."""
+    import numpy as np
+
+    from backend.search.semantic_index import SemanticIndex
+
+    index = SemanticIndex(tmp_path / "semantic", "model-a")
+    index.add(np.eye(3, 4, dtype="float32"), [7, 8, 9], ["a.txt", "b.txt", "c.txt"])
+    index.add(np.eye(1, 4, k=3, dtype="float32"), [7], ["a.txt"])
+    assert index.ntotal == 3
+    assert index.search(np.eye(1, 4, k=3), 1) == ["a.txt"]
+
+    assert index.remove(["b.txt"]) == 1
+    assert index.remove_ids([9, 42]) == 1
+    assert index.save()
+
+    reopened = SemanticIndex(tmp_path / "semantic", "model-a")
+    assert reopened.load()
+    assert reopened.mapping == {7: "a.txt"}
+    assert reopened.search(np.eye(1, 4, k=3), 3) == ["a.txt"]
+
+
+def test_semantic_index_tolerates_concurrent_writers(tmp_path):
+    """Adds from one thread never corrupt saves and searches from others."""
+    import sys
+    import threading
+
+    import numpy as np
+
+    from backend.search.semantic_index import SemanticIndex
+
+    index = SemanticIndex(tmp_path / "semantic", "model-a")
+    rng = np.random.default_rng(0)
+    errors = []
+
+    def add():
+        try:
+            for start in range(0, 4000, 20):
+                ids = list(range(start, start + 20))
+                index.add(rng.random((20, 8)), ids, [f"{i}.txt" for i in ids])
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # Interleave the threads as often as possible.
+    try:
+        writer = threading.Thread(target=add)
+        writer.start()
+        while writer.is_alive():
+            assert index.save() or index.ntotal == 0
+            index.search(np.zeros(8), 3)
+        writer.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+    assert not errors
+    assert index.save()
+
+    reopened = SemanticIndex(tmp_path / "semantic", "model-a")
+    assert reopened.load()
+    assert reopened.ntotal == 4000
+
+
+def test_semantic_mapping_round_trips_offsets_and_paths(tmp_path):
+    """The binary mapping restores every passage's path and offset."""
+    import numpy as np
+
+    from backend.search.semantic_index import SemanticIndex
+
+    index = SemanticIndex(tmp_path / "semantic", "model-a")
+    paths = ["a.txt", "b.txt", "dir/ünïcode name.txt"]
+    index.add(np.eye(4, dtype="float32"), [1, 2, 3, 4], paths + ["a.txt"], [0, 0, 5, 9])
+    assert index.save()
+
+    reopened = SemanticIndex(tmp_path / "semantic", "model-a")
+    assert reopened.load()
+    assert reopened.mapping == index.mapping
+    assert reopened.offsets == {3: 5, 4: 9}
+    assert reopened.remove(["a.txt"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_single_file_adds_save_semantic_index_on_close(search_engine, tmp_path):
+    """Per-file adds leave the FAISS rewrite to close() instead of every call."""
+    from backend.search.semantic_index import INDEX_FILENAME
+
+    index_file = tmp_path / "index" / "semantic" / INDEX_FILENAME
+    for file_metadata in make_text_files(tmp_path / "docs", 3):
+        await search_engine.add_to_index_async(file_metadata)
+    assert search_engine.semantic_index.dirty
+    assert not index_file.exists()
+
+    await search_engine.close()
+    assert not search_engine.semantic_index.dirty
+    assert index_file.exists()
+
+
+@pytest.mark.parametrize("encoding", ["float32", "float16"])
+def test_readded_vectors_do_not_grow_store(tmp_path, encoding):
+    """Exact flat indexes skip the store; others compact it on save."""
+    import numpy as np
+
+    from backend.search.semantic_index import SemanticIndex
+
+    rng = np.random.default_rng(3)
+    ids = list(range(1, 101))
+    paths = [f"file_{i}.txt" for i in ids]
+    index = SemanticIndex(tmp_path / "semantic", "model-a", encoding=encoding)
+    for _ in range(5):
+        index.add(rng.random((100, 8), dtype="float32"), ids, paths)
+        assert index.save()
+
+    if encoding == "float32":
+        assert len(index.store) == 0
+    else:
+        assert len(index.store) <= 125
+    latest = rng.random((1, 8), dtype="float32")
+    index.add(latest, [7], ["file_7.txt"])
+    assert np.allclose(index.vectors([7]), latest)
+
+    index.rebuild("hnsw", "int8")
+    assert len(index.store) == 100
+    assert np.allclose(index.vectors([7]), latest)
+    index.rebuild("flat", "float32")
+    assert len(index.store) == 0
+    assert index.search(latest, 1) == ["file_7.txt"]
+
+
+@pytest.mark.asyncio
+async def test_reindexed_file_keeps_one_vector(search_engine, tmp_path):
+    """Re-indexing a changed file replaces its vector under the same file id."""
+    files = make_text_files(tmp_path / "docs", 2)
+    await search_engine.add_to_index_batch(files)
+    files[0].path.write_text("entirely different words now")
+    files[0].preview = "entirely different words now"
+
+    await search_engine.add_to_index_batch(files[:1])
+    await search_engine.add_to_index_async(files[0])
+
+    semantic_index = search_engine.semantic_index
+    assert semantic_index.ntotal == 2
+    ids = await search_engine._file_ids([str(f.path) for f in files])
+    assert semantic_index.mapping == {
+        passage_id(ids[str(f.path)], 0): str(f.path) for f in files
+    }
+
+    await search_engine.remove_from_index([str(files[1].path)])
+    assert semantic_index.ntotal == 1
+
+
+def test_choose_index_type_policy():
+    """Small corpora stay exact; "auto" switches to ANN past the threshold."""
+    from backend.search.semantic_index import choose_index_type
+
+    assert choose_index_type(1_000, "auto", ann_min_vectors=50_000) == "flat"
+    assert (
+        choose_index_type(60_000, "auto", ann_min_vectors=50_000, auto_type="hnsw")
+        == "hnsw"
+    )
+    # Too few vectors to train IVF cells or PQ codebooks.
+    assert choose_index_type(10, "ivf_flat") == "flat"
+    assert choose_index_type(100, "ivf_pq") == "flat"
+    with pytest.raises(ValueError):
+        choose_index_type(10, "bogus")
+
+
+@pytest.mark.parametrize("index_type", ["ivf_flat", "ivf_pq", "hnsw"])
+def test_ann_index_supports_updates_and_reload(tmp_path, index_type):
+    """ANN indexes are trained from stored vectors and keep id semantics."""
+    import numpy as np
+
+    from backend.search.semantic_index import SemanticIndex
+
+    rng = np.random.default_rng(0)
+    vectors = rng.random((2000, 16), dtype="float32")
+    ids = list(range(1, 2001))
+    paths = [f"file_{i}.txt" for i in ids]
+
+    index = SemanticIndex(tmp_path / "semantic", "model-a", index_type=index_type)
+    index.add(vectors, ids, paths)
+    assert index.optimize()
+    assert index.index_type == index_type
+    assert index.search(vectors[10], 5)[0] == "file_11.txt"
+
+    index.remove(["file_11.txt"])
+    index.add(vectors[20:21], [5], ["file_5.txt"])
+    assert index.ntotal == 1999
+    assert "file_11.txt" not in index.search(vectors[10], 5)
+    assert set(index.search(vectors[20], 2)) == {"file_5.txt", "file_21.txt"}
+    assert "file_5.txt" not in index.search(vectors[4], 1)
+    assert index.save()
+
+    reopened = SemanticIndex(tmp_path / "semantic", "model-a", index_type=index_type)
+    assert reopened.load()
+    assert reopened.index_type == index_type
+    assert reopened.ntotal == 1999
+    assert "file_11.txt" not in reopened.search(vectors[10], 5)
+
+
+def test_recall_report_compares_index_types(tmp_path):
+    """The report measures recall against exact search for each setting."""
+    import numpy as np
+
+    from backend.search.semantic_index import SemanticIndex, format_recall_report
+
+    rng = np.random.default_rng(1)
+    vectors = rng.random((1000, 8), dtype="float32")
+    index = SemanticIndex(tmp_path / "semantic", "model-a", index_type="flat")
+    index.add(vectors, list(range(1000)), [f"{i}.txt" for i in range(1000)])
+
+    rows = index.recall_report(
+        vectors[:20],
+        k=5,
+        index_types=["flat", "ivf_flat", "hnsw"],
+        nprobe_values=(1, 25),
+        ef_search_values=(64,),
+    )
+
+    assert [(r["index_type"], r["value"]) for r in rows] == [
+        ("flat", None),
+        ("ivf_flat", 1),
+        ("ivf_flat", 25),
+        ("hnsw", 64),
+    ]
+    assert rows[0]["recall"] == 1.0
+    assert rows[2]["recall"] >= rows[1]["recall"]
+    assert index.index_type == "flat"
+    assert "ivf_flat" in format_recall_report(rows)
+
+
+@pytest.mark.parametrize(
+    "index_type,encoding",
+    [("flat", "float16"), ("flat", "int8"), ("flat", "pq"), ("hnsw", "int8")],
+)
+def test_quantized_index_reranks_and_reloads(tmp_path, index_type, encoding):
+    """Quantized indexes are smaller and re-rank candidates exactly."""
+    import numpy as np
+
+    from backend.search.semantic_index import SemanticIndex
+
+    rng = np.random.default_rng(2)
+    vectors = rng.random((1000, 32), dtype="float32")
+    ids = list(range(1, 1001))
+    paths = [f"file_{i}.txt" for i in ids]
+
+    index = SemanticIndex(
+        tmp_path / "semantic", "model-a", index_type=index_type, encoding=encoding
+    )
+    index.add(vectors, ids, paths)
+    index.optimize()
+    assert (index.index_type, index.encoding) == (index_type, encoding)
+
+    rows = index.recall_report(vectors[:20], k=5, rerank_factors=(0, 10))
+    exact = index.recall_report(vectors[:20], k=5, encodings=["float32"])
+    assert rows[-1]["recall"] >= rows[0]["recall"]
+    assert rows[-1]["recall"] == 1.0
+    assert rows[0]["index_mb"] < exact[0]["index_mb"]
+    assert index.encoding == encoding
+
+    index.remove(["file_11.txt"])
+    assert index.search(vectors[11], 1) == ["file_12.txt"]
+    assert "file_11.txt" not in index.search(vectors[10], 5)
+    assert index.save()
+
+    reopened = SemanticIndex(
+        tmp_path / "semantic", "model-a", index_type=index_type, encoding=encoding
+    )
+    assert reopened.load()
+    assert reopened.encoding == encoding
+    assert reopened.search(vectors[11], 1) == ["file_12.txt"]
+
+
+def test_iter_passages_streams_with_overlap():
+    """Passages overlap, keep document offsets and ignore block boundaries."""
+    from backend.search.chunking import iter_passages
+
+    text = "alpha beta gamma delta epsilon zeta eta theta"
+    expected = [
+        (0, "alpha beta gamma delta"),
+        (17, "delta epsilon zeta eta"),
+        (36, "eta theta"),
+    ]
+    for block_size in (1, 5, len(text)):
+        blocks = [text[i : i + block_size] for i in range(0, len(text), block_size)]
+        assert list(iter_passages(blocks, max_tokens=4, overlap=1)) == expected
+    with pytest.raises(ValueError):
+        list(iter_passages([text], max_tokens=4, overlap=4))
+
+
+@pytest.mark.asyncio
+async def test_long_document_is_embedded_as_passages(search_engine, tmp_path):
+    """Whole files are embedded passage by passage and searched per file."""
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    long_file = docs / "long.txt"
+    filler = " ".join(f"filler{i}" for i in range(300))
+    long_file.write_text(f"{filler} the hidden zebra paragraph {filler}")
+    metadata = FileMetadata(
+        path=long_file,
+        mime_type="text/plain",
+        size=long_file.stat().st_size,
+        extension=".txt",
+        preview=long_file.read_text()[:100],
+    )
+    await search_engine.add_to_index_batch([metadata])
+
+    semantic_index = search_engine.semantic_index
+    assert semantic_index.ntotal > 3
+    passages = await search_engine.semantic_passage_search_async("zebra", top_k=20)
+    offsets = sorted(offset for _, offset in passages)
+    assert offsets[0] == 0 and len(set(offsets)) == len(offsets)
+    assert await search_engine.semantic_search_async("zebra", top_k=5) == [
+        str(long_file)
+    ]
+
+    long_file.write_text("now a short file")
+    await search_engine.add_to_index_batch([metadata])
+    assert semantic_index.ntotal == 1
@@ -15,3 +15,125 @@ async def test_async_sql_execute(tmp_path):
     await sql.execute("INSERT INTO test (value) VALUES (?)", ("example",), commit=True)
     rows = await sql.fetchall("SELECT value FROM test")
     assert rows[0][0] == "example"
+
+
+@pytest.mark.asyncio
+async def test_async_sql_reuses_pooled_wal_connections(tmp_path):
+    """Queries share a writer and a fixed set of readers in WAL mode."""
+    import asyncio
+
+    async with AsyncSQL(tmp_path / "test.db", readers=2) as sql:
+        await sql.execute("CREATE TABLE test (value INTEGER)", commit=True)
+        await sql.executemany(
+            "INSERT INTO test (value) VALUES (?)", [(i,) for i in range(100)]
+        )
+        counts = await asyncio.gather(
+            *(sql.fetchone("SELECT COUNT(*) FROM test") for _ in range(50))
+        )
+        assert counts == [(100,)] * 50
+        assert await sql.fetchone("PRAGMA journal_mode") == ("wal",)
+        assert len(sql._connections) <= 3
+
+        # Uncommitted writes stay in the writer's transaction until a commit.
+        await sql.execute("INSERT INTO test (value) VALUES (100)")
+        assert await sql.fetchone("SELECT COUNT(*) FROM test") == (100,)
+        await sql.execute("INSERT INTO test (value) VALUES (101)", commit=True)
+        assert await sql.fetchone("SELECT COUNT(*) FROM test") == (102,)
+
+        # Readers cannot write, and a failed write does not wedge the writer.
+        await sql.fetchall("DELETE FROM test")
+        await sql.executemany("INSERT INTO missing VALUES (?)", [(1,)])
+        assert await sql.fetchone("SELECT COUNT(*) FROM test") == (102,)
+
+    assert sql._connections == []
+    assert await sql.fetchall("SELECT value FROM test") == []
+
+
+@pytest.mark.asyncio
+async def test_async_sql_coalesces_concurrent_writes(tmp_path):
+    """Concurrent writes share transactions and a bad write fails alone."""
+    import asyncio
+
+    async with AsyncSQL(tmp_path / "test.db", batch_ms=50) as sql:
+        await sql.execute(
+            "CREATE TABLE test (id INTEGER PRIMARY KEY, value TEXT)", commit=True
+        )
+        before = sql.transactions
+        await asyncio.gather(
+            *(
+                sql.execute(
+                    "INSERT INTO test (value) VALUES (?)", (str(i),), commit=True
+                )
+                for i in range(200)
+            ),
+            sql.executemany("INSERT INTO test (value) VALUES (?)", [("x",), ("y",)]),
+        )
+        assert sql.transactions - before <= 2
+        assert await sql.fetchone("SELECT COUNT(*) FROM test") == (202,)
+
+        results = await asyncio.gather(
+            sql.enqueue("INSERT INTO test (id, value) VALUES (1, 'dup')"),
+            sql.enqueue("INSERT INTO test (value) VALUES ('ok')"),
+            return_exceptions=True,
+        )
+        assert isinstance(results[0], Exception)
+        assert results[1] is None
+        assert await sql.fetchone("SELECT COUNT(*) FROM test") == (203,)
+
+        # Queued writes are flushed, not lost, when the pool closes.
+        pending = sql.enqueue("INSERT INTO test (value) VALUES ('last')")
+    await pending
+    async with AsyncSQL(tmp_path / "test.db") as reopened:
+        assert await reopened.fetchone("SELECT COUNT(*) FROM test") == (204,)
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_keeps_earlier_uncommitted_writes(tmp_path):
+    """A failing write never rolls back writes already reported as done."""
+    import asyncio
+
+    async with AsyncSQL(tmp_path / "test.db", batch_ms=50) as sql:
+        await sql.execute(
+            "CREATE TABLE test (id INTEGER PRIMARY KEY, value TEXT)", commit=True
+        )
+        await sql.execute("INSERT INTO test (id, value) VALUES (1, 'first')")
+        results = await asyncio.gather(
+            sql.enqueue("INSERT INTO test (id, value) VALUES (1, 'dup')"),
+            sql.enqueue("INSERT INTO test (value) VALUES ('ok')"),
+            return_exceptions=True,
+        )
+        assert isinstance(results[0], Exception)
+        assert results[1] is None
+
+        await sql.execute("INSERT INTO missing VALUES (1)")
+        assert await sql.fetchall("SELECT value FROM test ORDER BY id") == [
+            ("first",),
+            ("ok",),
+        ]
+
+
+@pytest.mark.asyncio
+async def test_async_sql_instrumentation_logs_slow_query_plans(tmp_path, caplog):
+    """Statements are grouped by shape and slow ones are logged with a plan."""
+    import logging
+
+    async with AsyncSQL(tmp_path / "test.db", instrument=True, slow_query_ms=0) as sql:
+        await sql.execute("CREATE TABLE test (id INTEGER, value TEXT)", commit=True)
+        await sql.executemany(
+            "INSERT INTO test VALUES (?, ?)", [(i, str(i)) for i in range(10)]
+        )
+        with caplog.at_level(logging.WARNING):
+            await sql.fetchall("SELECT id FROM test WHERE id IN (?, ?)", (1, 2))
+            await sql.fetchall("SELECT id FROM test WHERE id IN (?, ?, ?)", (1, 2, 3))
+            await sql.fetchall("SELECT id FROM test WHERE value LIKE '%5%'")
+
+        stats = sql.stats()
+        statements = stats["statements"]
+        assert statements["SELECT id FROM test WHERE id IN (?...)"]["count"] == 2
+        assert "SELECT id FROM test WHERE value LIKE ?" in statements
+        assert statements["COMMIT"]["count"] == 2
+        assert stats["slow_queries"] >= 3
+        assert "SCAN test" in caplog.text
+
+        sql.reset_stats()
+        assert sql.stats()["statements"] == {}